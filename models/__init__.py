@@ -1,9 +1,14 @@
 """Shared pipeline building blocks outside the SGR package."""
 
+from .composite import FanOutOutput, FanOutPipeline, StageCache, StageTimings
 from .pipeline import ChatPipeline, PromptTemplate, StructuredChatPipeline
 
 __all__ = [
     "ChatPipeline",
+    "FanOutOutput",
+    "FanOutPipeline",
     "PromptTemplate",
+    "StageCache",
+    "StageTimings",
     "StructuredChatPipeline",
 ]
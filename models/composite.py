@@ -0,0 +1,190 @@
+"""Composite pipelines: one stage splits the input, another runs on every part."""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Generic, Mapping, Protocol, Sequence, TypeVar
+
+from pydantic import BaseModel, Field
+
+ItemT = TypeVar("ItemT")
+STAGE_CACHE_VERSION = 1
+
+
+class Stage(Protocol):
+    """Anything with a ``run(**params)`` method, e.g. a :class:`~models.pipeline.ChatPipeline`."""
+
+    def run(self, **params: Any) -> Any: ...
+
+
+class StageTimings(BaseModel):
+    """Wall-clock seconds spent in each stage of one composite run."""
+
+    split_seconds: float = 0.0
+    map_seconds: float = 0.0
+    total_seconds: float = 0.0
+    split_cached: bool = False
+    item_seconds: list[float] = Field(default_factory=list)
+
+
+class FanOutOutput(BaseModel):
+    """Result of :class:`FanOutPipeline`: the split, one output per part and timings.
+
+    ``outputs[i]`` is ``None`` when part ``i`` failed; the error is in ``errors[i]``.
+    """
+
+    split: Any
+    outputs: list[Any]
+    errors: list[str | None]
+    timings: StageTimings
+
+
+def _stage_key(stage: Any, params: Mapping[str, Any]) -> str:
+    """Hash of what determines a stage output: class, prompt, model and inputs."""
+
+    prompt = getattr(stage, "prompt", None)
+    config = getattr(getattr(stage, "client", None), "config", None)
+    parts = {
+        "class": f"{type(stage).__module__}.{type(stage).__qualname__}",
+        "name": getattr(stage, "name", None),
+        "prompt": [getattr(prompt, "system", None), getattr(prompt, "user", None)],
+        "model": getattr(config, "model", None),
+        "request_kwargs": getattr(config, "request_kwargs", None),
+        "params": params,
+    }
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class StageCache:
+    """On-disk cache of stage outputs, one pickle per input.
+
+    Keys include the stage prompt and model, so editing the splitter prompt
+    or switching models never returns stale outputs. Unreadable entries are
+    treated as misses.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    @classmethod
+    def default(cls, name: str) -> StageCache:
+        """``stages/<name>`` inside the test cache directory (``$SGR_TEST_CACHE_DIR``)."""
+
+        from sgr.testing.cache import SuiteCache
+
+        return cls(SuiteCache.default().directory / "stages" / name)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        try:
+            with (self.directory / f"{key}.pickle").open("rb") as handle:
+                version, value = pickle.load(handle)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            return False, None
+        return (True, value) if version == STAGE_CACHE_VERSION else (False, None)
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as handle:
+                pickle.dump((STAGE_CACHE_VERSION, value), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, self.directory / f"{key}.pickle")
+        except (OSError, pickle.PicklingError):
+            return
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.pickle"):
+            path.unlink(missing_ok=True)
+
+
+@dataclass(slots=True)
+class FanOutPipeline(Generic[ItemT]):
+    """Run ``splitter`` once, then ``mapper`` on every part concurrently.
+
+    ``split_items`` extracts the parts from the splitter output and
+    ``item_params`` turns one part into ``mapper.run`` keyword arguments.
+    Parts run on a thread pool in copies of the caller's context, so token
+    usage of all calls is attributed to the test case being run. A failing
+    part does not fail the others; its error is kept in the output.
+    """
+
+    splitter: Stage
+    mapper: Stage
+    split_items: Callable[[Any], Sequence[ItemT]]
+    item_params: Callable[[ItemT], Mapping[str, Any]]
+    name: str = "FanOutPipeline"
+    max_workers: int = 8
+    split_cache: StageCache | None = None
+    output_model: type[FanOutOutput] = FanOutOutput
+    client: Any = field(default=None)
+
+    def __post_init__(self) -> None:
+        if self.client is None:
+            self.client = getattr(self.splitter, "client", None)
+
+    def run(self, **params: Any) -> FanOutOutput:
+        started = time.perf_counter()
+        split, cached = self._split(params)
+        split_done = time.perf_counter()
+
+        items = list(self.split_items(split))
+        outputs: list[Any] = [None] * len(items)
+        errors: list[str | None] = [None] * len(items)
+        item_seconds = [0.0] * len(items)
+        if items:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(items)))) as pool:
+                futures = [pool.submit(contextvars.copy_context().run, self._run_item, item) for item in items]
+                for index, future in enumerate(futures):
+                    outputs[index], errors[index], item_seconds[index] = future.result()
+        finished = time.perf_counter()
+
+        return self.output_model(
+            split=split,
+            outputs=outputs,
+            errors=errors,
+            timings=StageTimings(
+                split_seconds=split_done - started,
+                map_seconds=finished - split_done,
+                total_seconds=finished - started,
+                split_cached=cached,
+                item_seconds=item_seconds,
+            ),
+        )
+
+    def fingerprint(self) -> str:
+        """Combined fingerprint of both stages for change detection in reports."""
+
+        from sgr.testing.fingerprint import pipeline_fingerprint
+
+        payload = f"{self.name}:{pipeline_fingerprint(self.splitter)}:{pipeline_fingerprint(self.mapper)}"
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _split(self, params: Mapping[str, Any]) -> tuple[Any, bool]:
+        if self.split_cache is None:
+            return self.splitter.run(**params), False
+        key = _stage_key(self.splitter, params)
+        hit, value = self.split_cache.get(key)
+        if hit:
+            return value, True
+        value = self.splitter.run(**params)
+        self.split_cache.put(key, value)
+        return value, False
+
+    def _run_item(self, item: ItemT) -> tuple[Any, str | None, float]:
+        started = time.perf_counter()
+        try:
+            output = self.mapper.run(**self.item_params(item))
+        except Exception as exc:  # noqa: BLE001
+            return None, str(exc), time.perf_counter() - started
+        return output, None, time.perf_counter() - started
+
+
+__all__ = ["FanOutOutput", "FanOutPipeline", "Stage", "StageCache", "StageTimings"]
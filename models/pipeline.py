@@ -1,9 +1,12 @@
 """Base abstractions for LLM-powered pipelines."""
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
-from json import JSONDecodeError, loads
-from typing import Any, Callable, Iterable, Mapping
+from string import Formatter
+from json import JSONDecodeError, dumps, loads
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Mapping, Sequence
 
 from pydantic import BaseModel, ValidationError
 
@@ -11,6 +14,15 @@ from sgr.llm.client import OpenAIClient
 
 ChatMessages = Iterable[dict[str, str]]
 
+BATCH_INSTRUCTIONS = """
+
+## Пакетный режим
+Ниже несколько независимых элементов, каждый под заголовком «### Элемент N».
+Обработай каждый элемент отдельно, как если бы он пришёл один.
+Верни JSON вида {"items": [...]}: по одному объекту на каждый элемент в той же схеме,
+с дополнительным целым полем "index" — номером элемента из заголовка.
+"""
+
 
 @dataclass(slots=True)
 class PromptTemplate:
@@ -47,6 +59,37 @@ class ChatPipeline:
         messages.append({"role": "user", "content": user_prompt})
         return messages
 
+    def prefix_key(self, **params: Any) -> str:
+        """Hash of the leading part of the request that other cases can share.
+
+        That is every message before the final user message plus the start
+        of the user message given by :meth:`_shared_user_prefix`. The system
+        prompt is never formatted with parameters, so it is the same for all
+        cases; cases that also share, e.g., a conversation history get the
+        same key. The runner uses this key to send such requests close
+        together, while the provider still has the prefix in its prompt cache.
+        """
+
+        messages = self._build_messages(self._prompt_params(**params))
+        shared = [*messages[:-1], {"role": "user", "content": self._shared_user_prefix(messages[-1]["content"])}]
+        payload = dumps(shared, ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+    def _shared_user_prefix(self, content: str) -> str:
+        """Start of the rendered user message that does not depend on the case.
+
+        By default the literal text of the user template before its first
+        placeholder.
+        """
+
+        literal = next(iter(Formatter().parse(self.prompt.user)), ("", None, None, None))[0]
+        return content[: len(literal)]
+
+    def _prompt_params(self, **params: Any) -> Mapping[str, Any]:
+        """Prompt placeholders for :meth:`run` keyword arguments (identity by default)."""
+
+        return params
+
     @staticmethod
     def _default_parser(response: Any) -> Any:
         try:
@@ -61,6 +104,28 @@ class ChatPipeline:
         parser = self.response_parser or self._default_parser
         return parser(response)
 
+    def run_samples(self, n: int, **params: Any) -> list[Any]:
+        """Request ``n`` choices in one call and parse each of them.
+
+        A choice that fails to parse is returned as the exception instead of
+        aborting the other samples. Providers that ignore ``n`` return fewer
+        choices; the runner tops the samples up with separate calls.
+        """
+
+        messages = self._build_messages(params)
+        response = self.client.chat(messages, n=n)
+        parser = self.response_parser or self._default_parser
+        samples: list[Any] = []
+        for choice in getattr(response, "choices", None) or []:
+            try:
+                samples.append(self._parse_sample(parser(SimpleNamespace(choices=[choice]))))
+            except ValueError as exc:
+                samples.append(exc)
+        return samples
+
+    def _parse_sample(self, raw: Any) -> Any:
+        return raw
+
 
 @dataclass(slots=True)
 class StructuredChatPipeline(ChatPipeline):
@@ -74,7 +139,55 @@ class StructuredChatPipeline(ChatPipeline):
             raise ValueError(msg)
 
     def run(self, **params: Any) -> BaseModel:
-        raw = ChatPipeline.run(self, **params)
+        return self._parse_sample(ChatPipeline.run(self, **params))
+
+    def run_batch(self, items: Sequence[Mapping[str, Any]]) -> list[BaseModel | Exception]:
+        """Classify several inputs with one request.
+
+        ``items`` are keyword arguments for :meth:`run`. The model answers
+        with ``{"items": [...]}`` keyed by item index; every item is validated
+        on its own, and items that are missing or invalid come back as
+        exceptions so the caller can retry them with single-item requests.
+        """
+
+        return self._run_prompt_batch([self._prompt_params(**item) for item in items])
+
+    def _run_prompt_batch(self, items: Sequence[Mapping[str, Any]]) -> list[BaseModel | Exception]:
+        """:meth:`run_batch` for items already turned into prompt placeholders."""
+
+        if not items:
+            return []
+        sections = [
+            f"### Элемент {index}\n{self._build_messages(item)[-1]['content']}" for index, item in enumerate(items)
+        ]
+        messages: list[dict[str, str]] = [
+            {"role": "system", "content": (self.prompt.system or "") + BATCH_INSTRUCTIONS},
+            {"role": "user", "content": "\n\n".join(sections)},
+        ]
+        parser = self.response_parser or self._default_parser
+        raw = parser(self.client.chat(messages))
+        try:
+            payload = loads(raw)
+        except (JSONDecodeError, TypeError):
+            return [ValueError("Batched response is not valid JSON") for _ in items]
+
+        entries = payload.get("items") if isinstance(payload, dict) else payload
+        results: list[BaseModel | Exception] = [
+            ValueError(f"Item {index} is missing from the batched response") for index in range(len(items))
+        ]
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.pop("index", None)
+            if not isinstance(index, int) or not 0 <= index < len(items):
+                continue
+            try:
+                results[index] = self.response_model.model_validate(entry)  # type: ignore[union-attr]
+            except ValidationError:
+                results[index] = ValueError("Model response does not match the expected schema")
+        return results
+
+    def _parse_sample(self, raw: Any) -> BaseModel:
         try:
             payload = loads(raw)
         except JSONDecodeError as exc:  # noqa: B904
@@ -88,4 +201,4 @@ class StructuredChatPipeline(ChatPipeline):
             raise ValueError(msg) from exc
 
 
-__all__ = ["ChatPipeline", "PromptTemplate", "StructuredChatPipeline"]
+__all__ = ["BATCH_INSTRUCTIONS", "ChatPipeline", "PromptTemplate", "StructuredChatPipeline"]
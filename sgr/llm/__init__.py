@@ -1,8 +1,25 @@
 """LLM helpers for SGR pipelines."""
 
 from .client import LLMClientConfig, OpenAIClient
+from .deadline import DeadlineExceeded, deadline
+from .endpoints import EndpointConfig, EndpointStats
+from .hedging import HedgePolicy, HedgeStats
+from .rate_limit import RateLimiter
+from .tokens import compact_history, estimate_tokens
+from .usage import UsageRecorder, track_usage
 
 __all__ = [
+    "DeadlineExceeded",
+    "EndpointConfig",
+    "EndpointStats",
+    "HedgePolicy",
+    "HedgeStats",
     "LLMClientConfig",
     "OpenAIClient",
+    "RateLimiter",
+    "UsageRecorder",
+    "compact_history",
+    "deadline",
+    "estimate_tokens",
+    "track_usage",
 ]
@@ -2,13 +2,25 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import json
 import logging
+import os
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Awaitable, Iterable, Optional, Protocol, TypeVar
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional, Protocol, TypeVar
 
 from openai import APIConnectionError, APIError, APITimeoutError, AsyncOpenAI, OpenAI, RateLimitError
 
+from .deadline import DeadlineExceeded, check_deadline, deadline_reason, remaining
+from .endpoints import LEAST_OUTSTANDING, Endpoint, EndpointConfig, EndpointPool
+from .hedging import HedgePolicy
+from .rate_limit import RateLimiter
+from .usage import UsageRecorder, current_recorder, record_response_usage
+
 _logger = logging.getLogger(__name__)
 
 
@@ -22,6 +34,41 @@ class LLMClientConfig:
     max_retries: int = 3
     backoff_factor: float = 0.5
     timeout: float = 30.0
+    request_kwargs: dict[str, Any] = field(default_factory=dict)
+    """Extra ``chat.completions.create`` arguments (``temperature``, ``top_p``...) sent with every request."""
+    endpoints: list[EndpointConfig] = field(default_factory=list)
+    """Gateways serving the model; when empty, ``base_url`` is the only endpoint."""
+    routing: str = LEAST_OUTSTANDING
+    """How requests are spread over ``endpoints``: ``least_outstanding`` or ``latency``."""
+
+    @classmethod
+    def from_env(cls, prefix: str = "OPENAI_") -> LLMClientConfig:
+        """Build config from ``{prefix}API_KEY``, ``{prefix}BASE_URL`` and ``{prefix}MODEL``.
+
+        ``{prefix}ENDPOINTS`` may hold a JSON list of :class:`EndpointConfig`
+        objects and ``{prefix}ROUTING`` the routing strategy.
+        """
+
+        api_key = os.environ.get(f"{prefix}API_KEY")
+        if not api_key:
+            msg = f"Environment variable {prefix}API_KEY is not set"
+            raise ValueError(msg)
+
+        config = cls(api_key=api_key, base_url=os.environ.get(f"{prefix}BASE_URL") or None)
+        model = os.environ.get(f"{prefix}MODEL")
+        if model:
+            config.model = model
+        endpoints = os.environ.get(f"{prefix}ENDPOINTS")
+        if endpoints:
+            try:
+                config.endpoints = [EndpointConfig.from_dict(item) for item in json.loads(endpoints)]
+            except (json.JSONDecodeError, TypeError) as exc:  # noqa: B904
+                msg = f"Environment variable {prefix}ENDPOINTS must be a JSON list of endpoints: {exc}"
+                raise ValueError(msg) from exc
+        routing = os.environ.get(f"{prefix}ROUTING")
+        if routing:
+            config.routing = routing
+        return config
 
 
 ChatMessages = Iterable[dict[str, str]]
@@ -36,48 +83,152 @@ class _AsyncCallable(Protocol[T]):
     def __call__(self) -> Awaitable[T]: ...
 
 
+def _start_thread(func: _Callable[T]) -> Future[T]:
+    """Run ``func`` in a daemon thread in a copy of the current context."""
+
+    future: Future[T] = Future()
+    context = contextvars.copy_context()
+
+    def _target() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(func))
+        except BaseException as error:  # noqa: BLE001
+            future.set_exception(error)
+
+    threading.Thread(target=_target, name="sgr-llm-call", daemon=True).start()
+    return future
+
+
+def _record_loser(recorder: UsageRecorder | None, future: Future[Any] | asyncio.Future[Any]) -> None:
+    """Add the usage of a hedged call that lost the race: its tokens are billed all the same."""
+
+    if recorder is not None and future.done() and not future.cancelled() and future.exception() is None:
+        recorder.add_response(future.result())
+
+
 class OpenAIClient:
-    """Thin wrapper over ``openai`` clients with built-in retries."""
+    """Thin wrapper over ``openai`` clients with built-in retries.
+
+    An optional shared :class:`~sgr.llm.rate_limit.RateLimiter` is consulted
+    before every attempt, including retries.
 
-    def __init__(self, config: LLMClientConfig):
+    With a :class:`~sgr.llm.hedging.HedgePolicy` an attempt that is still
+    running after the policy delay is duplicated and the first successful
+    answer wins. Hedges spend the policy budget and take a rate limiter token
+    without waiting for one; they are skipped when either is exhausted. The
+    losing async call is cancelled; a losing sync call cannot be interrupted
+    and is abandoned, its result discarded. Usage of the case gets
+    ``hedged_requests`` and ``hedge_wins`` counters. A losing call that
+    completes is counted in the usage as a request of its own once it
+    arrives (a sync loser still running when its case has been recorded is
+    missed); a cancelled one reports no usage.
+
+    Every attempt goes to an endpoint picked by :class:`~sgr.llm.endpoints.EndpointPool`.
+    A retryable error on one endpoint fails over to another one right away;
+    the backoff delay applies only when no untried healthy endpoint is left.
+
+    Inside a :func:`~sgr.llm.deadline.deadline` scope the request timeout is
+    shortened to the time left, and the client raises
+    :class:`~sgr.llm.deadline.DeadlineExceeded` instead of starting an
+    attempt or a backoff sleep that would not finish in time.
+    """
+
+    def __init__(
+        self,
+        config: LLMClientConfig,
+        *,
+        rate_limiter: RateLimiter | None = None,
+        hedging: HedgePolicy | None = None,
+    ):
         self.config = config
-        client_kwargs = {
-            "api_key": config.api_key,
-            "base_url": config.base_url,
-            "timeout": config.timeout,
-        }
-        self._client = OpenAI(**client_kwargs)
-        self._async_client = AsyncOpenAI(**client_kwargs)
+        self.rate_limiter = rate_limiter
+        self.hedging = hedging
+        endpoints = []
+        for endpoint in config.endpoints or [EndpointConfig(base_url=config.base_url)]:
+            client_kwargs = {
+                "api_key": endpoint.resolve_api_key(config.api_key),
+                "base_url": endpoint.base_url,
+                "timeout": config.timeout,
+            }
+            endpoints.append(Endpoint(endpoint, OpenAI(**client_kwargs), AsyncOpenAI(**client_kwargs)))
+        self.endpoint_pool = EndpointPool(endpoints, strategy=config.routing, is_failure=self._should_retry)
 
     def _should_retry(self, error: Exception) -> bool:
         retryable = (APIConnectionError, APIError, APITimeoutError, RateLimitError)
         return isinstance(error, retryable)
 
-    def _retry_sync(self, func: _Callable[T]) -> T:
+    def endpoint_stats(self) -> list[dict[str, Any]]:
+        """Traffic, latency and health of every endpoint since the client was created."""
+
+        return [stats.as_dict() for stats in self.endpoint_pool.stats()]
+
+    def _failover(self, error: Exception, failed: set[str]) -> bool:
+        if not self.endpoint_pool.has_alternative(failed):
+            return False
+        _logger.warning("Failing over to another endpoint after error on %s: %s", ", ".join(sorted(failed)), error)
+        return True
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        delay = self.config.backoff_factor * (2 ** (attempt - 1))
+        left = remaining()
+        if left is not None and delay >= left:
+            raise DeadlineExceeded(deadline_reason()) from error
+        return delay
+
+    def _request_options(self, request: dict[str, Any]) -> dict[str, Any]:
+        left = remaining()
+        if left is None:
+            return request
+        check_deadline()
+        return {**request, "timeout": min(request.get("timeout") or self.config.timeout, left)}
+
+    def _retry_sync(self, request: Callable[[Endpoint], T]) -> T:
         attempt = 0
+        failed: set[str] = set()
+
+        def func() -> T:
+            return self.endpoint_pool.call(request, failed)
+
         while True:
+            check_deadline()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             try:
-                return func()
+                return func() if self.hedging is None else self._hedged_sync(func, self.hedging)
             except Exception as error:  # noqa: BLE001
                 attempt += 1
                 if not self._should_retry(error) or attempt > self.config.max_retries:
                     raise
-                delay = self.config.backoff_factor * (2 ** (attempt - 1))
+                if self._failover(error, failed):
+                    continue
+                delay = self._backoff_delay(attempt, error)
                 _logger.warning(
                     "Retrying OpenAI call after error (attempt %s/%s): %s", attempt, self.config.max_retries, error
                 )
                 time.sleep(delay)
 
-    async def _retry_async(self, func: _AsyncCallable[T]) -> T:
+    async def _retry_async(self, request: Callable[[Endpoint], Awaitable[T]]) -> T:
         attempt = 0
+        failed: set[str] = set()
+
+        def func() -> Awaitable[T]:
+            return self.endpoint_pool.acall(request, failed)
+
         while True:
+            check_deadline()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire()
             try:
-                return await func()
+                return await (func() if self.hedging is None else self._hedged_async(func, self.hedging))
             except Exception as error:  # noqa: BLE001
                 attempt += 1
                 if not self._should_retry(error) or attempt > self.config.max_retries:
                     raise
-                delay = self.config.backoff_factor * (2 ** (attempt - 1))
+                if self._failover(error, failed):
+                    continue
+                delay = self._backoff_delay(attempt, error)
                 _logger.warning(
                     "Retrying async OpenAI call after error (attempt %s/%s): %s",
                     attempt,
@@ -86,23 +237,126 @@ class OpenAIClient:
                 )
                 await asyncio.sleep(delay)
 
+    def _send_hedge(self, policy: HedgePolicy) -> bool:
+        if not policy.try_hedge():
+            return False
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            policy.refund()
+            return False
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.add(hedged_requests=1)
+        return True
+
+    @staticmethod
+    def _hedge_won(policy: HedgePolicy) -> None:
+        policy.record_win()
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.add(hedge_wins=1)
+
+    def _hedged_sync(self, func: _Callable[T], policy: HedgePolicy) -> T:
+        def _timed() -> T:
+            started = time.perf_counter()
+            result = func()
+            policy.observe(time.perf_counter() - started)
+            return result
+
+        policy.start_request()
+        delay = policy.delay()
+        if delay is None:
+            return _timed()
+        primary = _start_thread(_timed)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not self._send_hedge(policy):
+            return primary.result()
+
+        hedge = _start_thread(_timed)
+        recorder = current_recorder()
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda item: item is hedge):
+                if future.exception() is None:
+                    if future is hedge:
+                        self._hedge_won(policy)
+                    # Runs right away when the loser is done, otherwise in its thread when it finishes.
+                    (hedge if future is primary else primary).add_done_callback(
+                        lambda loser: _record_loser(recorder, loser)
+                    )
+                    return future.result()
+                error = error or future.exception()
+        raise error  # type: ignore[misc]
+
+    async def _hedged_async(self, func: _AsyncCallable[T], policy: HedgePolicy) -> T:
+        async def _timed() -> T:
+            started = time.perf_counter()
+            result = await func()
+            policy.observe(time.perf_counter() - started)
+            return result
+
+        policy.start_request()
+        delay = policy.delay()
+        if delay is None:
+            return await _timed()
+        primary = asyncio.ensure_future(_timed())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._send_hedge(policy):
+                return await primary
+            hedge = asyncio.ensure_future(_timed())
+            pending = tasks = {primary, hedge}
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda item: item is hedge):
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_won(policy)
+                        _record_loser(current_recorder(), hedge if task is primary else primary)
+                        return task.result()
+                    error = error or task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def chat(self, messages: ChatMessages, **kwargs: Any) -> Any:
         """Send chat completion request with retries."""
 
-        def _call() -> Any:
-            return self._client.chat.completions.create(model=self.config.model, messages=list(messages), **kwargs)
+        request = {**self.config.request_kwargs, **kwargs}
+
+        def _call(endpoint: Endpoint) -> Any:
+            return endpoint.client.chat.completions.create(
+                model=endpoint.config.model or self.config.model,
+                messages=list(messages),
+                **self._request_options(request),
+            )
 
-        return self._retry_sync(_call)
+        response = self._retry_sync(_call)
+        record_response_usage(response)
+        return response
 
     async def achat(self, messages: ChatMessages, **kwargs: Any) -> Any:
         """Async variant of :meth:`chat`."""
 
-        async def _call() -> Any:
-            return await self._async_client.chat.completions.create(
-                model=self.config.model, messages=list(messages), **kwargs
+        request = {**self.config.request_kwargs, **kwargs}
+
+        async def _call(endpoint: Endpoint) -> Any:
+            return await endpoint.async_client.chat.completions.create(
+                model=endpoint.config.model or self.config.model,
+                messages=list(messages),
+                **self._request_options(request),
             )
 
-        return await self._retry_async(_call)
+        response = await self._retry_async(_call)
+        record_response_usage(response)
+        return response
 
 
 __all__ = ["LLMClientConfig", "OpenAIClient"]
@@ -0,0 +1,58 @@
+"""Context-local wall-clock deadlines honoured by the LLM client."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the work of the current context ran out of time."""
+
+
+# (monotonic time, description of the limit); the innermost scope holds the earliest deadline.
+_current_deadline: ContextVar[tuple[float, str] | None] = ContextVar("sgr_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float | None = None, *, at: float | None = None, reason: str = "deadline") -> Iterator[None]:
+    """Limit the enclosed work to ``seconds`` from now (or to monotonic time ``at``).
+
+    Nested scopes can only shorten the deadline; ``None`` keeps the current one.
+    ``reason`` becomes the :class:`DeadlineExceeded` message.
+    """
+
+    if seconds is None and at is None:
+        yield
+        return
+    limit = at if at is not None else time.monotonic() + seconds  # type: ignore[operator]
+    current = _current_deadline.get()
+    token = _current_deadline.set(current if current is not None and current[0] <= limit else (limit, reason))
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, ``None`` without one."""
+
+    current = _current_deadline.get()
+    return None if current is None else current[0] - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise :class:`DeadlineExceeded` when the current deadline has passed."""
+
+    current = _current_deadline.get()
+    if current is not None and current[0] <= time.monotonic():
+        raise DeadlineExceeded(current[1])
+
+
+def deadline_reason() -> str | None:
+    current = _current_deadline.get()
+    return None if current is None else current[1]
+
+
+__all__ = ["DeadlineExceeded", "check_deadline", "deadline", "deadline_reason", "remaining"]
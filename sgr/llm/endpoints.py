@@ -0,0 +1,330 @@
+"""Several OpenAI-compatible endpoints behind one client: routing, health and failover."""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Collection, Mapping, Optional, TypeVar
+
+from .deadline import check_deadline, remaining
+from .rate_limit import RateLimiter
+
+T = TypeVar("T")
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY = "latency"
+ROUTING_STRATEGIES = (LEAST_OUTSTANDING, LATENCY)
+
+# How often a request waiting for endpoint capacity re-checks health and its deadline (async: polls).
+_CAPACITY_RECHECK_SECONDS = 0.5
+_ASYNC_CAPACITY_POLL_SECONDS = 0.01
+
+
+@dataclass
+class EndpointConfig:
+    """One gateway serving the model.
+
+    ``api_key`` falls back to the ``api_key_env`` variable and then to the
+    client key; ``model`` overrides the client model for gateways that name
+    it differently. ``requests_per_minute`` and ``max_concurrency`` limit this
+    endpoint only; ``weight`` scales its share of the traffic. A request
+    waits while every endpoint it may use is at ``max_concurrency``.
+    """
+
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    api_key_env: Optional[str] = None
+    name: Optional[str] = None
+    weight: float = 1.0
+    model: Optional[str] = None
+    requests_per_minute: Optional[float] = None
+    max_concurrency: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.weight <= 0:
+            msg = f"Endpoint weight must be positive: {self.label}"
+            raise ValueError(msg)
+
+    @property
+    def label(self) -> str:
+        return self.name or self.base_url or "default"
+
+    def resolve_api_key(self, default: str) -> str:
+        if self.api_key:
+            return self.api_key
+        if self.api_key_env:
+            api_key = os.environ.get(self.api_key_env)
+            if not api_key:
+                msg = f"Environment variable {self.api_key_env} is not set (endpoint {self.label})"
+                raise ValueError(msg)
+            return api_key
+        return default
+
+    def describe(self) -> dict[str, Any]:
+        """Non-secret settings for reports."""
+
+        return {
+            name: value
+            for name, value in (
+                ("name", self.name),
+                ("base_url", self.base_url),
+                ("weight", self.weight),
+                ("model", self.model),
+                ("requests_per_minute", self.requests_per_minute),
+                ("max_concurrency", self.max_concurrency),
+            )
+            if value is not None
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> EndpointConfig:
+        unknown = set(payload) - set(cls.__dataclass_fields__)
+        if unknown:
+            msg = f"Unknown endpoint settings: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        return cls(**payload)
+
+
+@dataclass
+class EndpointStats:
+    """Traffic and health of one endpoint."""
+
+    name: str
+    base_url: Optional[str]
+    weight: float
+    requests: int
+    failures: int
+    outstanding: int
+    mean_latency_seconds: float
+    ewma_latency_seconds: Optional[float]
+    healthy: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(vars(self))
+
+
+class Endpoint:
+    """Runtime state of one endpoint: clients, limits, latency and health."""
+
+    def __init__(self, config: EndpointConfig, client: Any, async_client: Any = None) -> None:
+        self.config = config
+        self.client = client
+        self.async_client = async_client
+        self.limiter = RateLimiter(config.requests_per_minute) if config.requests_per_minute else None
+        self.outstanding = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.total_latency = 0.0
+        self.ewma_latency: float | None = None
+
+    @property
+    def name(self) -> str:
+        return self.config.label
+
+    def has_capacity(self) -> bool:
+        return self.config.max_concurrency is None or self.outstanding < self.config.max_concurrency
+
+
+class EndpointPool:
+    """Picks an endpoint for every attempt and tracks how each one behaves.
+
+    ``least_outstanding`` routing sends a request where the fewest requests
+    are in flight relative to the weight; ``latency`` also multiplies by the
+    smoothed latency, so slow gateways get less traffic. Endpoints without
+    latency samples are tried first.
+
+    A failure (as judged by ``is_failure``) marks the endpoint unhealthy
+    for ``cooldown`` seconds once it fails ``failure_threshold`` times in a
+    row, doubling up to ``max_cooldown``. A retry avoids endpoints that
+    already failed for this request while any other endpoint is available,
+    and when all are unhealthy the one that recovers first is used.
+
+    ``max_concurrency`` is a hard limit: when every usable endpoint is full,
+    the request waits until one of them finishes a request (or the current
+    :func:`~sgr.llm.deadline.deadline` passes).
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        *,
+        strategy: str = LEAST_OUTSTANDING,
+        is_failure: Callable[[Exception], bool] = lambda error: True,
+        failure_threshold: int = 2,
+        cooldown: float = 10.0,
+        max_cooldown: float = 120.0,
+        latency_smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            msg = "EndpointPool needs at least one endpoint"
+            raise ValueError(msg)
+        if strategy not in ROUTING_STRATEGIES:
+            msg = f"Unknown routing strategy '{strategy}', expected one of {', '.join(ROUTING_STRATEGIES)}"
+            raise ValueError(msg)
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.latency_smoothing = latency_smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._capacity = threading.Condition(self._lock)
+
+    def _score(self, endpoint: Endpoint) -> tuple[float, float]:
+        weight = endpoint.config.weight
+        if self.strategy == LATENCY:
+            load = (endpoint.outstanding + 1) * (endpoint.ewma_latency or 0.0) / weight
+        else:
+            load = endpoint.outstanding / weight
+        # Ties (e.g. sequential traffic, nothing in flight) go by the weighted request share.
+        return load, (endpoint.requests + 1) / weight
+
+    def _candidates(self, avoid: Collection[str]) -> list[Endpoint]:
+        """Usable endpoints with free capacity, best first; empty when all of them are full."""
+
+        now = self._clock()
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.unhealthy_until <= now]
+        preferred = [endpoint for endpoint in healthy if endpoint.name not in avoid] or healthy
+        if not preferred:
+            preferred = [min(self.endpoints, key=lambda endpoint: endpoint.unhealthy_until)]
+        return sorted([endpoint for endpoint in preferred if endpoint.has_capacity()], key=self._score)
+
+    def has_alternative(self, avoid: Collection[str]) -> bool:
+        """Whether a healthy endpoint that is not in ``avoid`` exists (failover without backoff)."""
+
+        with self._lock:
+            now = self._clock()
+            return any(endpoint.unhealthy_until <= now and endpoint.name not in avoid for endpoint in self.endpoints)
+
+    def _reserve(self, avoid: Collection[str]) -> tuple[Endpoint, bool] | None:
+        """Reserve the best endpoint, ``None`` when all are full; the caller holds the lock.
+
+        The flag tells whether the endpoint's rate limiter still has to be awaited.
+        """
+
+        candidates = self._candidates(avoid)
+        if not candidates:
+            return None
+        chosen, wait = candidates[0], candidates[0].limiter is not None
+        for endpoint in candidates:
+            if endpoint.limiter is None or endpoint.limiter.try_acquire():
+                chosen, wait = endpoint, False
+                break
+        chosen.outstanding += 1
+        chosen.requests += 1
+        return chosen, wait
+
+    def _select(self, avoid: Collection[str]) -> tuple[Endpoint, bool]:
+        """Reserve the best endpoint, blocking until one has capacity."""
+
+        with self._capacity:
+            while True:
+                reserved = self._reserve(avoid)
+                if reserved is not None:
+                    return reserved
+                check_deadline()
+                left = remaining()
+                self._capacity.wait(_CAPACITY_RECHECK_SECONDS if left is None else min(left, _CAPACITY_RECHECK_SECONDS))
+
+    async def _aselect(self, avoid: Collection[str]) -> tuple[Endpoint, bool]:
+        """Async variant of :meth:`_select`; polls instead of blocking the event loop."""
+
+        while True:
+            with self._lock:
+                reserved = self._reserve(avoid)
+            if reserved is not None:
+                return reserved
+            check_deadline()
+            await asyncio.sleep(_ASYNC_CAPACITY_POLL_SECONDS)
+
+    def _finish(self, endpoint: Endpoint, started: float, error: Exception | None, failed: set[str]) -> None:
+        with self._capacity:
+            endpoint.outstanding -= 1
+            self._capacity.notify_all()
+            if error is None:
+                latency = self._clock() - started
+                endpoint.successes += 1
+                endpoint.total_latency += latency
+                endpoint.consecutive_failures = 0
+                if endpoint.ewma_latency is None:
+                    endpoint.ewma_latency = latency
+                else:
+                    alpha = self.latency_smoothing
+                    endpoint.ewma_latency = alpha * latency + (1 - alpha) * endpoint.ewma_latency
+                return
+            if not self.is_failure(error):
+                return
+            failed.add(endpoint.name)
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                exponent = endpoint.consecutive_failures - self.failure_threshold
+                endpoint.unhealthy_until = self._clock() + min(self.max_cooldown, self.cooldown * 2**exponent)
+
+    def call(self, request: Callable[[Endpoint], T], failed: set[str]) -> T:
+        """Run ``request`` on the chosen endpoint; failing endpoints are added to ``failed``."""
+
+        endpoint, wait = self._select(failed)
+        if wait:
+            endpoint.limiter.acquire()  # type: ignore[union-attr]
+        started = self._clock()
+        try:
+            result = request(endpoint)
+        except Exception as error:
+            self._finish(endpoint, started, error, failed)
+            raise
+        self._finish(endpoint, started, None, failed)
+        return result
+
+    async def acall(self, request: Callable[[Endpoint], Awaitable[T]], failed: set[str]) -> T:
+        """Async variant of :meth:`call`."""
+
+        endpoint, wait = await self._aselect(failed)
+        started = self._clock()
+        try:
+            if wait:
+                await endpoint.limiter.aacquire()  # type: ignore[union-attr]
+                started = self._clock()
+            result = await request(endpoint)
+        except BaseException as error:
+            self._finish(endpoint, started, error if isinstance(error, Exception) else None, failed)
+            raise
+        self._finish(endpoint, started, None, failed)
+        return result
+
+    def stats(self) -> list[EndpointStats]:
+        with self._lock:
+            now = self._clock()
+            return [
+                EndpointStats(
+                    name=endpoint.name,
+                    base_url=endpoint.config.base_url,
+                    weight=endpoint.config.weight,
+                    requests=endpoint.requests,
+                    failures=endpoint.failures,
+                    outstanding=endpoint.outstanding,
+                    mean_latency_seconds=endpoint.total_latency / endpoint.successes if endpoint.successes else 0.0,
+                    ewma_latency_seconds=endpoint.ewma_latency,
+                    healthy=endpoint.unhealthy_until <= now,
+                )
+                for endpoint in self.endpoints
+            ]
+
+
+__all__ = [
+    "LATENCY",
+    "LEAST_OUTSTANDING",
+    "ROUTING_STRATEGIES",
+    "Endpoint",
+    "EndpointConfig",
+    "EndpointPool",
+    "EndpointStats",
+]
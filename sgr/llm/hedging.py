@@ -0,0 +1,137 @@
+"""Request hedging: duplicate slow calls and keep whichever answer arrives first."""
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class HedgeStats:
+    """Counters of one :class:`HedgePolicy`."""
+
+    requests: int
+    hedges: int
+    hedge_wins: int
+    skipped_budget: int
+    skipped_rate_limit: int
+    delay_seconds: float | None
+
+    def as_dict(self) -> dict[str, int | float | None]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "skipped_budget": self.skipped_budget,
+            "skipped_rate_limit": self.skipped_rate_limit,
+            "delay_seconds": self.delay_seconds,
+        }
+
+
+class HedgePolicy:
+    """Adaptive hedging threshold with a hedge budget.
+
+    A call that has not returned after ``delay()`` seconds is duplicated.
+    The delay is the ``quantile`` of the last ``window`` observed latencies
+    (never below ``min_delay``); until ``min_samples`` latencies are known it
+    is ``initial_delay``, and no hedging happens when that is ``None``.
+
+    Every request earns ``budget_ratio`` hedge credits up to ``max_credits``
+    and a hedge spends one, so hedges stay around ``budget_ratio`` of all
+    requests even when the provider slows down as a whole. One policy can be
+    shared by clients calling the same model.
+    """
+
+    def __init__(
+        self,
+        *,
+        quantile: float = 0.95,
+        budget_ratio: float = 0.1,
+        max_credits: float = 10.0,
+        min_delay: float = 0.05,
+        initial_delay: float | None = None,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        if not 0 < quantile < 1:
+            msg = "quantile must be between 0 and 1"
+            raise ValueError(msg)
+        if budget_ratio < 0:
+            msg = "budget_ratio must be non-negative"
+            raise ValueError(msg)
+        self.quantile = quantile
+        self.budget_ratio = budget_ratio
+        self.max_credits = max_credits
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._credits = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._skipped_budget = 0
+        self._skipped_rate_limit = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float | None:
+        """Seconds to wait before hedging the next call, ``None`` to not hedge it."""
+
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    def start_request(self) -> None:
+        """Count a primary call and earn hedge credit for it."""
+
+        with self._lock:
+            self._requests += 1
+            self._credits = min(self.max_credits, self._credits + self.budget_ratio)
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a completed call."""
+
+        with self._lock:
+            self._latencies.append(latency)
+
+    def try_hedge(self) -> bool:
+        """Spend one credit on a hedge; ``False`` when the budget is exhausted."""
+
+        with self._lock:
+            if self._credits < 1.0:
+                self._skipped_budget += 1
+                return False
+            self._credits -= 1.0
+            self._hedges += 1
+            return True
+
+    def refund(self) -> None:
+        """Return the credit of a hedge that could not be sent (rate limiter was empty)."""
+
+        with self._lock:
+            self._credits = min(self.max_credits, self._credits + 1.0)
+            self._hedges -= 1
+            self._skipped_rate_limit += 1
+
+    def record_win(self) -> None:
+        with self._lock:
+            self._hedge_wins += 1
+
+    def stats(self) -> HedgeStats:
+        delay = self.delay()
+        with self._lock:
+            return HedgeStats(
+                requests=self._requests,
+                hedges=self._hedges,
+                hedge_wins=self._hedge_wins,
+                skipped_budget=self._skipped_budget,
+                skipped_rate_limit=self._skipped_rate_limit,
+                delay_seconds=delay,
+            )
+
+
+__all__ = ["HedgePolicy", "HedgeStats"]
@@ -0,0 +1,73 @@
+"""Local price table for estimating the cost of recorded token usage."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class ModelPrice:
+    """USD per million tokens; cached prompt tokens default to the input price."""
+
+    input: float
+    output: float
+    cached_input: Optional[float] = None
+
+    def cost(self, usage: Mapping[str, int]) -> float:
+        """Cost of ``prompt_tokens``/``completion_tokens``/``cached_tokens`` counters."""
+
+        prompt = usage.get("prompt_tokens", 0)
+        cached = min(usage.get("cached_tokens", 0), prompt)
+        cached_price = self.cached_input if self.cached_input is not None else self.input
+        completion = usage.get("completion_tokens", 0)
+        return ((prompt - cached) * self.input + cached * cached_price + completion * self.output) / 1_000_000
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> ModelPrice:
+        return cls(
+            input=float(payload["input"]),
+            output=float(payload["output"]),
+            cached_input=float(payload["cached_input"]) if payload.get("cached_input") is not None else None,
+        )
+
+
+PriceTable = Mapping[str, ModelPrice]
+
+# List prices of the OpenAI API at the time of writing; override them with a JSON table for other providers.
+DEFAULT_PRICES: dict[str, ModelPrice] = {
+    "gpt-4o-mini": ModelPrice(input=0.15, output=0.60, cached_input=0.075),
+    "gpt-4o": ModelPrice(input=2.50, output=10.00, cached_input=1.25),
+    "gpt-4.1": ModelPrice(input=2.00, output=8.00, cached_input=0.50),
+    "gpt-4.1-mini": ModelPrice(input=0.40, output=1.60, cached_input=0.10),
+    "gpt-4.1-nano": ModelPrice(input=0.10, output=0.40, cached_input=0.025),
+    "o4-mini": ModelPrice(input=1.10, output=4.40, cached_input=0.275),
+}
+
+
+def price_for(model: str | None, table: PriceTable | None = None) -> ModelPrice | None:
+    """Price of ``model``; dated snapshots like ``gpt-4o-mini-2024-07-18`` match their base name."""
+
+    if not model:
+        return None
+    prices = DEFAULT_PRICES if table is None else table
+    if model in prices:
+        return prices[model]
+    matches = [name for name in prices if model.startswith(f"{name}-")]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def load_price_table(path: Path, *, include_defaults: bool = True) -> dict[str, ModelPrice]:
+    """Read ``{"model": {"input": ..., "output": ..., "cached_input": ...}}`` (USD per 1M tokens)."""
+
+    try:
+        payload = json.loads(Path(path).read_text())
+        table = {name: ModelPrice.from_dict(price) for name, price in payload.items()}
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError) as exc:  # noqa: B904
+        msg = f"Invalid price table at {path}: {exc}"
+        raise ValueError(msg) from exc
+    return {**DEFAULT_PRICES, **table} if include_defaults else table
+
+
+__all__ = ["DEFAULT_PRICES", "ModelPrice", "PriceTable", "load_price_table", "price_for"]
@@ -0,0 +1,74 @@
+"""Token-bucket rate limiting shared between LLM clients."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per minute.
+
+    One limiter can be shared by several :class:`~sgr.llm.client.OpenAIClient`
+    instances (e.g. every combination of a sweep) so that together they stay
+    under a provider quota. ``burst`` is how many requests may start at once
+    after an idle period; it defaults to one second worth of requests.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        *,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if requests_per_minute <= 0:
+            msg = "requests_per_minute must be positive"
+            raise ValueError(msg)
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, burst if burst is not None else self.rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if available, otherwise return how long to wait."""
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting; ``False`` when the bucket is empty."""
+
+        return self._reserve() == 0.0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+
+        while True:
+            delay = self._reserve()
+            if delay == 0.0:
+                return
+            self._sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Async variant of :meth:`acquire`."""
+
+        while True:
+            delay = self._reserve()
+            if delay == 0.0:
+                return
+            await asyncio.sleep(delay)
+
+
+__all__ = ["RateLimiter"]
@@ -0,0 +1,131 @@
+"""Offline token estimation and budget-aware compaction of conversation histories."""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+# Words, digit runs, whitespace and single symbols are estimated separately.
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\s+|[^\w\s]|_", re.UNICODE)
+MESSAGE_OVERHEAD_TOKENS = 4
+OMITTED_MARKER = "[… пропущено ранних реплик: {count}]"
+TRUNCATED_MARKER = "…"
+
+TokenEstimator = Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer or network access.
+
+    Calibrated for OpenAI-style byte-level BPE vocabularies: Latin words take
+    about one token per six characters, Cyrillic and other non-ASCII words
+    about one per three, digits one per three, every symbol one. Estimates are
+    meant for budgeting, not for exact billing.
+    """
+
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        first = piece[0]
+        if first.isspace():
+            tokens += piece.count("\n")
+        elif first.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif first.isalpha():
+            tokens += math.ceil(len(piece) / 6) if piece.isascii() else math.ceil(len(piece) / 3)
+        else:
+            tokens += 1
+    return tokens
+
+
+def estimate_messages_tokens(messages: Iterable[dict[str, str]], estimator: TokenEstimator = estimate_tokens) -> int:
+    """Estimate of a chat request: message contents plus per-message overhead."""
+
+    return sum(estimator(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactedHistory:
+    """History cut down to a token budget."""
+
+    text: str
+    original_tokens: int
+    tokens: int
+    dropped_turns: int = 0
+    truncated_turns: int = 0
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def _truncate_to(text: str, budget: int, estimator: TokenEstimator) -> str:
+    """Longest prefix of ``text`` (cut at a word boundary) that fits ``budget`` with the marker."""
+
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimator(text[:middle] + TRUNCATED_MARKER) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    boundary = cut.rfind(" ")
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRUNCATED_MARKER if cut.strip() else ""
+
+
+def compact_history(history_text: str, budget_tokens: int, *, estimator: TokenEstimator = estimate_tokens) -> CompactedHistory:
+    """Keep the most recent turns of ``history_text`` within ``budget_tokens``.
+
+    Turns are non-empty lines. Turns are taken from the newest backwards
+    while they fit; the first turn that does not fit is truncated to the
+    remaining budget and all older turns are replaced with a short marker.
+    """
+
+    original_tokens = estimator(history_text)
+    if original_tokens <= budget_tokens:
+        return CompactedHistory(text=history_text, original_tokens=original_tokens, tokens=original_tokens)
+
+    turns = [line for line in history_text.splitlines() if line.strip()]
+    kept: list[str] = []
+    used = 0
+    truncated = 0
+    dropped = 0
+    for position in range(len(turns) - 1, -1, -1):
+        # Marker for the ``position`` older turns, if they do not fit either.
+        marker = estimator(OMITTED_MARKER.format(count=position)) + 1 if position else 0
+        separator = 1 if kept else 0
+        cost = estimator(turns[position]) + separator
+        if used + cost + marker <= budget_tokens:
+            kept.append(turns[position])
+            used += cost
+            continue
+
+        partial = _truncate_to(turns[position], budget_tokens - used - marker - separator, estimator)
+        if partial:
+            kept.append(partial)
+            truncated = 1
+        dropped = position if partial else position + 1
+        if dropped:
+            kept.append(OMITTED_MARKER.format(count=dropped))
+        break
+
+    text = "\n".join(reversed(kept))
+    return CompactedHistory(
+        text=text,
+        original_tokens=original_tokens,
+        tokens=estimator(text),
+        dropped_turns=dropped,
+        truncated_turns=truncated,
+    )
+
+
+__all__ = [
+    "CompactedHistory",
+    "TokenEstimator",
+    "compact_history",
+    "estimate_messages_tokens",
+    "estimate_tokens",
+]
@@ -0,0 +1,76 @@
+"""Per-scope accounting of token usage reported by the API."""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+@dataclass
+class UsageRecorder:
+    """Accumulates usage of every chat completion made inside :func:`track_usage`."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    requests: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts: int) -> None:
+        """Add arbitrary counters, e.g. ``add(prompt_tokens=10)``."""
+
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name, 0) + value)
+
+    def add_response(self, response: Any) -> None:
+        usage = getattr(response, "usage", None)
+        counts = {"requests": 1}
+        if usage is not None:
+            for name in USAGE_FIELDS:
+                counts[name] = int(getattr(usage, name, 0) or 0)
+            # Prompt tokens served from the provider's prefix cache, when reported.
+            cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            if cached:
+                counts["cached_tokens"] = int(cached)
+        self.add(**counts)
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {name: value for name, value in vars(self).items() if not name.startswith("_")}
+
+
+_current_recorder: ContextVar[UsageRecorder | None] = ContextVar("sgr_usage_recorder", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageRecorder]:
+    """Collect usage of all requests issued in the current context."""
+
+    recorder = UsageRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def current_recorder() -> UsageRecorder | None:
+    """Recorder of the innermost :func:`track_usage` scope, if any."""
+
+    return _current_recorder.get()
+
+
+def record_response_usage(response: Any) -> None:
+    """Add ``response.usage`` to the active recorder; no-op outside tracking."""
+
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add_response(response)
+
+
+__all__ = ["UsageRecorder", "current_recorder", "record_response_usage", "track_usage"]
@@ -1,3 +1,3 @@
 """Collections of ready-to-use pipelines grouped by domain."""
 
-__all__ = ["routing", "splitter"]
+__all__ = ["routing", "split_route", "splitter"]
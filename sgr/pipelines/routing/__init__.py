@@ -1,11 +1,21 @@
 """Routing pipelines and fixtures."""
 
-from .pipeline import Confidence, IssueCategory, OrderIssue, OrderIssuePipeline, build_query_prompt
+from .pipeline import (
+    Confidence,
+    IssueCategory,
+    OrderIssue,
+    OrderIssuePipeline,
+    build_cache_friendly_pipeline,
+    build_pipeline,
+    build_query_prompt,
+)
 
 __all__ = [
     "Confidence",
     "IssueCategory",
     "OrderIssue",
     "OrderIssuePipeline",
+    "build_cache_friendly_pipeline",
+    "build_pipeline",
     "build_query_prompt",
 ]
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Mapping, Optional, Sequence
 
 from pydantic import BaseModel, Field
 
 from models.pipeline import PromptTemplate, StructuredChatPipeline
-from sgr.llm import OpenAIClient
+from sgr.llm import LLMClientConfig, OpenAIClient
+from sgr.llm.tokens import compact_history
+from sgr.llm.usage import current_recorder
 
 
 class IssueCategory(str, Enum):
@@ -135,35 +137,131 @@ OrderIssue:
 """
 
 
-def build_query_prompt(review_text: str, history_text: str | None = None) -> str:
-    """Собирает промпт для анализа маршрутизации отзыва."""
+HISTORY_INSTRUCTIONS = (
+    "КОНТЕКСТ: Полная история диалога ниже для понимания ситуации. "
+    "Проанализируй текущую проблему пользователя, не дублируй ответы из истории."
+)
+
+CURRENT_MESSAGE_HEADER = "ТЕКУЩЕЕ СООБЩЕНИЕ ПОЛЬЗОВАТЕЛЯ:"
+
+CACHE_FRIENDLY_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + "\n## Если передана история диалога\n"
+    + HISTORY_INSTRUCTIONS
+    + f" История идёт после заголовка «ИСТОРИЯ:», само обращение — после «{CURRENT_MESSAGE_HEADER}».\n"
+)
+
+
+def build_query_prompt(review_text: str, history_text: str | None = None, *, cache_friendly: bool = False) -> str:
+    """Собирает промпт для анализа маршрутизации отзыва.
+
+    При ``cache_friendly=True`` статическая инструкция про историю не попадает
+    в сообщение пользователя — она уже есть в ``CACHE_FRIENDLY_SYSTEM_PROMPT``,
+    и сообщение содержит только динамические данные.
+    """
 
     if history_text:
-        return (
-            "КОНТЕКСТ: Полная история диалога ниже для понимания ситуации. "
-            "Проанализируй текущую проблему пользователя, не дублируй ответы из истории.\n\n"
-            f"ИСТОРИЯ:\n{history_text}\n\n"
-            f"ТЕКУЩЕЕ СООБЩЕНИЕ ПОЛЬЗОВАТЕЛЯ:\n{review_text}"
-        )
+        dynamic = f"ИСТОРИЯ:\n{history_text}\n\n{CURRENT_MESSAGE_HEADER}\n{review_text}"
+        return dynamic if cache_friendly else f"{HISTORY_INSTRUCTIONS}\n\n{dynamic}"
 
     return review_text
 
 
-class OrderIssuePipeline(StructuredChatPipeline):
-    """Пайплайн для извлечения информации о проблеме из пользовательского текста."""
+def _record_trimmed_history(tokens: int) -> None:
+    recorder = current_recorder()
+    if recorder is not None and tokens:
+        recorder.add(history_tokens_trimmed=tokens)
 
-    def __init__(self, client: OpenAIClient) -> None:
-        prompt = PromptTemplate(user="{query}", system=SYSTEM_PROMPT)
+
+class OrderIssuePipeline(StructuredChatPipeline):
+    """Пайплайн для извлечения информации о проблеме из пользовательского текста.
+
+    ``cache_friendly=True`` переносит все статические инструкции в системный
+    промпт, чтобы у всех запросов был один и тот же префикс независимо от
+    наличия истории: провайдеры с кэшем префикса тарифицируют его со скидкой.
+
+    ``history_token_budget`` ограничивает историю диалога примерным числом
+    токенов: последние реплики сохраняются целиком, более ранние обрезаются
+    или заменяются пометкой. Число срезанных токенов записывается в usage
+    кейса как ``history_tokens_trimmed``.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        cache_friendly: bool = False,
+        history_token_budget: int | None = None,
+    ) -> None:
+        if history_token_budget is not None and history_token_budget < 0:
+            msg = "history_token_budget must be non-negative"
+            raise ValueError(msg)
+        system = CACHE_FRIENDLY_SYSTEM_PROMPT if cache_friendly else SYSTEM_PROMPT
+        prompt = PromptTemplate(user="{query}", system=system)
         super().__init__(
             client=client,
             prompt=prompt,
             name="OrderIssuePipeline",
             response_model=OrderIssue,
         )
+        self.cache_friendly = cache_friendly
+        self.history_token_budget = history_token_budget
 
     def run(self, review_text: str, history_text: str | None = None) -> OrderIssue:
-        query = build_query_prompt(review_text, history_text)
-        return super().run(query=query)
+        params, trimmed = self._compacted_prompt_params(review_text, history_text)
+        _record_trimmed_history(trimmed)
+        return super().run(**params)
+
+    def run_samples(self, n: int, review_text: str, history_text: str | None = None) -> list[OrderIssue | Exception]:
+        params, trimmed = self._compacted_prompt_params(review_text, history_text)
+        _record_trimmed_history(trimmed)
+        return super().run_samples(n, **params)
+
+    def run_batch(self, items: Sequence[Mapping[str, Any]]) -> list[BaseModel | Exception]:
+        prepared = [self._compacted_prompt_params(**item) for item in items]
+        _record_trimmed_history(sum(trimmed for _, trimmed in prepared))
+        return self._run_prompt_batch([params for params, _ in prepared])
+
+    def _shared_user_prefix(self, content: str) -> str:
+        """История диалога (с инструкцией, если она не в системном промпте) — общая часть кейсов одного диалога."""
+
+        head, separator, _ = content.partition(CURRENT_MESSAGE_HEADER)
+        return head if separator else ""
+
+    def _prompt_params(self, review_text: str, history_text: str | None = None) -> dict[str, str]:
+        return self._compacted_prompt_params(review_text, history_text)[0]
+
+    def _compacted_prompt_params(
+        self, review_text: str, history_text: str | None = None
+    ) -> tuple[dict[str, str], int]:
+        """Плейсхолдеры промпта и число токенов, срезанных с истории по ``history_token_budget``."""
+
+        trimmed = 0
+        if history_text and self.history_token_budget is not None:
+            compacted = compact_history(history_text, self.history_token_budget)
+            history_text, trimmed = compacted.text, compacted.trimmed_tokens
+        return {"query": build_query_prompt(review_text, history_text, cache_friendly=self.cache_friendly)}, trimmed
+
+
+def build_pipeline(
+    client: OpenAIClient | None = None,
+    *,
+    cache_friendly: bool = False,
+    history_token_budget: int | None = None,
+) -> OrderIssuePipeline:
+    """Фабрика пайплайна для CLI и автообнаружения; без клиента берёт настройки из окружения."""
+
+    return OrderIssuePipeline(
+        client or OpenAIClient(LLMClientConfig.from_env()),
+        cache_friendly=cache_friendly,
+        history_token_budget=history_token_budget,
+    )
+
+
+def build_cache_friendly_pipeline(client: OpenAIClient | None = None) -> OrderIssuePipeline:
+    """Вариант :func:`build_pipeline` со стабильным префиксом для кэша промптов."""
+
+    return build_pipeline(client, cache_friendly=True)
 
 
 __all__ = [
@@ -171,6 +269,11 @@ __all__ = [
     "Confidence",
     "OrderIssue",
     "OrderIssuePipeline",
+    "CACHE_FRIENDLY_SYSTEM_PROMPT",
+    "CURRENT_MESSAGE_HEADER",
+    "HISTORY_INSTRUCTIONS",
     "SYSTEM_PROMPT",
+    "build_cache_friendly_pipeline",
+    "build_pipeline",
     "build_query_prompt",
 ]
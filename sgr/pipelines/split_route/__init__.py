@@ -0,0 +1,10 @@
+"""Composite split→route pipeline and fixtures."""
+
+from .pipeline import SplitRouteOutput, SplitRoutePipeline, build_pipeline, compare_routed_orders
+
+__all__ = [
+    "SplitRouteOutput",
+    "SplitRoutePipeline",
+    "build_pipeline",
+    "compare_routed_orders",
+]
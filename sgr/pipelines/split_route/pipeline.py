@@ -0,0 +1,103 @@
+"""Composite pipeline: split a conversation into orders, then route every order in parallel."""
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from models.composite import FanOutOutput, FanOutPipeline, StageCache
+from sgr.llm import LLMClientConfig, OpenAIClient
+from sgr.pipelines.routing.pipeline import OrderIssue, OrderIssuePipeline
+from sgr.pipelines.splitter.pipeline import ConversationSplit, ConversationSplitterPipeline, OrderContext
+
+
+class SplitRouteOutput(FanOutOutput):
+    split: ConversationSplit
+    outputs: List[Optional[OrderIssue]]
+
+
+def compare_routed_orders(actual: SplitRouteOutput | dict, expected: dict) -> bool:
+    """Сравнивает число заказов и для каждого заказа — категории и номер (если заданы).
+
+    Порядок заказов в ответе не важен: ожидаемые заказы сопоставляются с
+    найденными по номеру заказа, а без номера — по совпадению категорий.
+    """
+
+    if isinstance(actual, SplitRouteOutput):
+        routes = [route.model_dump(mode="json") if route is not None else None for route in actual.outputs]
+    elif isinstance(actual, dict):
+        routes = actual.get("outputs", [])
+    else:
+        return False
+
+    expected_orders = expected.get("orders", [])
+    if len(routes) != len(expected_orders) or any(route is None for route in routes):
+        return False
+
+    remaining = list(routes)
+    for order in expected_orders:
+        match = next((route for route in remaining if _route_matches(route, order)), None)
+        if match is None:
+            return False
+        remaining.remove(match)
+    return True
+
+
+def _route_matches(route: dict[str, Any], expected: dict[str, Any]) -> bool:
+    if "order_number" in expected and route.get("order_number") != expected["order_number"]:
+        return False
+    if "categories" in expected and set(route.get("categories", [])) != set(expected["categories"]):
+        return False
+    return True
+
+
+class SplitRoutePipeline(FanOutPipeline[OrderContext]):
+    """Сплиттер диалога и маршрутизация каждого выделенного заказа."""
+
+    default_comparator = staticmethod(compare_routed_orders)
+    comparators = {"routed_orders": staticmethod(compare_routed_orders)}
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        *,
+        max_workers: int = 8,
+        split_cache: StageCache | None = None,
+    ) -> None:
+        super().__init__(
+            splitter=ConversationSplitterPipeline(client),
+            mapper=OrderIssuePipeline(client),
+            split_items=_orders,
+            item_params=_route_params,
+            name="SplitRoutePipeline",
+            max_workers=max_workers,
+            split_cache=split_cache,
+            output_model=SplitRouteOutput,
+            client=client,
+        )
+
+    def run(self, message_text: str) -> SplitRouteOutput:
+        return super().run(message_text=message_text)
+
+
+def _orders(split: ConversationSplit) -> list[OrderContext]:
+    return split.orders
+
+
+def _route_params(order: OrderContext) -> dict[str, Any]:
+    return {"review_text": order.context_text}
+
+
+def build_pipeline(client: OpenAIClient | None = None, *, cache_splits: bool = False) -> SplitRoutePipeline:
+    """Фабрика пайплайна; ``cache_splits`` сохраняет ответы сплиттера между прогонами."""
+
+    return SplitRoutePipeline(
+        client or OpenAIClient(LLMClientConfig.from_env()),
+        split_cache=StageCache.default("split_route") if cache_splits else None,
+    )
+
+
+__all__ = [
+    "SplitRouteOutput",
+    "SplitRoutePipeline",
+    "build_pipeline",
+    "compare_routed_orders",
+]
@@ -5,6 +5,7 @@ from .pipeline import (
     ConversationSplitterPipeline,
     OrderContext,
     SPLITTER_PROMPT,
+    build_pipeline,
     compare_orders_and_flag,
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     "ConversationSplitterPipeline",
     "OrderContext",
     "SPLITTER_PROMPT",
+    "build_pipeline",
     "compare_orders_and_flag",
 ]
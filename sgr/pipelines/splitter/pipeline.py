@@ -6,7 +6,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from models.pipeline import PromptTemplate, StructuredChatPipeline
-from sgr.llm import OpenAIClient
+from sgr.llm import LLMClientConfig, OpenAIClient
 
 
 class OrderContext(BaseModel):
@@ -101,10 +101,17 @@ class ConversationSplitterPipeline(StructuredChatPipeline):
         return super().run(message_text=message_text)
 
 
+def build_pipeline(client: OpenAIClient | None = None) -> ConversationSplitterPipeline:
+    """Фабрика пайплайна для CLI и автообнаружения; без клиента берёт настройки из окружения."""
+
+    return ConversationSplitterPipeline(client or OpenAIClient(LLMClientConfig.from_env()))
+
+
 __all__ = [
     "ConversationSplit",
     "ConversationSplitterPipeline",
     "OrderContext",
     "SPLITTER_PROMPT",
+    "build_pipeline",
     "compare_orders_and_flag",
 ]
@@ -1,21 +1,84 @@
-"""Test runner utilities for SGR pipelines."""
+"""Test runner utilities for SGR pipelines.
+
+Names are imported on first access, so ``import sgr.testing.<module>``
+(e.g. the thin ``sgr-test submit`` client) does not pull in gradio, openai
+or pydantic.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cache import SuiteCache
+    from .discovery import DiscoveredSuite, discover_suites
+    from .models import RunSummary, TestCase, TestResult, TestRun
+    from .reports import load_report, save_report
+    from .runner import Pipeline, TestRunner, default_comparator
+    from .schema import TEST_CASES_JSON_SCHEMA, iter_test_cases, load_test_cases
+    from .selection import TestCaseIndex, parse_selector
+    from .ui import PipelineSuite, build_gradio_app, discovered_pipeline_suites, launch_gradio_app
+
+_EXPORTS = {
+    "SuiteCache": ".cache",
+    "DiscoveredSuite": ".discovery",
+    "discover_suites": ".discovery",
+    "RunSummary": ".models",
+    "TestCase": ".models",
+    "TestResult": ".models",
+    "TestRun": ".models",
+    "TEST_CASES_JSON_SCHEMA": ".schema",
+    "iter_test_cases": ".schema",
+    "load_test_cases": ".schema",
+    "load_report": ".reports",
+    "save_report": ".reports",
+    "TestCaseIndex": ".selection",
+    "parse_selector": ".selection",
+    "Pipeline": ".runner",
+    "TestRunner": ".runner",
+    "default_comparator": ".runner",
+    "PipelineSuite": ".ui",
+    "build_gradio_app": ".ui",
+    "discovered_pipeline_suites": ".ui",
+    "launch_gradio_app": ".ui",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
 
-from .models import RunSummary, TestCase, TestResult, TestRun
-from .schema import TEST_CASES_JSON_SCHEMA, load_test_cases
-from .runner import Pipeline, TestRunner, default_comparator
-from .ui import PipelineSuite, build_gradio_app, launch_gradio_app
 
 __all__ = [
+    "DiscoveredSuite",
+    "discover_suites",
     "Pipeline",
     "RunSummary",
+    "SuiteCache",
     "TestCase",
+    "TestCaseIndex",
     "TestResult",
     "TestRun",
     "TEST_CASES_JSON_SCHEMA",
+    "iter_test_cases",
+    "load_report",
     "load_test_cases",
+    "parse_selector",
+    "save_report",
     "TestRunner",
     "default_comparator",
     "PipelineSuite",
     "build_gradio_app",
+    "discovered_pipeline_suites",
     "launch_gradio_app",
 ]
@@ -0,0 +1,100 @@
+"""Token and cost budgets tracked live while cases finish."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Mapping
+
+from sgr.llm.pricing import ModelPrice, PriceTable, price_for
+
+TOKEN_BUDGET_STOP_REASON = "token_budget"
+COST_BUDGET_STOP_REASON = "cost_budget"
+
+
+class RunBudget:
+    """Maximum total tokens and/or estimated USD cost of one or several runs.
+
+    The runner charges the usage of every finished case and stops
+    scheduling new cases once :meth:`exhausted` returns a reason; cases
+    already in flight still finish, so the spend may overshoot by up to
+    ``max_workers`` cases. One budget can be shared by several runners
+    (e.g. all variants of a sweep); each charge is priced with the model of
+    the run it comes from, looked up in ``price_table``.
+    """
+
+    def __init__(
+        self,
+        *,
+        token_budget: int | None = None,
+        cost_budget: float | None = None,
+        price_table: PriceTable | None = None,
+    ) -> None:
+        for name, limit in (("token_budget", token_budget), ("cost_budget", cost_budget)):
+            if limit is not None and limit <= 0:
+                msg = f"{name} must be positive"
+                raise ValueError(msg)
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.price_table = price_table
+        self.cases = 0
+        self.tokens = 0
+        self.cost = 0.0
+        self.priced = True
+        self._lock = threading.Lock()
+
+    def price(self, model: str | None) -> ModelPrice | None:
+        """Price of ``model``; raises when a cost budget cannot be enforced for it."""
+
+        price = price_for(model, self.price_table)
+        if price is None and self.cost_budget is not None:
+            msg = f"No price for model '{model}' in the price table; cannot enforce the cost budget"
+            raise ValueError(msg)
+        return price
+
+    def charge(self, usage: Mapping[str, int] | None, price: ModelPrice | None) -> None:
+        with self._lock:
+            self.cases += 1
+            if not usage:
+                return
+            self.tokens += usage.get("total_tokens", 0)
+            if price is None:
+                self.priced = False
+            else:
+                self.cost += price.cost(usage)
+
+    def exhausted(self) -> str | None:
+        with self._lock:
+            if self.token_budget is not None and self.tokens >= self.token_budget:
+                return TOKEN_BUDGET_STOP_REASON
+            if self.cost_budget is not None and self.cost >= self.cost_budget:
+                return COST_BUDGET_STOP_REASON
+            return None
+
+    def projection(self, total_cases: int) -> dict[str, Any]:
+        """Spend so far and linear projection to ``total_cases`` cases."""
+
+        with self._lock:
+            scale = total_cases / self.cases if self.cases else 0.0
+            return {
+                "cases": self.cases,
+                "total_cases": total_cases,
+                "tokens": self.tokens,
+                "cost_usd": self.cost if self.priced else None,
+                "projected_tokens": round(self.tokens * scale),
+                "projected_cost_usd": self.cost * scale if self.priced else None,
+            }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Budget section of a report: limits, spend and the limit that was reached."""
+
+        exhausted = self.exhausted()
+        with self._lock:
+            return {
+                "token_budget": self.token_budget,
+                "cost_budget_usd": self.cost_budget,
+                "tokens": self.tokens,
+                "cost_usd": self.cost if self.priced else None,
+                "exhausted": exhausted,
+            }
+
+
+__all__ = ["COST_BUDGET_STOP_REASON", "TOKEN_BUDGET_STOP_REASON", "RunBudget"]
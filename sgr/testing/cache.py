@@ -0,0 +1,102 @@
+"""On-disk cache of validated test suites."""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .models import TestCase
+from .schema import load_test_cases
+
+CACHE_VERSION = 1
+CACHE_DIR_ENV = "SGR_TEST_CACHE_DIR"
+
+
+@dataclass(frozen=True, slots=True)
+class _SuiteKey:
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class SuiteCache:
+    """Cache validated test cases keyed by path, size, mtime and content hash.
+
+    Entries are stored as pickles, so loading an unchanged suite skips JSON
+    parsing and pydantic validation entirely. Any mismatch of the key (or an
+    unreadable entry) falls back to :func:`load_test_cases` and refreshes the
+    entry.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @classmethod
+    def default(cls) -> SuiteCache:
+        """Cache in ``$SGR_TEST_CACHE_DIR`` or ``~/.cache/sgr-test``."""
+
+        configured = os.environ.get(CACHE_DIR_ENV)
+        directory = Path(configured) if configured else Path.home() / ".cache" / "sgr-test"
+        return cls(directory)
+
+    def load(self, path: Path) -> list[TestCase]:
+        """Return test cases from ``path``, validating only on cache miss."""
+
+        data = path.read_bytes()
+        stat = path.stat()
+        key = _SuiteKey(
+            path=str(path.resolve()),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            digest=hashlib.blake2b(data, digest_size=20).hexdigest(),
+        )
+        entry_path = self._entry_path(key.path)
+
+        cached = self._read_entry(entry_path, key)
+        if cached is not None:
+            return cached
+
+        test_cases = load_test_cases(path)
+        self._write_entry(entry_path, key, test_cases)
+        return test_cases
+
+    def clear(self) -> None:
+        """Remove all cached suites."""
+
+        if not self.directory.exists():
+            return
+        for entry in self.directory.glob("*.suite.pickle"):
+            entry.unlink(missing_ok=True)
+
+    def _entry_path(self, resolved_path: str) -> Path:
+        name = hashlib.blake2b(resolved_path.encode("utf-8"), digest_size=16).hexdigest()
+        return self.directory / f"{name}.suite.pickle"
+
+    @staticmethod
+    def _read_entry(entry_path: Path, key: _SuiteKey) -> list[TestCase] | None:
+        try:
+            with entry_path.open("rb") as handle:
+                version, cached_key, test_cases = pickle.load(handle)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+        if version != CACHE_VERSION or cached_key != key:
+            return None
+        return test_cases
+
+    def _write_entry(self, entry_path: Path, key: _SuiteKey, test_cases: list[TestCase]) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as handle:
+                pickle.dump((CACHE_VERSION, key, test_cases), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, entry_path)
+        except OSError:
+            # A read-only or missing cache directory must never break loading.
+            return
+
+
+__all__ = ["CACHE_DIR_ENV", "SuiteCache"]
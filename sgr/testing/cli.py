@@ -2,40 +2,34 @@
 from __future__ import annotations
 
 import argparse
-import importlib
 import sys
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable, Sized
 
-from .models import TestRun
-from .schema import load_test_cases
-from .runner import Pipeline, TestRunner
+from sgr.llm.pricing import load_price_table
 
+from .budget import COST_BUDGET_STOP_REASON, TOKEN_BUDGET_STOP_REASON, RunBudget
+from .cache import SuiteCache
+from .compact import KEEP_OUTPUTS, OUTPUT_MODES
+from .diff import NEWLY_FAILING, diff_runs, format_diff
+from .discovery import PIPELINES_ROOT, DiscoveredSuite, discover_suites
+from .fingerprint import pipeline_fingerprint
+from .models import TestCase, TestResult, TestRun
+from .references import load_pipeline
+from .reports import latest_report, load_report, save_report, write_report
+from .rerun import fill_from_baseline, order_failed_first, select_changed, select_last_failed
+from .sampling import sampling_stats
+from .schema import is_jsonl, iter_test_cases
+from .selection import TestCaseIndex, filter_test_cases, parse_selector
+from .sequential import ABOVE, run_until_confident
+from .smoke import SmokeSample, smoke_sample, stratified_estimate
+from .strata import random_order, stratified_order
+from .sweep import SweepOutcome, format_comparison, load_sweep_config, run_sweep
+from .runner import DEADLINE_STOP_REASON, Pipeline, TestRunner
+from .work_queue import WorkQueue, run_worker
 
-def _load_pipeline(target: str) -> Pipeline:
-    """Load a pipeline object from ``module:attribute`` reference."""
-
-    if ":" not in target:
-        msg = "Pipeline should be provided as 'module:attribute'"
-        raise ValueError(msg)
-
-    module_name, attr = target.split(":", maxsplit=1)
-    module = importlib.import_module(module_name)
-    try:
-        pipeline_or_factory: Pipeline | Callable[[], Pipeline] = getattr(module, attr)
-    except AttributeError as exc:  # noqa: B904
-        msg = f"Attribute '{attr}' not found in module '{module_name}'"
-        raise ValueError(msg) from exc
-
-    pipeline: Pipeline = pipeline_or_factory() if callable(pipeline_or_factory) else pipeline_or_factory
-
-    if not hasattr(pipeline, "run"):
-        msg = "Pipeline object must define a 'run' method"
-        raise ValueError(msg)
-
-    return pipeline
 
 def _parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run pipeline test cases from CLI")
@@ -44,7 +38,177 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         required=True,
         help="Python reference to pipeline instance or factory in format module:attribute",
     )
-    parser.add_argument("--tests", type=Path, required=True, help="Path to JSON file with test cases")
+    parser.add_argument(
+        "--tests",
+        type=Path,
+        required=True,
+        help="Path to JSON or JSONL file with test cases (JSONL files are streamed case by case)",
+    )
+    parser.add_argument(
+        "--select",
+        help=(
+            "Run only matching cases, e.g. \"topic=logistics and locale=ru-RU\" or \"routing-*\". "
+            "Supports key=value, key!=value, id globs, and/or/not and parentheses."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-validate the JSON test file instead of using the validated suite cache",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of cases to run concurrently (results keep the input order)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("thread", "process"),
+        default="thread",
+        help=(
+            "Run cases on threads (network-bound pipelines) or on --workers processes that each build "
+            "their own pipeline from --pipeline (CPU-heavy pipelines and comparators)"
+        ),
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        metavar="PATH",
+        help=(
+            "Coordinate a distributed run: put the cases into the SQLite work queue at PATH and wait for "
+            "workers started with 'sgr-test worker --queue PATH'"
+        ),
+    )
+    parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="With --queue, cases of a worker that stops heartbeating for this long go back to the queue",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Sample every case N times (one request with n=N where the pipeline supports it) "
+            "and report pass@k, per-case pass rates and flaky cases; accuracy counts the first sample"
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        metavar="K",
+        help=(
+            "Pack K cases into one request for pipelines with run_batch (e.g. OrderIssuePipeline); "
+            "items the batch fails to answer are retried one by one"
+        ),
+    )
+    parser.add_argument(
+        "--group-by-prefix",
+        action="store_true",
+        help="Send cases whose prompts share a prefix back to back to improve provider prompt-cache hits",
+    )
+    parser.add_argument(
+        "--order",
+        choices=("input", "random", "stratified"),
+        default="input",
+        help="Order of cases: as in the file, shuffled, or interleaved proportionally across --stratify-by",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --order random/stratified and --smoke")
+    smoke_group = parser.add_mutually_exclusive_group()
+    smoke_group.add_argument(
+        "--smoke",
+        type=float,
+        metavar="FRACTION",
+        help="Run a stratified subset of the suite (e.g. 0.05) and report a weighted accuracy estimate",
+    )
+    smoke_group.add_argument(
+        "--smoke-size",
+        type=int,
+        metavar="N",
+        help="Like --smoke, with the subset size given as a number of cases",
+    )
+    parser.add_argument(
+        "--stratify-by",
+        default="topic",
+        metavar="KEY",
+        help="Metadata key (or expected.<field>, e.g. expected.categories) used for stratification",
+    )
+    parser.add_argument(
+        "--stop-when-confident",
+        type=float,
+        metavar="THRESHOLD",
+        help=(
+            "Stop as soon as the Wilson interval on accuracy is entirely above or below THRESHOLD; "
+            "exit code is 0 only when accuracy is confidently above it"
+        ),
+    )
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level for --stop-when-confident")
+    parser.add_argument(
+        "--min-cases",
+        type=int,
+        default=30,
+        help="Minimum number of cases before --stop-when-confident may stop",
+    )
+    parser.add_argument(
+        "--case-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Wall-clock limit per case including retries; a case over it fails with a timeout error",
+    )
+    parser.add_argument(
+        "--run-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Deadline for the whole run: running cases are cut short and no new cases start",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Stop starting new cases once finished cases used this many total tokens",
+    )
+    parser.add_argument(
+        "--cost-budget",
+        type=float,
+        metavar="USD",
+        help="Stop starting new cases once the estimated cost of finished cases reaches this amount",
+    )
+    parser.add_argument(
+        "--price-table",
+        type=Path,
+        help="JSON price table {model: {input, output, cached_input}} in USD per 1M tokens (extends built-in prices)",
+    )
+    parser.add_argument(
+        "--project-after",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Print spend so far and projected totals after the first N finished cases (0 disables)",
+    )
+    parser.add_argument(
+        "--compact-results",
+        action="store_true",
+        help="Keep finished results in compact columns instead of objects (suites with 100k+ cases)",
+    )
+    parser.add_argument(
+        "--outputs",
+        choices=OUTPUT_MODES,
+        default=KEEP_OUTPUTS,
+        help=(
+            "Keep outputs in memory, only for failed cases, or spill them to a temporary file "
+            "(anything but 'keep' implies --compact-results)"
+        ),
+    )
+    parser.add_argument(
+        "--spill-dir",
+        type=Path,
+        help="Directory for the --outputs spill file (system temp by default)",
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -58,39 +222,535 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
             "Directory will be created if it does not exist."
         ),
     )
-    return parser.parse_args(argv)
+    rerun_group = parser.add_mutually_exclusive_group()
+    rerun_group.add_argument(
+        "--last-failed",
+        action="store_true",
+        help="Run only cases that failed (or were missing) in the baseline report",
+    )
+    rerun_group.add_argument(
+        "--failed-first",
+        action="store_true",
+        help="Run all cases, starting with the ones that failed in the baseline report",
+    )
+    rerun_group.add_argument(
+        "--changed-since",
+        type=Path,
+        metavar="REPORT",
+        help=(
+            "Run only cases whose params/expected_output changed since REPORT; "
+            "a changed pipeline prompt/model fingerprint reruns everything"
+        ),
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        metavar="REPORT",
+        help="Baseline report for --last-failed/--failed-first (defaults to the latest one in --report-dir)",
+    )
+    parser.add_argument(
+        "--fill-from-previous",
+        action="store_true",
+        help="Copy results of cases that were not rerun from the baseline report, producing a full report",
+    )
+    args = parser.parse_args(argv)
+    if args.queue and args.backend == "process":
+        parser.error("--queue runs cases on queue workers and cannot be combined with --backend process")
+    return args
 
 
-def main(argv: list[str] | None = None) -> int:
-    args = _parse_args(argv or sys.argv[1:])
+def _resolve_baseline(args: argparse.Namespace, pipeline: Pipeline) -> TestRun | None:
+    if args.changed_since:
+        return load_report(args.changed_since)
+    if not (args.last_failed or args.failed_first or args.fill_from_previous):
+        return None
+    if args.baseline:
+        return load_report(args.baseline)
+
+    pipeline_name = getattr(pipeline, "name", pipeline.__class__.__name__)
+    report_path = latest_report(args.report_dir, pipeline_name) if args.report_dir else None
+    if report_path is None:
+        msg = "No baseline report found: pass --baseline or a --report-dir with previous reports"
+        raise ValueError(msg)
+    return load_report(report_path)
 
-    pipeline = _load_pipeline(args.pipeline)
-    test_cases = load_test_cases(args.tests)
 
-    runner = TestRunner()
-    test_run = runner.run(pipeline=pipeline, test_cases=test_cases)
+def _format_spend(tokens: int, cost: float | None) -> str:
+    return f"{tokens} tokens" + (f", ${cost:.4f}" if cost is not None else "")
 
+
+def _projection_printer(
+    budget: RunBudget, total_cases: int | None, after: int
+) -> Callable[[TestResult], None] | None:
+    """``on_result`` callback printing the spend projection once ``after`` cases finished."""
+
+    if after <= 0:
+        return None
+
+    def _on_result(result: TestResult) -> None:
+        projection = budget.projection(total_cases or 0)
+        if projection["cases"] != after:
+            return
+        line = f"Spend after {after} cases: {_format_spend(projection['tokens'], projection['cost_usd'])}"
+        if total_cases:
+            projected = _format_spend(projection["projected_tokens"], projection["projected_cost_usd"])
+            line += f" | projected for {total_cases} cases: {projected}"
+        print(line, flush=True)
+
+    return _on_result
+
+
+def _print_summary(test_run: TestRun) -> None:
     summary = test_run.summary
     print(f"Pipeline: {test_run.pipeline_name}")
-    print(f"Total: {summary.total} | Passed: {summary.passed} | Failed: {summary.failed}")
-    print(f"Accuracy: {summary.accuracy:.0%} | Duration: {test_run.duration_seconds:.2f}s")
+    stats = sampling_stats(test_run.results)
+    # With --repeat, passed/failed and accuracy count the first sample of every case.
+    basis = " (first sample of each case)" if stats is not None else ""
+    print(f"Total: {summary.total} | Passed: {summary.passed} | Failed: {summary.failed}{basis}")
+    print(f"Accuracy: {summary.accuracy:.0%}{basis} | Duration: {test_run.duration_seconds:.2f}s")
+    usage = test_run.usage
+    if usage:
+        print(
+            f"Tokens: {usage.get('total_tokens', 0)} "
+            f"(prompt {usage.get('prompt_tokens', 0)}, completion {usage.get('completion_tokens', 0)})"
+        )
+        hit_ratio = test_run.prompt_cache_hit_ratio
+        if hit_ratio is not None:
+            print(f"Prompt cache: {usage.get('cached_tokens', 0)} cached prompt tokens ({hit_ratio:.1%} hit ratio)")
+        if usage.get("hedged_requests"):
+            print(f"Hedged requests: {usage['hedged_requests']} sent, {usage.get('hedge_wins', 0)} won")
+        if usage.get("history_tokens_trimmed"):
+            print(f"History trimmed: ~{usage['history_tokens_trimmed']} tokens")
+    for endpoint in test_run.model_parameters.get("endpoints") or []:
+        if "requests" in endpoint:
+            print(
+                f"Endpoint {endpoint['name']}: {endpoint['requests']} requests, {endpoint['failures']} failures, "
+                f"mean latency {endpoint['mean_latency_seconds']:.3f}s{'' if endpoint['healthy'] else ' (unhealthy)'}"
+            )
+    budget = test_run.budget
+    if budget is not None and (budget["token_budget"] or budget["cost_budget_usd"] or budget["cost_usd"] is not None):
+        line = f"Spend: {_format_spend(budget['tokens'], budget['cost_usd'])}"
+        limits = [f"{budget['token_budget']} tokens"] if budget["token_budget"] else []
+        if budget["cost_budget_usd"]:
+            limits.append(f"${budget['cost_budget_usd']:g}")
+        if limits:
+            line += f" of budget {' / '.join(limits)}"
+        if budget["exhausted"]:
+            line += f" (exhausted: {budget['exhausted']})"
+        print(line)
+    if test_run.estimate is not None:
+        _print_estimate(test_run.estimate)
+    if stats is not None:
+        estimates = ", ".join(f"pass@{k}={value:.2%}" for k, value in stats.pass_at_k.items())
+        print(
+            f"Samples per case: {stats.samples_per_case} | {estimates} | "
+            f"Mean pass rate (all samples): {stats.mean_pass_rate:.2%}"
+        )
+        flaky = stats.flaky
+        if flaky:
+            print(f"Flaky cases ({len(flaky)}):")
+            for case in sorted(flaky, key=lambda case: case.pass_rate)[:20]:
+                print(f"  {case.id}: {case.passed}/{case.samples}")
+            if len(flaky) > 20:
+                print(f"  ... and {len(flaky) - 20} more")
+
+
+def _print_estimate(estimate: dict) -> None:
+    if estimate.get("method") == "sequential_wilson":
+        low, high = estimate["interval"]
+        print(
+            f"Estimate: {estimate['accuracy']:.2%} "
+            f"[{low:.2%}, {high:.2%}] at {estimate['confidence']:.0%} confidence, "
+            f"{estimate['decision']} threshold {estimate['threshold']:.2%}"
+        )
+        print(
+            f"Evaluated {estimate['evaluated']} of {estimate['suite_size']} cases; "
+            f"saved ~{estimate['requests_saved_estimate']} requests, ~{estimate['tokens_saved_estimate']} tokens"
+        )
+    elif estimate.get("method") == "stratified":
+        low, high = estimate["interval"]
+        print(
+            f"Weighted estimate: {estimate['accuracy']:.2%} [{low:.2%}, {high:.2%}] "
+            f"from {estimate['evaluated']} of {estimate['suite_size']} cases"
+        )
+        for stratum, stats in estimate["strata"].items():
+            accuracy = f"{stats['accuracy']:.0%}" if stats["accuracy"] is not None else "-"
+            print(
+                f"  {estimate['key']}={stratum}: {stats['passed']}/{stats['total']} = {accuracy} "
+                f"(of {stats['population']})"
+            )
+
+
+def _parse_run_all_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="sgr-test run-all",
+        description="Discover pipeline packages and run all their suites in parallel",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=PIPELINES_ROOT,
+        help="Directory with pipeline packages (defaults to sgr/pipelines)",
+    )
+    parser.add_argument(
+        "--package",
+        default="sgr.pipelines",
+        help="Importable package name that corresponds to --root",
+    )
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Run only suites with these package names")
+    parser.add_argument("--select", help="Selector expression applied to every suite")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of suites to run concurrently")
+    parser.add_argument("--no-cache", action="store_true", help="Re-validate test files instead of using the cache")
+    parser.add_argument("--no-report", action="store_true", help="Do not write reports into each suite's reports/")
+    return parser.parse_args(argv)
+
+
+def _run_discovered_suite(suite: DiscoveredSuite, args: argparse.Namespace) -> TestRun:
+    test_cases = suite.load_test_cases(None if args.no_cache else SuiteCache.default())
+    if args.select:
+        test_cases = TestCaseIndex(test_cases).select(args.select)
+    return TestRunner().run(pipeline=suite.pipeline.load(), test_cases=test_cases)
+
+
+def run_all(argv: list[str]) -> int:
+    """Entry point of ``sgr-test run-all``."""
+
+    args = _parse_run_all_args(argv)
+    if args.select:
+        parse_selector(args.select)
+
+    suites = discover_suites(args.root, package=args.package)
+    if args.only:
+        suites = [suite for suite in suites if suite.name in set(args.only)]
+    if not suites:
+        print(f"No pipeline suites found under {args.root}")
+        return 1
 
-    serialized_run = json.dumps(test_run.to_dict(), ensure_ascii=False, indent=2)
+    exit_code = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {executor.submit(_run_discovered_suite, suite, args): suite for suite in suites}
+        for future in as_completed(futures):
+            suite = futures[future]
+            try:
+                test_run = future.result()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[{suite.name}] failed to run: {exc}")
+                exit_code = 1
+                continue
+
+            print(f"[{suite.name}]")
+            _print_summary(test_run)
+            if not args.no_report:
+                report_path = save_report(test_run, suite.reports_dir)
+                print(f"Report saved to {report_path}")
+            if test_run.summary.failed:
+                exit_code = 1
+
+    return exit_code
+
+
+def diff(argv: list[str]) -> int:
+    """Entry point of ``sgr-test diff``."""
+
+    parser = argparse.ArgumentParser(prog="sgr-test diff", description="Compare two JSON run reports case by case")
+    parser.add_argument("baseline", type=Path, help="Baseline report (A)")
+    parser.add_argument("candidate", type=Path, help="Candidate report (B)")
+    parser.add_argument("--limit", type=int, default=20, help="How many flipped cases to list per group")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with code 1 when any case passes in A and fails in B",
+    )
+    args = parser.parse_args(argv)
+
+    run_diff = diff_runs(load_report(args.baseline), load_report(args.candidate))
+    print(format_diff(run_diff, limit=args.limit))
+    if args.fail_on_regression and run_diff.counts[NEWLY_FAILING]:
+        return 1
+    return 0
+
+
+def worker(argv: list[str]) -> int:
+    """Entry point of ``sgr-test worker``."""
+
+    parser = argparse.ArgumentParser(
+        prog="sgr-test worker",
+        description="Lease cases from a work queue, run them and push the results back to the coordinator",
+    )
+    parser.add_argument("--queue", type=Path, required=True, metavar="PATH", help="SQLite work queue of the run")
+    parser.add_argument(
+        "--pipeline",
+        help="Pipeline reference module:attribute (defaults to the one the coordinator runs)",
+    )
+    parser.add_argument("--worker-id", help="Name of this worker in leases (defaults to host-pid)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of cases this worker runs at once")
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="How long to wait for the coordinator to create the run",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        finished = run_worker(
+            WorkQueue(args.queue),
+            args.pipeline,
+            worker_id=args.worker_id,
+            concurrency=args.concurrency,
+            wait=args.wait,
+        )
+    except (TimeoutError, ValueError) as exc:
+        print(f"Worker stopped: {exc}")
+        return 1
+    print(f"Worker finished {finished} cases")
+    return 0
+
+
+def sweep(argv: list[str]) -> int:
+    """Entry point of ``sgr-test sweep``."""
+
+    parser = argparse.ArgumentParser(
+        prog="sgr-test sweep",
+        description="Run one suite against a matrix of models and request parameters",
+    )
+    parser.add_argument("config", type=Path, help="Sweep JSON config (pipeline factory, tests, matrix)")
+    parser.add_argument("--report-dir", type=Path, help="Directory for per-variant reports (overrides the config)")
+    parser.add_argument("--workers", type=int, help="Shared number of in-flight cases (overrides the config)")
+    parser.add_argument("--rpm", type=float, help="Shared requests-per-minute limit (overrides the config)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-validate the test file instead of using the cache")
+    parser.add_argument("--no-report", action="store_true", help="Do not write per-variant reports")
+    args = parser.parse_args(argv)
+
+    config = load_sweep_config(args.config)
+    if args.report_dir:
+        config.report_dir = args.report_dir
+    if args.workers:
+        config.max_workers = args.workers
+    if args.rpm:
+        config.requests_per_minute = args.rpm
+
+    def _announce(outcome: SweepOutcome) -> None:
+        if outcome.error is not None:
+            print(f"[{outcome.variant.name}] failed: {outcome.error}")
+            return
+        summary = outcome.test_run.summary
+        print(f"[{outcome.variant.name}] {summary.passed}/{summary.total} passed")
+        if outcome.report_path is not None:
+            print(f"Report saved to {outcome.report_path}")
+
+    outcomes = run_sweep(
+        config,
+        cache=None if args.no_cache else SuiteCache.default(),
+        save_reports=not args.no_report,
+        on_finished=_announce,
+    )
+    table = format_comparison(outcomes)
+    print()
+    print(table)
+    if config.report_dir is not None and not args.no_report:
+        table_path = config.report_dir / f"sweep-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.md"
+        table_path.write_text(table + "\n")
+        print(f"Comparison saved to {table_path}")
+    return 1 if any(outcome.error is not None for outcome in outcomes) else 0
+
+
+def serve(argv: list[str]) -> int:
+    """Entry point of ``sgr-test serve``."""
+
+    parser = argparse.ArgumentParser(
+        prog="sgr-test serve",
+        description=(
+            "Keep pipelines, HTTP clients and parsed suites warm in a local daemon; "
+            "submit runs to it with 'sgr-test submit <run arguments>'"
+        ),
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (localhost by default)")
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (a free one by default)")
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        help="Where to write the address and token for clients (defaults to daemon.json in the cache directory)",
+    )
+    args = parser.parse_args(argv)
+
+    from .daemon import RunnerDaemon, WarmPipelines, WarmSuiteCache
+    from .entry import daemon_state_path
+
+    pipelines = WarmPipelines()
+    suites = WarmSuiteCache(SuiteCache.default().directory)
+
+    def _handle(run_argv: list[str]) -> int:
+        if run_argv and run_argv[0] in ("serve", "submit"):
+            print(f"'{run_argv[0]}' cannot be run inside the daemon")
+            return 2
+        return _dispatch(run_argv, load=pipelines.load, cache=suites)
+
+    daemon = RunnerDaemon(
+        _handle,
+        args.state_file or daemon_state_path(),
+        host=args.host,
+        port=args.port,
+        status=lambda: {"pipelines": pipelines.references(), "suites": suites.size()},
+    )
+    host, port = daemon.address
+    print(f"sgr-test daemon listening on {host}:{port} (state in {daemon.state_path}); Ctrl+C to stop", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def submit(argv: list[str]) -> int:
+    """Entry point of ``sgr-test submit`` (see :mod:`sgr.testing.entry`)."""
+
+    from .entry import submit as submit_run
+
+    return submit_run(argv)
+
+
+_SUBCOMMANDS = {
+    "run-all": run_all,
+    "diff": diff,
+    "sweep": sweep,
+    "worker": worker,
+    "serve": serve,
+    "submit": submit,
+}
+
+
+def _dispatch(
+    argv: list[str], *, load: Callable[[str], Pipeline] = load_pipeline, cache: SuiteCache | None = None
+) -> int:
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+    if argv and argv[0] == "run":
+        argv = argv[1:]
+    return run(argv, load=load, cache=cache)
+
+
+def run(argv: list[str], *, load: Callable[[str], Pipeline] = load_pipeline, cache: SuiteCache | None = None) -> int:
+    """Entry point of ``sgr-test [run]``.
+
+    ``load`` and ``cache`` let the daemon (``sgr-test serve``) reuse warm
+    pipelines and parsed suites.
+    """
+
+    args = _parse_args(argv)
+
+    selector = parse_selector(args.select) if args.select else None
+    pipeline = load(args.pipeline)
+    test_cases: Iterable[TestCase]
+    if args.no_cache or is_jsonl(args.tests):
+        test_cases = iter_test_cases(args.tests)
+        if selector is not None:
+            test_cases = filter_test_cases(test_cases, selector)
+    else:
+        test_cases = (cache if cache is not None else SuiteCache.default()).load(args.tests)
+        if selector is not None:
+            test_cases = TestCaseIndex(test_cases).select(selector)
+
+    baseline = _resolve_baseline(args, pipeline)
+    suite_cases: list[TestCase] = []
+    if baseline is not None:
+        suite_cases = list(test_cases)
+        if args.last_failed:
+            # Passed cases that cannot be copied into a full report are rerun as well.
+            fingerprint = pipeline_fingerprint(pipeline) if args.fill_from_previous else None
+            test_cases = select_last_failed(suite_cases, baseline, pipeline_fingerprint=fingerprint)
+        elif args.failed_first:
+            test_cases = order_failed_first(suite_cases, baseline)
+        elif args.changed_since:
+            test_cases = select_changed(
+                suite_cases, baseline, pipeline_fingerprint=pipeline_fingerprint(pipeline)
+            )
+        else:
+            test_cases = suite_cases
+        print(f"Selected {len(test_cases)} of {len(suite_cases)} cases using the baseline report")
+
+    sample: SmokeSample | None = None
+    if args.smoke is not None or args.smoke_size is not None:
+        sample = smoke_sample(
+            list(test_cases), args.stratify_by, fraction=args.smoke, size=args.smoke_size, seed=args.seed
+        )
+        test_cases = sample.cases
+        print(
+            f"Smoke subset: {len(sample.cases)} of {sample.suite_size} cases "
+            f"across {len(sample.population)} strata of '{args.stratify_by}'"
+        )
+
+    if args.order == "random":
+        test_cases = random_order(list(test_cases), args.seed)
+    elif args.order == "stratified":
+        test_cases = stratified_order(list(test_cases), args.stratify_by, args.seed)
+
+    budget = RunBudget(
+        token_budget=args.token_budget,
+        cost_budget=args.cost_budget,
+        price_table=load_price_table(args.price_table) if args.price_table else None,
+    )
+    runner = TestRunner(
+        max_workers=max(1, args.workers),
+        repeat=max(1, args.repeat),
+        batch_size=max(1, args.batch_size),
+        group_by_prefix=args.group_by_prefix,
+        case_timeout=args.case_timeout,
+        run_timeout=args.run_timeout,
+        budget=budget,
+        backend="queue" if args.queue else args.backend,
+        queue=args.queue,
+        lease_timeout=args.lease_timeout,
+        compact=args.compact_results,
+        outputs=args.outputs,
+        spill_dir=args.spill_dir,
+    )
+    # The process and queue backends ship the reference to their workers instead of the loaded pipeline.
+    target: Pipeline | str = args.pipeline if args.queue or args.backend == "process" else pipeline
+    if args.queue:
+        print(f"Queueing cases in {args.queue}; start workers with: sgr-test worker --queue {args.queue}", flush=True)
+    total_cases = len(test_cases) if isinstance(test_cases, Sized) else None
+    on_result = _projection_printer(budget, total_cases, args.project_after)
+    if args.stop_when_confident is not None:
+        test_run = run_until_confident(
+            runner,
+            target,  # type: ignore[arg-type]
+            list(test_cases),
+            threshold=args.stop_when_confident,
+            confidence=args.confidence,
+            min_cases=args.min_cases,
+            on_result=on_result,
+        )
+    else:
+        test_run = runner.run(pipeline=target, test_cases=test_cases, on_result=on_result)
+    if sample is not None and test_run.estimate is None:
+        test_run.estimate = stratified_estimate(test_run, sample, confidence=args.confidence)
+    if baseline is not None and args.fill_from_previous:
+        test_run = fill_from_baseline(test_run, suite_cases, baseline)
+
+    summary = test_run.summary
+    _print_summary(test_run)
 
     if args.output:
-        args.output.write_text(serialized_run)
+        write_report(test_run, args.output)
         print(f"Report saved to {args.output}")
 
     if args.report_dir:
-        args.report_dir.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-        pipeline_slug = test_run.pipeline_name.replace(" ", "_")
-        report_path = args.report_dir / f"{pipeline_slug}-{timestamp}.json"
-        report_path.write_text(serialized_run)
+        report_path = save_report(test_run, args.report_dir)
         print(f"Report saved to {report_path}")
 
+    if test_run.stop_reason in (DEADLINE_STOP_REASON, TOKEN_BUDGET_STOP_REASON, COST_BUDGET_STOP_REASON):
+        print(f"Run stopped early ({test_run.stop_reason}): {len(test_run.results)} cases finished")
+        return 1
+    if test_run.estimate is not None and test_run.estimate.get("method") == "sequential_wilson":
+        return 0 if test_run.estimate["decision"] == ABOVE else 1
     return 0 if summary.failed == 0 else 1
 
 
+def main(argv: list[str] | None = None) -> int:
+    return _dispatch(sys.argv[1:] if argv is None else argv)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,270 @@
+"""Columnar storage of run results for suites with hundreds of thousands of cases."""
+from __future__ import annotations
+
+import pickle
+import tempfile
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional, Sequence, overload
+
+from .models import SampleResult, TestResult
+
+KEEP_OUTPUTS = "keep"
+FAILED_OUTPUTS = "failed"
+SPILL_OUTPUTS = "spill"
+OUTPUT_MODES = (KEEP_OUTPUTS, FAILED_OUTPUTS, SPILL_OUTPUTS)
+
+_EPOCH = datetime(1970, 1, 1)
+_HASH_BYTES = 16
+
+# output, expected output and sample outputs of one result
+_Record = tuple[Any, Any, Optional[tuple[Any, ...]]]
+
+
+def _to_micros(moment: datetime) -> int:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = moment - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class _SpillFile:
+    """Append-only temporary file of pickled records, shared by permuted views."""
+
+    def __init__(self, directory: Path | None) -> None:
+        self._handle: IO[bytes] = tempfile.TemporaryFile(dir=directory, prefix="sgr-test-outputs-")
+        self._lock = threading.Lock()
+
+    def write(self, record: _Record) -> int:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._handle.seek(0, 2)
+            offset = self._handle.tell()
+            self._handle.write(payload)
+        return offset
+
+    def read(self, offset: int) -> _Record:
+        with self._lock:
+            self._handle.seek(offset)
+            return pickle.load(self._handle)
+
+
+class CompactResults(Sequence[TestResult]):
+    """Read-only sequence of :class:`TestResult` backed by compact columns.
+
+    Ids, pass flags, timestamps (microseconds), case hashes (raw digests)
+    and usage counters live in flat arrays; errors and samples are stored
+    only for the results that have them. :class:`TestResult` objects are
+    rebuilt on access, so code that iterates ``TestRun.results`` and the
+    reports work unchanged.
+
+    ``outputs`` decides what happens to outputs and expected outputs:
+    ``"keep"`` holds them in memory, ``"failed"`` keeps them only for
+    failed cases and failed samples (passed cases report ``null``), and
+    ``"spill"`` pickles them to a temporary file in ``spill_dir`` that is
+    read back on access and removed with the object.
+    """
+
+    def __init__(
+        self,
+        results: Iterable[TestResult] = (),
+        *,
+        outputs: str = KEEP_OUTPUTS,
+        spill_dir: Path | None = None,
+    ) -> None:
+        if outputs not in OUTPUT_MODES:
+            msg = f"Unknown outputs mode '{outputs}', expected one of {', '.join(OUTPUT_MODES)}"
+            raise ValueError(msg)
+        self.outputs = outputs
+        self._spill = _SpillFile(spill_dir) if outputs == SPILL_OUTPUTS else None
+        self._ids: list[str] = []
+        self._passed = bytearray()
+        self._started = array("q")
+        self._ended = array("q")
+        self._hashes = bytearray()
+        self._odd_hashes: dict[int, Optional[str]] = {}
+        self._errors: dict[int, str] = {}
+        self._usage_names: dict[str, array] = {}
+        # Index into ``_usage_keys`` per result: which counters the usage dict had, in order (0 is no usage).
+        self._usage_key_ids = array("H")
+        self._usage_keys: list[Optional[tuple[str, ...]]] = [None]
+        self._samples: dict[int, tuple[tuple[bool, Optional[str]], ...]] = {}
+        self._records: list[Optional[_Record]] = []
+        self._offsets = array("q")
+        for result in results:
+            self.append(result)
+
+    def append(self, result: TestResult) -> None:
+        position = len(self._ids)
+        self._ids.append(result.id)
+        self._passed.append(bool(result.passed))
+        self._started.append(_to_micros(result.started_at))
+        self._ended.append(_to_micros(result.ended_at))
+        self._append_hash(position, result.case_hash)
+        if result.error is not None:
+            self._errors[position] = result.error
+        self._append_usage(result.usage)
+        if result.samples is not None:
+            self._samples[position] = tuple((sample.passed, sample.error) for sample in result.samples)
+        self._append_record(self._record(result))
+
+    def _append_hash(self, position: int, case_hash: str | None) -> None:
+        try:
+            digest = bytes.fromhex(case_hash) if case_hash is not None else b""
+        except ValueError:
+            digest = b""
+        if len(digest) != _HASH_BYTES or digest.hex() != case_hash:
+            self._odd_hashes[position] = case_hash
+            digest = bytes(_HASH_BYTES)
+        self._hashes.extend(digest)
+
+    def _append_usage(self, usage: dict[str, int] | None) -> None:
+        count = len(self._usage_key_ids)
+        keys = tuple(usage) if usage is not None else None
+        try:
+            key_id = self._usage_keys.index(keys)
+        except ValueError:
+            key_id = len(self._usage_keys)
+            self._usage_keys.append(keys)
+        self._usage_key_ids.append(key_id)
+        for name, value in (usage or {}).items():
+            column = self._usage_names.get(name)
+            if column is None:
+                column = self._usage_names[name] = array("q", bytes(8 * count))
+            column.append(value)
+        for column in self._usage_names.values():
+            if len(column) == count:
+                column.append(0)
+
+    def _record(self, result: TestResult) -> _Record | None:
+        sample_outputs = tuple(sample.output for sample in result.samples) if result.samples is not None else None
+        if self.outputs != FAILED_OUTPUTS or not result.passed:
+            return result.output, result.expected_output, sample_outputs
+        if not result.samples or all(sample.passed for sample in result.samples):
+            return None
+        # A passed case keeps the outputs of its failed samples (flaky cases are worth a look).
+        kept = tuple(None if sample.passed else sample.output for sample in result.samples)
+        return None, None, kept
+
+    def _append_record(self, record: _Record | None) -> None:
+        if self._spill is None:
+            self._records.append(record)
+        else:
+            self._offsets.append(-1 if record is None else self._spill.write(record))
+
+    def _load_record(self, position: int) -> _Record | None:
+        if self._spill is None:
+            return self._records[position]
+        offset = self._offsets[position]
+        return None if offset < 0 else self._spill.read(offset)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @overload
+    def __getitem__(self, index: int) -> TestResult: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TestResult]: ...
+
+    def __getitem__(self, index: int | slice) -> TestResult | list[TestResult]:
+        if isinstance(index, slice):
+            return [self._build(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return self._build(index)
+
+    def __iter__(self) -> Iterator[TestResult]:
+        for position in range(len(self)):
+            yield self._build(position)
+
+    def _build(self, position: int) -> TestResult:
+        record = self._load_record(position)
+        output, expected_output, sample_outputs = record if record is not None else (None, None, None)
+        samples = None
+        flags = self._samples.get(position)
+        if flags is not None:
+            samples = [
+                SampleResult(passed=passed, output=sample_outputs[number] if sample_outputs else None, error=error)
+                for number, (passed, error) in enumerate(flags)
+            ]
+        return TestResult(
+            id=self._ids[position],
+            passed=bool(self._passed[position]),
+            output=output,
+            expected_output=expected_output,
+            started_at=_from_micros(self._started[position]),
+            ended_at=_from_micros(self._ended[position]),
+            error=self._errors.get(position),
+            case_hash=self._case_hash(position),
+            usage=self._usage(position),
+            samples=samples,
+        )
+
+    def _case_hash(self, position: int) -> str | None:
+        if position in self._odd_hashes:
+            return self._odd_hashes[position]
+        return self._hashes[position * _HASH_BYTES : (position + 1) * _HASH_BYTES].hex()
+
+    def _usage(self, position: int) -> dict[str, int] | None:
+        keys = self._usage_keys[self._usage_key_ids[position]]
+        if keys is None:
+            return None
+        return {name: self._usage_names[name][position] for name in keys}
+
+    def passed_count(self) -> int:
+        """Number of passed results, without rebuilding them."""
+
+        return self._passed.count(1)
+
+    def usage_totals(self) -> dict[str, int]:
+        """Usage counters summed over all results, without rebuilding them."""
+
+        return {name: sum(column) for name, column in self._usage_names.items()}
+
+    def permuted(self, order: Sequence[int]) -> CompactResults:
+        """Results in the order of ``order`` (positions); spilled outputs are shared, not copied."""
+
+        view = CompactResults.__new__(CompactResults)
+        view.outputs = self.outputs
+        view._spill = self._spill
+        view._ids = [self._ids[position] for position in order]
+        view._passed = bytearray(self._passed[position] for position in order)
+        view._started = array("q", (self._started[position] for position in order))
+        view._ended = array("q", (self._ended[position] for position in order))
+        view._hashes = bytearray().join(
+            self._hashes[position * _HASH_BYTES : (position + 1) * _HASH_BYTES] for position in order
+        )
+        renumbered = {position: new for new, position in enumerate(order)}
+        view._odd_hashes = {renumbered[old]: value for old, value in self._odd_hashes.items() if old in renumbered}
+        view._errors = {renumbered[old]: value for old, value in self._errors.items() if old in renumbered}
+        view._samples = {renumbered[old]: value for old, value in self._samples.items() if old in renumbered}
+        view._usage_names = {
+            name: array("q", (column[position] for position in order)) for name, column in self._usage_names.items()
+        }
+        view._usage_key_ids = array("H", (self._usage_key_ids[position] for position in order))
+        view._usage_keys = self._usage_keys
+        view._records = [self._records[position] for position in order] if self._spill is None else []
+        view._offsets = array("q", (self._offsets[position] for position in order)) if self._spill else array("q")
+        return view
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"CompactResults({len(self)} results, outputs={self.outputs!r})"
+
+
+__all__ = ["FAILED_OUTPUTS", "KEEP_OUTPUTS", "OUTPUT_MODES", "SPILL_OUTPUTS", "CompactResults"]
@@ -0,0 +1,275 @@
+"""Long-lived local runner that keeps pipelines, HTTP clients and parsed suites warm."""
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+from .cache import SuiteCache
+from .models import TestCase
+from .references import load_pipeline
+from .runner import Pipeline
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class WarmPipelines:
+    """Pipelines built once per reference and rebuilt when their source changes.
+
+    Every loaded module whose file lives in the directory of the referenced
+    module (its package, for a package reference) is watched. When one of
+    them changes, the changed modules are reloaded deepest first, then the
+    referenced module itself, and the pipeline is built again. A failing
+    reload keeps the old state so that the next run retries it.
+    """
+
+    def __init__(self, loader: Callable[[str], Pipeline] = load_pipeline) -> None:
+        self._loader = loader
+        self._entries: dict[str, tuple[Pipeline, dict[str, tuple[str, int | None]]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, reference: str) -> Pipeline:
+        with self._lock:
+            entry = self._entries.get(reference)
+            if entry is not None:
+                pipeline, watched = entry
+                changed = [name for name, (path, mtime) in watched.items() if _mtime(path) != mtime]
+                if not changed:
+                    return pipeline
+                module_name = reference.split(":", maxsplit=1)[0]
+                for name in sorted(changed, key=lambda name: name.count("."), reverse=True):
+                    if name in sys.modules:
+                        importlib.reload(sys.modules[name])
+                if module_name not in changed and module_name in sys.modules:
+                    importlib.reload(sys.modules[module_name])
+            pipeline = self._loader(reference)
+            self._entries[reference] = (pipeline, self._watch(reference))
+            return pipeline
+
+    @staticmethod
+    def _watch(reference: str) -> dict[str, tuple[str, int | None]]:
+        module = sys.modules.get(reference.split(":", maxsplit=1)[0])
+        if module is None or getattr(module, "__file__", None) is None:
+            return {}
+        root = Path(module.__file__).resolve().parent  # type: ignore[arg-type]
+        watched: dict[str, tuple[str, int | None]] = {}
+        for name, candidate in list(sys.modules.items()):
+            path = _module_file(candidate)
+            if path is not None and path.is_relative_to(root):
+                watched[name] = (str(path), _mtime(str(path)))
+        return watched
+
+    def references(self) -> list[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+
+def _module_file(module: ModuleType | None) -> Path | None:
+    path = getattr(module, "__file__", None)
+    return Path(path).resolve() if path else None
+
+
+class WarmSuiteCache(SuiteCache):
+    """:class:`SuiteCache` that also keeps parsed suites in memory while the file is unchanged."""
+
+    def __init__(self, directory: Path) -> None:
+        super().__init__(directory)
+        self._memory: dict[str, tuple[tuple[int, int], list[TestCase]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path) -> list[TestCase]:
+        stat = path.stat()
+        resolved, key = str(path.resolve()), (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._memory.get(resolved)
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+        test_cases = super().load(path)
+        with self._lock:
+            self._memory[resolved] = (key, test_cases)
+        return list(test_cases)
+
+    def size(self) -> int:
+        """Number of suites held in memory."""
+
+        with self._lock:
+            return len(self._memory)
+
+
+class _OutputStream(io.TextIOBase):
+    """Text stream forwarding complete lines to the client as ``{"output": ...}`` messages."""
+
+    def __init__(self, send: Callable[[dict[str, Any]], None]) -> None:
+        self._send = send
+        self._buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        if "\n" in self._buffer:
+            complete, self._buffer = self._buffer.rsplit("\n", maxsplit=1)
+            self._send({"output": complete + "\n"})
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._send({"output": self._buffer})
+            self._buffer = ""
+
+
+class RunnerDaemon:
+    """Localhost HTTP server executing ``sgr-test`` runs with warm state.
+
+    ``handle(argv)`` runs one command line and returns its exit code (see
+    ``sgr-test serve``). Runs are executed one at a time in the client's
+    working directory, with stdout and stderr streamed back as JSON lines.
+    The address and a random token are written to ``state_path`` (readable
+    by the current user only); requests without the token are refused.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[list[str]], int],
+        state_path: Path,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        status: Callable[[], dict[str, Any]] | None = None,
+    ) -> None:
+        self.handle = handle
+        self.state_path = state_path
+        self.status = status or dict
+        self.token = secrets.token_urlsafe(24)
+        self._run_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        daemon = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                return
+
+            def _authorized(self) -> bool:
+                if secrets.compare_digest(self.headers.get("Authorization", ""), f"Bearer {daemon.token}"):
+                    return True
+                self.send_error(403, "Invalid or missing token")
+                return False
+
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path != "/health":
+                    self.send_error(404)
+                    return
+                if not self._authorized():
+                    return
+                payload = json.dumps({"status": "ok", "pid": os.getpid(), **daemon.status()}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self) -> None:  # noqa: N802
+                if self.path != "/run":
+                    self.send_error(404)
+                    return
+                if not self._authorized():
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    argv, cwd = [str(item) for item in request["argv"]], str(request.get("cwd") or os.getcwd())
+                except (ValueError, KeyError, TypeError) as exc:
+                    self.send_error(400, f"Invalid run request: {exc}")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                daemon._run(argv, cwd, self._send)
+
+            def _send(self, message: dict[str, Any]) -> None:
+                try:
+                    self.wfile.write(json.dumps(message).encode() + b"\n")
+                    self.wfile.flush()
+                except OSError:
+                    # The client went away; the run still finishes and keeps the warm state consistent.
+                    pass
+
+        return _Handler
+
+    def _run(self, argv: list[str], cwd: str, send: Callable[[dict[str, Any]], None]) -> None:
+        stream = _OutputStream(send)
+        with self._run_lock:
+            previous = os.getcwd()
+            try:
+                os.chdir(cwd)
+                with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):  # type: ignore[type-var]
+                    try:
+                        exit_code = self.handle(argv)
+                    except SystemExit as exc:
+                        exit_code = exc.code if isinstance(exc.code, int) else 1
+                    except Exception:  # noqa: BLE001
+                        traceback.print_exc()
+                        exit_code = 1
+            except OSError as exc:
+                stream.write(f"Cannot run in {cwd}: {exc}\n")
+                exit_code = 1
+            finally:
+                os.chdir(previous)
+        stream.flush()
+        send({"exit_code": exit_code})
+
+    def _write_state(self) -> None:
+        """Publish the state file atomically, so clients never read a partial one."""
+
+        host, port = self.address
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(prefix=f".{self.state_path.name}.", dir=self.state_path.parent)
+        try:
+            # mkstemp creates the file readable by the current user only (0600).
+            with os.fdopen(descriptor, "w") as handle:
+                json.dump({"host": host, "port": port, "token": self.token, "pid": os.getpid()}, handle)
+            os.replace(temporary, self.state_path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def serve_forever(self) -> None:
+        """Publish the state file and serve until :meth:`shutdown`."""
+
+        self._write_state()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.state_path.exists() and json.loads(self.state_path.read_text()).get("token") == self.token:
+                self.state_path.unlink()
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+
+
+__all__ = ["RunnerDaemon", "WarmPipelines", "WarmSuiteCache"]
@@ -0,0 +1,239 @@
+"""Case-level comparison of two runs with a McNemar test on pass/fail flips."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+from .models import TestResult, TestRun
+
+NEWLY_FAILING = "newly_failing"
+FIXED = "fixed"
+STILL_FAILING = "still_failing"
+STILL_PASSING = "still_passing"
+ADDED = "added"
+REMOVED = "removed"
+
+EXACT_TEST_THRESHOLD = 25
+
+
+@dataclass(frozen=True, slots=True)
+class McNemarResult:
+    """McNemar test on discordant pairs.
+
+    ``fixed`` and ``regressed`` are the counts of cases that flipped
+    fail→pass and pass→fail. The exact binomial test is used for fewer than
+    25 flips, the continuity-corrected chi-square approximation otherwise.
+    """
+
+    fixed: int
+    regressed: int
+    statistic: float
+    p_value: float
+    method: str
+
+    def significant(self, alpha: float = 0.05) -> bool:
+        return self.p_value < alpha
+
+
+@dataclass(frozen=True, slots=True)
+class CaseDiff:
+    """Change of one case between the baseline and candidate runs."""
+
+    id: str
+    status: str
+    baseline_passed: bool | None
+    candidate_passed: bool | None
+    latency_delta_seconds: float | None
+    tokens_delta: int | None
+    candidate_error: str | None = None
+
+
+@dataclass(slots=True)
+class RunDiff:
+    """Joined comparison of two runs."""
+
+    baseline: TestRun
+    candidate: TestRun
+    cases: list[CaseDiff] = field(default_factory=list)
+    mcnemar: McNemarResult | None = None
+
+    def by_status(self, status: str) -> list[CaseDiff]:
+        return [case for case in self.cases if case.status == status]
+
+    @property
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys((NEWLY_FAILING, FIXED, STILL_FAILING, STILL_PASSING, ADDED, REMOVED), 0)
+        for case in self.cases:
+            counts[case.status] += 1
+        return counts
+
+    @property
+    def accuracy_delta(self) -> float:
+        return self.candidate.summary.accuracy - self.baseline.summary.accuracy
+
+    @property
+    def mean_latency_delta_seconds(self) -> float:
+        deltas = [case.latency_delta_seconds for case in self.cases if case.latency_delta_seconds is not None]
+        return sum(deltas) / len(deltas) if deltas else 0.0
+
+    @property
+    def tokens_delta(self) -> int:
+        return sum(case.tokens_delta for case in self.cases if case.tokens_delta is not None)
+
+
+def mcnemar_test(fixed: int, regressed: int) -> McNemarResult:
+    """Two-sided McNemar test for ``fixed`` fail→pass and ``regressed`` pass→fail flips."""
+
+    flips = fixed + regressed
+    if flips == 0:
+        return McNemarResult(fixed=fixed, regressed=regressed, statistic=0.0, p_value=1.0, method="exact")
+
+    if flips < EXACT_TEST_THRESHOLD:
+        tail = sum(math.comb(flips, k) for k in range(min(fixed, regressed) + 1)) / 2**flips
+        return McNemarResult(
+            fixed=fixed,
+            regressed=regressed,
+            statistic=float(min(fixed, regressed)),
+            p_value=min(1.0, 2 * tail),
+            method="exact",
+        )
+
+    statistic = (abs(fixed - regressed) - 1) ** 2 / flips
+    # Survival function of chi-square with one degree of freedom.
+    p_value = math.erfc(math.sqrt(statistic / 2))
+    return McNemarResult(fixed=fixed, regressed=regressed, statistic=statistic, p_value=p_value, method="chi2")
+
+
+def _tokens(result: TestResult) -> int | None:
+    if not result.usage:
+        return None
+    return result.usage.get("total_tokens")
+
+
+def _classify(baseline: TestResult, candidate: TestResult) -> str:
+    if baseline.passed:
+        return STILL_PASSING if candidate.passed else NEWLY_FAILING
+    return FIXED if candidate.passed else STILL_FAILING
+
+
+def diff_runs(baseline: TestRun, candidate: TestRun) -> RunDiff:
+    """Join two runs on case id in one pass over each run."""
+
+    baseline_by_id = {result.id: result for result in baseline.results}
+    cases: list[CaseDiff] = []
+    seen: set[str] = set()
+
+    for result in candidate.results:
+        seen.add(result.id)
+        previous = baseline_by_id.get(result.id)
+        if previous is None:
+            cases.append(
+                CaseDiff(
+                    id=result.id,
+                    status=ADDED,
+                    baseline_passed=None,
+                    candidate_passed=result.passed,
+                    latency_delta_seconds=None,
+                    tokens_delta=None,
+                    candidate_error=result.error,
+                )
+            )
+            continue
+
+        previous_tokens, tokens = _tokens(previous), _tokens(result)
+        cases.append(
+            CaseDiff(
+                id=result.id,
+                status=_classify(previous, result),
+                baseline_passed=previous.passed,
+                candidate_passed=result.passed,
+                latency_delta_seconds=result.duration_seconds - previous.duration_seconds,
+                tokens_delta=tokens - previous_tokens if tokens is not None and previous_tokens is not None else None,
+                candidate_error=result.error,
+            )
+        )
+
+    for result in baseline.results:
+        if result.id not in seen:
+            cases.append(
+                CaseDiff(
+                    id=result.id,
+                    status=REMOVED,
+                    baseline_passed=result.passed,
+                    candidate_passed=None,
+                    latency_delta_seconds=None,
+                    tokens_delta=None,
+                )
+            )
+
+    run_diff = RunDiff(baseline=baseline, candidate=candidate, cases=cases)
+    counts = run_diff.counts
+    run_diff.mcnemar = mcnemar_test(fixed=counts[FIXED], regressed=counts[NEWLY_FAILING])
+    return run_diff
+
+
+def format_diff(run_diff: RunDiff, *, limit: int = 20) -> str:
+    """Plain-text report used by ``sgr-test diff``.
+
+    Newly failing, fixed and still failing cases are listed, at most ``limit`` of each.
+    """
+
+    counts = run_diff.counts
+    baseline, candidate = run_diff.baseline.summary, run_diff.candidate.summary
+    lines = [
+        f"Baseline:  {run_diff.baseline.pipeline_name} ({run_diff.baseline.model or '-'}) "
+        f"{baseline.passed}/{baseline.total} = {baseline.accuracy:.2%}",
+        f"Candidate: {run_diff.candidate.pipeline_name} ({run_diff.candidate.model or '-'}) "
+        f"{candidate.passed}/{candidate.total} = {candidate.accuracy:.2%}",
+        f"Accuracy delta: {run_diff.accuracy_delta:+.2%}",
+        (
+            f"Newly failing: {counts[NEWLY_FAILING]} | Fixed: {counts[FIXED]} | "
+            f"Still failing: {counts[STILL_FAILING]} | Added: {counts[ADDED]} | Removed: {counts[REMOVED]}"
+        ),
+        (
+            f"Mean latency delta: {run_diff.mean_latency_delta_seconds:+.3f}s | "
+            f"Tokens delta: {run_diff.tokens_delta:+d}"
+        ),
+    ]
+    if run_diff.mcnemar is not None:
+        test = run_diff.mcnemar
+        verdict = "significant" if test.significant() else "not significant"
+        lines.append(
+            f"McNemar ({test.method}): statistic={test.statistic:.3f}, p={test.p_value:.4f} ({verdict} at 0.05)"
+        )
+
+    for status, title in ((NEWLY_FAILING, "Newly failing"), (FIXED, "Fixed"), (STILL_FAILING, "Still failing")):
+        flipped = run_diff.by_status(status)
+        if not flipped:
+            continue
+        lines.append("")
+        lines.append(f"{title}:")
+        for case in flipped[:limit]:
+            detail = f"  {case.id}"
+            if case.latency_delta_seconds is not None:
+                detail += f"  latency {case.latency_delta_seconds:+.3f}s"
+            if case.tokens_delta is not None:
+                detail += f"  tokens {case.tokens_delta:+d}"
+            if case.candidate_error:
+                detail += f"  error: {case.candidate_error}"
+            lines.append(detail)
+        if len(flipped) > limit:
+            lines.append(f"  ... and {len(flipped) - limit} more")
+
+    return "\n".join(lines)
+
+
+__all__ = [
+    "ADDED",
+    "CaseDiff",
+    "FIXED",
+    "McNemarResult",
+    "NEWLY_FAILING",
+    "REMOVED",
+    "RunDiff",
+    "STILL_FAILING",
+    "STILL_PASSING",
+    "diff_runs",
+    "format_diff",
+    "mcnemar_test",
+]
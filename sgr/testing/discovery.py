@@ -0,0 +1,132 @@
+"""Discovery of pipeline packages laid out as ``<name>/pipeline.py`` + ``test_cases.json``."""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .cache import SuiteCache
+from .fingerprint import pipeline_fingerprint
+from .models import TestCase
+from .references import load_pipeline
+from .runner import Pipeline
+from .schema import load_test_cases
+
+PIPELINES_ROOT = Path(__file__).resolve().parents[1] / "pipelines"
+PIPELINES_PACKAGE = "sgr.pipelines"
+PIPELINE_FACTORY = "build_pipeline"
+TEST_CASE_FILES = ("test_cases.json", "test_cases.jsonl")
+
+
+class LazyPipeline:
+    """Pipeline proxy that imports and builds the real pipeline on first use.
+
+    Attribute access (``run``, ``comparators``, ``prompt``...) is delegated to
+    the loaded pipeline; ``name`` falls back to ``label`` until then.
+    """
+
+    def __init__(self, reference: str, label: str) -> None:
+        self.reference = reference
+        self.label = label
+        self._pipeline: Pipeline | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._pipeline is not None
+
+    def load(self) -> Pipeline:
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    self._pipeline = load_pipeline(self.reference)
+        return self._pipeline
+
+    @property
+    def name(self) -> str:
+        if self._pipeline is None:
+            return self.label
+        return getattr(self._pipeline, "name", None) or self._pipeline.__class__.__name__
+
+    def run(self, **params: Any) -> Any:
+        return self.load().run(**params)
+
+    def fingerprint(self) -> str:
+        return pipeline_fingerprint(self.load())
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__") or attr in {"_pipeline", "_lock", "reference", "label"}:
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyPipeline({self.reference!r})"
+
+
+@dataclass(slots=True)
+class DiscoveredSuite:
+    """Pipeline package found on disk; nothing is imported until requested."""
+
+    name: str
+    package: str
+    tests_path: Path
+    reports_dir: Path
+    factory: str = PIPELINE_FACTORY
+    pipeline: LazyPipeline = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.pipeline = LazyPipeline(self.pipeline_reference, label=self.name)
+
+    @property
+    def pipeline_reference(self) -> str:
+        """``module:attribute`` reference of the pipeline factory."""
+
+        return f"{self.package}.pipeline:{self.factory}"
+
+    def load_test_cases(self, cache: SuiteCache | None = None) -> list[TestCase]:
+        if cache is None:
+            return load_test_cases(self.tests_path)
+        return cache.load(self.tests_path)
+
+
+def _is_suite_dir(path: Path) -> bool:
+    return (path / "__init__.py").is_file() and (path / "pipeline.py").is_file()
+
+
+def discover_suites(
+    root: Path = PIPELINES_ROOT,
+    *,
+    package: str = PIPELINES_PACKAGE,
+    factory: str = PIPELINE_FACTORY,
+) -> list[DiscoveredSuite]:
+    """Find pipeline packages under ``root`` without importing them.
+
+    A package qualifies when it has ``__init__.py``, ``pipeline.py`` and a
+    ``test_cases.json``/``test_cases.jsonl``; its pipeline is built by the
+    ``factory`` function from ``pipeline.py``. Reports go to ``reports/``.
+    """
+
+    suites: list[DiscoveredSuite] = []
+    if not root.is_dir():
+        return suites
+
+    for path in sorted(root.iterdir()):
+        if not path.is_dir() or path.name.startswith(("_", ".")) or not _is_suite_dir(path):
+            continue
+        tests_path = next((path / name for name in TEST_CASE_FILES if (path / name).is_file()), None)
+        if tests_path is None:
+            continue
+        suites.append(
+            DiscoveredSuite(
+                name=path.name,
+                package=f"{package}.{path.name}",
+                tests_path=tests_path,
+                reports_dir=path / "reports",
+                factory=factory,
+            )
+        )
+    return suites
+
+
+__all__ = ["DiscoveredSuite", "LazyPipeline", "PIPELINES_ROOT", "discover_suites"]
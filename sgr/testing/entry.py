@@ -0,0 +1,90 @@
+"""``sgr-test`` console entry point and the thin client of the warm runner daemon.
+
+Only the standard library is imported here, so ``sgr-test submit ...``
+starts in milliseconds; everything else is forwarded to
+:func:`sgr.testing.cli.main`.
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+DAEMON_FILE_ENV = "SGR_TEST_DAEMON_FILE"
+
+
+def daemon_state_path() -> Path:
+    """Where ``sgr-test serve`` leaves its address and token (``$SGR_TEST_DAEMON_FILE``)."""
+
+    configured = os.environ.get(DAEMON_FILE_ENV)
+    if configured:
+        return Path(configured)
+    # Same directory as the suite cache (``SGR_TEST_CACHE_DIR``, see sgr.testing.cache).
+    cache_dir = os.environ.get("SGR_TEST_CACHE_DIR")
+    return (Path(cache_dir) if cache_dir else Path.home() / ".cache" / "sgr-test") / "daemon.json"
+
+
+def _read_state(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def submit(argv: list[str], *, state_path: Path | None = None) -> int:
+    """Run ``sgr-test`` arguments on the warm daemon, streaming its output.
+
+    Without a reachable daemon the run happens in this process instead.
+    """
+
+    state = _read_state(state_path or daemon_state_path())
+    if state is not None:
+        connection = http.client.HTTPConnection(state["host"], state["port"], timeout=None)
+        body = json.dumps({"argv": argv, "cwd": os.getcwd()})
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {state['token']}"}
+        try:
+            connection.request("POST", "/run", body=body, headers=headers)
+            response = connection.getresponse()
+        except OSError:
+            # A stale state file of a daemon that is gone.
+            connection.close()
+        else:
+            try:
+                return _stream(response)
+            finally:
+                connection.close()
+
+    print("sgr-test daemon is not running (start it with 'sgr-test serve'); running locally", file=sys.stderr)
+    from .cli import main as cli_main
+
+    return cli_main(argv)
+
+
+def _stream(response: http.client.HTTPResponse) -> int:
+    if response.status != 200:
+        print(f"sgr-test daemon refused the run: {response.status} {response.read().decode(errors='replace')}")
+        return 2
+    exit_code = 1
+    for line in response:
+        message = json.loads(line)
+        if "output" in message:
+            sys.stdout.write(message["output"])
+            sys.stdout.flush()
+        if "exit_code" in message:
+            exit_code = message["exit_code"]
+    return exit_code
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "submit":
+        return submit(argv[1:])
+    from .cli import main as cli_main
+
+    return cli_main(argv)
+
+
+__all__ = ["DAEMON_FILE_ENV", "daemon_state_path", "main", "submit"]
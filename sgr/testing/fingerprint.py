@@ -0,0 +1,91 @@
+"""Stable fingerprints of test cases and pipelines for change detection."""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from .models import TestCase
+from .reports import json_default
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=json_default)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def case_fingerprint(test_case: TestCase) -> str:
+    """Hash of the inputs that determine a case outcome: params and expected output."""
+
+    return _digest({"params": test_case.params, "expected_output": test_case.expected_output})
+
+
+def describe_model(pipeline: Any) -> tuple[str | None, dict[str, Any]]:
+    """Model name and non-secret client parameters of an LLM-backed pipeline.
+
+    Clients with several endpoints also report their routing strategy and
+    per-endpoint traffic, latency and health (``endpoint_stats()``).
+    """
+
+    client = getattr(pipeline, "client", None)
+    config = getattr(client, "config", None)
+    if config is None:
+        return None, {}
+
+    parameters = {
+        name: getattr(config, name)
+        for name in ("base_url", "timeout", "max_retries")
+        if getattr(config, name, None) is not None
+    }
+    request_kwargs = getattr(config, "request_kwargs", None)
+    if request_kwargs:
+        parameters["request_kwargs"] = dict(request_kwargs)
+    endpoints = getattr(config, "endpoints", None)
+    if endpoints:
+        parameters["routing"] = getattr(config, "routing", None)
+        stats = getattr(client, "endpoint_stats", None)
+        parameters["endpoints"] = stats() if callable(stats) else [endpoint.describe() for endpoint in endpoints]
+    return getattr(config, "model", None), parameters
+
+
+def pipeline_fingerprint(pipeline: Any) -> str:
+    """Hash of the pipeline's prompt, model and response schema.
+
+    Pipelines can override the inspection by defining a ``fingerprint()``
+    method that returns a string.
+    """
+
+    custom = getattr(pipeline, "fingerprint", None)
+    if callable(custom):
+        return str(custom())
+
+    pipeline_type = type(pipeline)
+    parts: dict[str, Any] = {
+        "class": f"{pipeline_type.__module__}.{pipeline_type.__qualname__}",
+        "name": getattr(pipeline, "name", None),
+    }
+
+    prompt = getattr(pipeline, "prompt", None)
+    if prompt is not None:
+        parts["prompt"] = {"system": getattr(prompt, "system", None), "user": getattr(prompt, "user", None)}
+
+    model, parameters = describe_model(pipeline)
+    if model is not None:
+        parts["model"] = model
+        parts["base_url"] = parameters.get("base_url")
+        if "request_kwargs" in parameters:
+            parts["request_kwargs"] = parameters["request_kwargs"]
+
+    history_budget = getattr(pipeline, "history_token_budget", None)
+    if history_budget is not None:
+        parts["history_token_budget"] = history_budget
+
+    response_model = getattr(pipeline, "response_model", None)
+    schema = getattr(response_model, "model_json_schema", None)
+    if callable(schema):
+        parts["response_schema"] = schema()
+
+    return _digest(parts)
+
+
+__all__ = ["case_fingerprint", "describe_model", "pipeline_fingerprint"]
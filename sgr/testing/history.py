@@ -0,0 +1,235 @@
+"""Incrementally maintained aggregates over saved run reports."""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .cache import SuiteCache
+from .models import TestRun
+from .reports import load_report
+
+HISTORY_CACHE_VERSION = 2
+
+
+@dataclass(frozen=True, slots=True)
+class RunRecord:
+    """Aggregates of one saved report; everything the history views need."""
+
+    path: str
+    pipeline_name: str
+    model: str | None
+    started_at: datetime
+    total: int
+    passed: int
+    accuracy: float
+    duration_seconds: float
+    mean_latency_seconds: float
+    p95_latency_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cached_tokens: int = 0
+
+    @property
+    def prompt_cache_hit_ratio(self) -> float | None:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else None
+
+    @property
+    def model_label(self) -> str:
+        return self.model or "—"
+
+
+def _percentile(values: list[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = min(len(ordered) - 1, max(0, round(quantile * (len(ordered) - 1))))
+    return ordered[position]
+
+
+def summarize_report(path: Path) -> RunRecord:
+    """Read a report once and reduce it to a :class:`RunRecord`."""
+
+    return summarize_run(load_report(path), path=str(path))
+
+
+def summarize_run(test_run: TestRun, *, path: str = "") -> RunRecord:
+    """Reduce an in-memory run to a :class:`RunRecord`."""
+
+    summary = test_run.summary
+    latencies = [result.duration_seconds for result in test_run.results]
+    usage = test_run.usage
+    return RunRecord(
+        path=path,
+        pipeline_name=test_run.pipeline_name,
+        model=test_run.model,
+        started_at=test_run.started_at,
+        total=summary.total,
+        passed=summary.passed,
+        accuracy=summary.accuracy,
+        duration_seconds=test_run.duration_seconds,
+        mean_latency_seconds=sum(latencies) / len(latencies) if latencies else 0.0,
+        p95_latency_seconds=_percentile(latencies, 0.95),
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+        cached_tokens=usage.get("cached_tokens", 0),
+    )
+
+
+class RunHistory:
+    """History of runs stored as JSON reports in one or more directories.
+
+    Each report is parsed once: records are keyed by path, size and mtime and
+    persisted to ``cache_path`` between processes, so :meth:`refresh` only
+    reads reports that appeared or changed since the last call. Derived views
+    (latest/best) are recomputed only when the record set changes.
+    """
+
+    def __init__(self, report_dirs: Iterable[Path], *, cache_path: Path | None = None) -> None:
+        self.report_dirs = [Path(directory) for directory in report_dirs]
+        self.cache_path = cache_path
+        self._records: dict[str, tuple[int, int, RunRecord]] = self._load_cache()
+        self._failed: dict[str, tuple[int, int, str]] = {}
+        self._generation = 0
+        self._views: dict[str, tuple[int, list[RunRecord]]] = {}
+
+    @classmethod
+    def with_default_cache(cls, report_dirs: Iterable[Path]) -> RunHistory:
+        """History cached next to the validated-suite cache, one file per set of directories."""
+
+        directories = [Path(directory) for directory in report_dirs]
+        key = "\n".join(sorted(str(directory.resolve()) for directory in directories))
+        name = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+        return cls(directories, cache_path=SuiteCache.default().directory / f"history-{name}.pickle")
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """Reports that could not be parsed, mapped to the error message."""
+
+        return {path: failure[2] for path, failure in self._failed.items()}
+
+    def refresh(self) -> bool:
+        """Pick up new, changed and deleted reports. Returns ``True`` on changes."""
+
+        seen: set[str] = set()
+        changed = False
+        for directory in self.report_dirs:
+            if not directory.is_dir():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    seen.add(entry.path)
+                    cached = self._records.get(entry.path)
+                    if cached is not None and cached[:2] == signature:
+                        continue
+                    failure = self._failed.get(entry.path)
+                    if failure is not None and failure[:2] == signature:
+                        continue
+                    try:
+                        record = summarize_report(Path(entry.path))
+                    except (OSError, ValueError) as exc:
+                        self._failed[entry.path] = (*signature, str(exc))
+                        continue
+                    self._failed.pop(entry.path, None)
+                    self._records[entry.path] = (*signature, record)
+                    changed = True
+
+        for path in set(self._records) - seen:
+            del self._records[path]
+            changed = True
+
+        if changed:
+            self._generation += 1
+            self._save_cache()
+        return changed
+
+    @property
+    def records(self) -> list[RunRecord]:
+        """All runs ordered by start time."""
+
+        return self._view("records", lambda: sorted((item[2] for item in self._records.values()), key=_start_key))
+
+    def latest(self) -> list[RunRecord]:
+        """Most recent run per pipeline and model."""
+
+        def _compute() -> list[RunRecord]:
+            latest: dict[tuple[str, str | None], RunRecord] = {}
+            for record in self.records:
+                latest[(record.pipeline_name, record.model)] = record
+            return sorted(latest.values(), key=_group_key)
+
+        return self._view("latest", _compute)
+
+    def best(self) -> list[RunRecord]:
+        """Highest-accuracy run per pipeline and model (ties go to the newer run)."""
+
+        def _compute() -> list[RunRecord]:
+            best: dict[tuple[str, str | None], RunRecord] = {}
+            for record in self.records:
+                key = (record.pipeline_name, record.model)
+                current = best.get(key)
+                if current is None or record.accuracy >= current.accuracy:
+                    best[key] = record
+            return sorted(best.values(), key=_group_key)
+
+        return self._view("best", _compute)
+
+    def trend(self, pipeline_name: str) -> list[RunRecord]:
+        """Runs of one pipeline ordered by time, for accuracy/latency charts."""
+
+        return [record for record in self.records if record.pipeline_name == pipeline_name]
+
+    @property
+    def pipelines(self) -> list[str]:
+        return sorted({record.pipeline_name for record in self.records})
+
+    def _view(self, name: str, compute: Callable[[], list[RunRecord]]) -> list[RunRecord]:
+        cached = self._views.get(name)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        value = compute()
+        self._views[name] = (self._generation, value)
+        return value
+
+    def _load_cache(self) -> dict[str, tuple[int, int, RunRecord]]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with self.cache_path.open("rb") as handle:
+                version, records = pickle.load(handle)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            return {}
+        return records if version == HISTORY_CACHE_VERSION else {}
+
+    def _save_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.cache_path.parent, suffix=".tmp", delete=False) as handle:
+                pickle.dump((HISTORY_CACHE_VERSION, self._records), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, self.cache_path)
+        except OSError:
+            return
+
+
+def _start_key(record: RunRecord) -> tuple[datetime, str]:
+    return record.started_at, record.path
+
+
+def _group_key(record: RunRecord) -> tuple[str, str]:
+    return record.pipeline_name, record.model_label
+
+
+__all__ = ["RunHistory", "RunRecord", "summarize_report", "summarize_run"]
@@ -5,6 +5,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, List, Optional
 
+from .sampling import sampling_summary
+
 
 Comparator = Callable[[Any, Any], bool]
 
@@ -21,6 +23,22 @@ class TestCase:
     metadata: dict[str, Any] | None = None
 
 
+@dataclass
+class SampleResult:
+    """One of several samples of a case when running with ``repeat > 1``."""
+
+    passed: bool
+    output: Any
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"passed": self.passed, "output": self.output, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> SampleResult:
+        return cls(passed=payload["passed"], output=payload.get("output"), error=payload.get("error"))
+
+
 @dataclass
 class TestResult:
     """Result of a single test case execution."""
@@ -32,6 +50,10 @@ class TestResult:
     started_at: datetime
     ended_at: datetime
     error: Optional[str] = None
+    case_hash: Optional[str] = None
+    usage: Optional[dict[str, int]] = None
+    samples: Optional[List[SampleResult]] = None
+    """All samples when the case was repeated; ``passed``/``output`` mirror the first one."""
 
     @property
     def duration_seconds(self) -> float:
@@ -39,6 +61,40 @@ class TestResult:
 
         return (self.ended_at - self.started_at).total_seconds()
 
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the result to a JSON-serializable structure."""
+
+        return {
+            "id": self.id,
+            "passed": self.passed,
+            "output": self.output,
+            "expected_output": self.expected_output,
+            "started_at": self.started_at.isoformat(),
+            "ended_at": self.ended_at.isoformat(),
+            "duration_seconds": self.duration_seconds,
+            "error": self.error,
+            "case_hash": self.case_hash,
+            "usage": self.usage,
+            "samples": [sample.to_dict() for sample in self.samples] if self.samples is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> TestResult:
+        """Restore a result from :meth:`to_dict` output."""
+
+        return cls(
+            id=payload["id"],
+            passed=payload["passed"],
+            output=payload.get("output"),
+            expected_output=payload.get("expected_output"),
+            started_at=datetime.fromisoformat(payload["started_at"]),
+            ended_at=datetime.fromisoformat(payload["ended_at"]),
+            error=payload.get("error"),
+            case_hash=payload.get("case_hash"),
+            usage=payload.get("usage"),
+            samples=[SampleResult.from_dict(item) for item in payload["samples"]] if payload.get("samples") else None,
+        )
+
 
 @dataclass
 class RunSummary:
@@ -65,45 +121,98 @@ class TestRun:
     started_at: datetime
     ended_at: datetime
     results: List[TestResult] = field(default_factory=list)
-
-    def to_dict(self) -> dict[str, Any]:
-        """Convert run details to a JSON-serializable structure."""
-
-        return {
+    """Results in input order; compact runs hold a :class:`~sgr.testing.compact.CompactResults` sequence."""
+    pipeline_fingerprint: Optional[str] = None
+    stop_reason: Optional[str] = None
+    model: Optional[str] = None
+    model_parameters: dict[str, Any] = field(default_factory=dict)
+    estimate: Optional[dict[str, Any]] = None
+    """Accuracy estimate of a partial run (sequential early stopping, stratified smoke runs)."""
+    budget: Optional[dict[str, Any]] = None
+    """Token/cost limits and spend of a budgeted run (see :class:`~sgr.testing.budget.RunBudget`)."""
+
+    def to_dict(self, *, include_results: bool = True) -> dict[str, Any]:
+        """Convert run details to a JSON-serializable structure.
+
+        ``include_results=False`` leaves out the ``results`` list, e.g. to
+        write the results one by one.
+        """
+
+        payload = {
             "pipeline_name": self.pipeline_name,
             "started_at": self.started_at.isoformat(),
             "ended_at": self.ended_at.isoformat(),
             "duration_seconds": self.duration_seconds,
+            "pipeline_fingerprint": self.pipeline_fingerprint,
+            "stop_reason": self.stop_reason,
+            "model": self.model,
+            "model_parameters": self.model_parameters,
+            "usage": self.usage,
+            "prompt_cache_hit_ratio": self.prompt_cache_hit_ratio,
+            "sampling": sampling_summary(self.results),
+            "estimate": self.estimate,
+            "budget": self.budget,
             "summary": {
                 "total": self.summary.total,
                 "passed": self.summary.passed,
                 "failed": self.summary.failed,
                 "accuracy": self.summary.accuracy,
             },
-            "results": [
-                {
-                    "id": result.id,
-                    "passed": result.passed,
-                    "output": result.output,
-                    "expected_output": result.expected_output,
-                    "started_at": result.started_at.isoformat(),
-                    "ended_at": result.ended_at.isoformat(),
-                    "duration_seconds": result.duration_seconds,
-                    "error": result.error,
-                }
-                for result in self.results
-            ],
         }
+        if include_results:
+            payload["results"] = [result.to_dict() for result in self.results]
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> TestRun:
+        """Restore a run from :meth:`to_dict` output (e.g. a saved JSON report)."""
+
+        return cls(
+            pipeline_name=payload["pipeline_name"],
+            started_at=datetime.fromisoformat(payload["started_at"]),
+            ended_at=datetime.fromisoformat(payload["ended_at"]),
+            results=[TestResult.from_dict(item) for item in payload.get("results", [])],
+            pipeline_fingerprint=payload.get("pipeline_fingerprint"),
+            stop_reason=payload.get("stop_reason"),
+            model=payload.get("model"),
+            model_parameters=payload.get("model_parameters") or {},
+            estimate=payload.get("estimate"),
+            budget=payload.get("budget"),
+        )
 
     @property
     def summary(self) -> RunSummary:
         """Summarize run outcome."""
 
         total = len(self.results)
-        passed = sum(1 for result in self.results if result.passed)
+        passed_count = getattr(self.results, "passed_count", None)
+        passed = passed_count() if passed_count is not None else sum(1 for result in self.results if result.passed)
         failed = total - passed
         return RunSummary(total=total, passed=passed, failed=failed)
 
+    @property
+    def usage(self) -> dict[str, int]:
+        """Token usage summed over all results."""
+
+        usage_totals = getattr(self.results, "usage_totals", None)
+        if usage_totals is not None:
+            return usage_totals()
+        totals: dict[str, int] = {}
+        for result in self.results:
+            for name, value in (result.usage or {}).items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    @property
+    def prompt_cache_hit_ratio(self) -> float | None:
+        """Share of prompt tokens served from the provider prefix cache (``None`` without usage data)."""
+
+        usage = self.usage
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        if not prompt_tokens:
+            return None
+        return usage.get("cached_tokens", 0) / prompt_tokens
+
     @property
     def duration_seconds(self) -> float:
         """Compute duration in seconds."""
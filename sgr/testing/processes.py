@@ -0,0 +1,101 @@
+"""Process-pool backend of :class:`~sgr.testing.runner.TestRunner` for CPU-bound pipelines."""
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Optional
+
+from .models import SampleResult, TestCase, TestResult
+from .references import load_pipeline
+from .runner import Pipeline, TestRunner
+
+# index, passed, output, error, started_at, ended_at, usage, samples as (passed, output, error) tuples
+PackedSample = tuple[bool, Any, Optional[str]]
+PackedResult = tuple[
+    int, bool, Any, Optional[str], datetime, datetime, Optional[dict[str, int]], Optional[tuple[PackedSample, ...]]
+]
+
+_worker: tuple[Pipeline, TestRunner] | None = None
+
+
+def pack_result(index: int, result: TestResult) -> PackedResult:
+    """Compact tuple of what only the worker knows; id, expected output and hash stay in the parent."""
+
+    samples = None
+    if result.samples:
+        samples = tuple((sample.passed, sample.output, sample.error) for sample in result.samples)
+    return (index, result.passed, result.output, result.error, result.started_at, result.ended_at, result.usage, samples)
+
+
+def unpack_result(packed: PackedResult, test_case: TestCase, case_hash: str | None) -> TestResult:
+    _, passed, output, error, started_at, ended_at, usage, samples = packed
+    return TestResult(
+        id=test_case.id,
+        passed=passed,
+        output=output,
+        expected_output=test_case.expected_output,
+        started_at=started_at,
+        ended_at=ended_at,
+        error=error,
+        case_hash=case_hash,
+        usage=usage,
+        samples=[SampleResult(passed=item[0], output=item[1], error=item[2]) for item in samples] if samples else None,
+    )
+
+
+def _init_worker(reference: str, options: Mapping[str, Any]) -> None:
+    global _worker
+    _worker = (load_pipeline(reference), TestRunner(**options))
+
+
+def run_packed_unit(unit: list[tuple[int, TestCase]], deadline_at: float | None) -> list[PackedResult]:
+    if _worker is None:  # pragma: no cover - the pool initializer always runs first
+        msg = "Process worker was not initialized"
+        raise RuntimeError(msg)
+    pipeline, runner = _worker
+    return [pack_result(index, result) for index, result in runner.run_unit(pipeline, unit, deadline_at)]
+
+
+def check_picklable(options: Mapping[str, Any], test_cases: Iterable[TestCase] = ()) -> None:
+    """Fail early when comparators (of the runner or of single cases) cannot be sent to worker processes."""
+
+    try:
+        pickle.dumps(dict(options))
+    except (pickle.PicklingError, AttributeError, TypeError) as exc:  # noqa: B904
+        msg = f"Process backend needs module-level comparators that can be pickled: {exc}"
+        raise ValueError(msg) from exc
+
+    checked: set[int] = set()
+    for test_case in test_cases:
+        comparator = test_case.comparator
+        if not callable(comparator) or id(comparator) in checked:
+            continue
+        try:
+            pickle.dumps(comparator)
+        except (pickle.PicklingError, AttributeError, TypeError) as exc:  # noqa: B904
+            msg = (
+                f"Process backend needs module-level comparators that can be pickled, but test case "
+                f"{test_case.id} has {comparator!r}; use a module-level function or a comparator name: {exc}"
+            )
+            raise ValueError(msg) from exc
+        checked.add(id(comparator))
+
+
+def process_executor(reference: str, max_workers: int, options: Mapping[str, Any]) -> ProcessPoolExecutor:
+    """Pool whose workers each build their own pipeline from ``reference``.
+
+    Workers are spawned rather than forked so they never inherit locks or
+    HTTP connections of the parent's threads.
+    """
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(reference, dict(options)),
+    )
+
+
+__all__ = ["PackedResult", "check_picklable", "pack_result", "process_executor", "run_packed_unit", "unpack_result"]
@@ -0,0 +1,42 @@
+"""Resolving ``module:attribute`` references to pipeline objects."""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Callable
+
+from .runner import Pipeline
+
+
+def load_reference(target: str) -> Any:
+    """Import ``module:attribute`` and return the attribute as is."""
+
+    if ":" not in target:
+        msg = "Pipeline should be provided as 'module:attribute'"
+        raise ValueError(msg)
+
+    module_name, attr = target.split(":", maxsplit=1)
+    module = importlib.import_module(module_name)
+    try:
+        return getattr(module, attr)
+    except AttributeError as exc:  # noqa: B904
+        msg = f"Attribute '{attr}' not found in module '{module_name}'"
+        raise ValueError(msg) from exc
+
+
+def load_pipeline(target: str) -> Pipeline:
+    """Load a pipeline object from ``module:attribute`` reference.
+
+    The attribute may be a pipeline instance or a zero-argument factory.
+    """
+
+    pipeline_or_factory: Pipeline | Callable[[], Pipeline] = load_reference(target)
+    pipeline: Pipeline = pipeline_or_factory() if callable(pipeline_or_factory) else pipeline_or_factory
+
+    if not hasattr(pipeline, "run"):
+        msg = "Pipeline object must define a 'run' method"
+        raise ValueError(msg)
+
+    return pipeline
+
+
+__all__ = ["load_pipeline", "load_reference"]
@@ -0,0 +1,139 @@
+"""Saving and loading JSON run reports."""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from .models import TestRun
+
+_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+_LABEL_UNSAFE_RE = re.compile(r"[^\w.=-]+")
+_REPORT_NAME_RE = re.compile(r"^(?P<slug>.+)-(?P<timestamp>\d{8}-\d{6})(?:-(?P<counter>\d+))?\.json$")
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook for pipeline outputs (pydantic models, enums, dates)."""
+
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return str(value)
+
+
+def pipeline_slug(pipeline_name: str) -> str:
+    """File-name friendly pipeline name used as a report prefix."""
+
+    return pipeline_name.replace(" ", "_")
+
+
+def serialize_run(test_run: TestRun) -> str:
+    """Render a run as the JSON report text."""
+
+    return _dumps(test_run.to_dict())
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2, default=json_default)
+
+
+def write_report(test_run: TestRun, path: Path) -> Path:
+    """Write a run report to an explicit path.
+
+    Results are serialized one at a time, so a compact run never holds the
+    whole report in memory; the text is the same as :func:`serialize_run`.
+    """
+
+    header = _dumps(test_run.to_dict(include_results=False))
+    with path.open("w") as handle:
+        if not test_run.results:
+            handle.write(header[:-2] + ',\n  "results": []\n}')
+            return path
+        handle.write(header[:-2] + ',\n  "results": [')
+        separator = "\n"
+        for result in test_run.results:
+            handle.write(separator + "    " + _dumps(result.to_dict()).replace("\n", "\n    "))
+            separator = ",\n"
+        handle.write("\n  ]\n}")
+    return path
+
+
+def save_report(test_run: TestRun, report_dir: Path, *, label: str | None = None) -> Path:
+    """Write a run report into ``report_dir`` with an autogenerated file name.
+
+    ``label`` is appended to the pipeline slug, e.g. to tell sweep
+    combinations of the same pipeline apart.
+    """
+
+    report_dir.mkdir(parents=True, exist_ok=True)
+    slug = pipeline_slug(test_run.pipeline_name)
+    if label:
+        slug = f"{slug}-{_LABEL_UNSAFE_RE.sub('_', label)}"
+    stem = f"{slug}-{datetime.utcnow().strftime(_TIMESTAMP_FORMAT)}"
+    path = report_dir / f"{stem}.json"
+    counter = 1
+    while path.exists():
+        path = report_dir / f"{stem}-{counter}.json"
+        counter += 1
+    return write_report(test_run, path)
+
+
+def load_report(path: Path) -> TestRun:
+    """Load a saved JSON report back into a :class:`TestRun`."""
+
+    try:
+        payload = json.loads(path.read_text())
+        return TestRun.from_dict(payload)
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:  # noqa: B904
+        msg = f"Invalid run report at {path}: {exc}"
+        raise ValueError(msg) from exc
+
+
+def find_reports(report_dir: Path, pipeline_name: str | None = None) -> list[Path]:
+    """List reports in ``report_dir`` from oldest to newest.
+
+    When ``pipeline_name`` is given only that pipeline's reports are returned.
+    """
+
+    if not report_dir.is_dir():
+        return []
+
+    slug = pipeline_slug(pipeline_name) if pipeline_name is not None else None
+    found: list[tuple[str, int, Path]] = []
+    for path in report_dir.glob("*.json"):
+        match = _REPORT_NAME_RE.match(path.name)
+        if match is None or (slug is not None and match["slug"] != slug):
+            continue
+        found.append((match["timestamp"], int(match["counter"] or 0), path))
+    return [path for _, _, path in sorted(found)]
+
+
+def latest_report(report_dir: Path, pipeline_name: str | None = None) -> Path | None:
+    """Return the newest report in ``report_dir`` or ``None``."""
+
+    reports = find_reports(report_dir, pipeline_name)
+    return reports[-1] if reports else None
+
+
+__all__ = [
+    "find_reports",
+    "json_default",
+    "latest_report",
+    "load_report",
+    "pipeline_slug",
+    "save_report",
+    "serialize_run",
+    "write_report",
+]
@@ -0,0 +1,99 @@
+"""Selecting cases to rerun based on a previous (baseline) report."""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Iterable
+
+from .fingerprint import case_fingerprint
+from .models import TestCase, TestResult, TestRun
+
+
+def _results_by_id(baseline: TestRun) -> dict[str, TestResult]:
+    return {result.id: result for result in baseline.results}
+
+
+def _reusable(
+    result: TestResult | None, case: TestCase, baseline: TestRun, pipeline_fingerprint: str | None
+) -> bool:
+    """Whether ``result`` from ``baseline`` still describes ``case`` run by the current pipeline."""
+
+    return (
+        result is not None
+        and pipeline_fingerprint is not None
+        and baseline.pipeline_fingerprint == pipeline_fingerprint
+        and result.case_hash is not None
+        and result.case_hash == case_fingerprint(case)
+    )
+
+
+def select_last_failed(
+    test_cases: Iterable[TestCase], baseline: TestRun, *, pipeline_fingerprint: str | None = None
+) -> list[TestCase]:
+    """Cases that failed in ``baseline`` plus cases the baseline has never seen.
+
+    With ``pipeline_fingerprint``, passed cases whose baseline result cannot be
+    reused (see :func:`fill_from_baseline`) are selected as well.
+    """
+
+    previous = _results_by_id(baseline)
+    selected: list[TestCase] = []
+    for case in test_cases:
+        result = previous.get(case.id)
+        if result is None or not result.passed:
+            selected.append(case)
+        elif pipeline_fingerprint is not None and not _reusable(result, case, baseline, pipeline_fingerprint):
+            selected.append(case)
+    return selected
+
+
+def order_failed_first(test_cases: Iterable[TestCase], baseline: TestRun) -> list[TestCase]:
+    """All cases, with previously failed and new cases moved to the front."""
+
+    previous = _results_by_id(baseline)
+    failed: list[TestCase] = []
+    passed: list[TestCase] = []
+    for case in test_cases:
+        result = previous.get(case.id)
+        (passed if result is not None and result.passed else failed).append(case)
+    return failed + passed
+
+
+def select_changed(
+    test_cases: Iterable[TestCase], baseline: TestRun, *, pipeline_fingerprint: str | None
+) -> list[TestCase]:
+    """Cases whose params/expected output changed since ``baseline``.
+
+    A different pipeline fingerprint (prompt, model, schema) marks every case
+    as changed.
+    """
+
+    previous = _results_by_id(baseline)
+    return [
+        case for case in test_cases if not _reusable(previous.get(case.id), case, baseline, pipeline_fingerprint)
+    ]
+
+
+def fill_from_baseline(test_run: TestRun, test_cases: Iterable[TestCase], baseline: TestRun) -> TestRun:
+    """Complete a partial run with baseline results for cases that were not rerun.
+
+    A baseline result is reused only when the baseline was produced by the
+    same pipeline (equal ``pipeline_fingerprint``) and the case is unchanged
+    (equal ``case_hash``). Results follow the order of ``test_cases``; cases
+    that are neither in ``test_run`` nor reusable from the baseline are
+    skipped.
+    """
+
+    fresh = _results_by_id(test_run)
+    previous = _results_by_id(baseline)
+    results: list[TestResult] = []
+    for case in test_cases:
+        result = fresh.get(case.id)
+        if result is None and _reusable(previous.get(case.id), case, baseline, test_run.pipeline_fingerprint):
+            result = previous[case.id]
+        if result is not None:
+            results.append(result)
+
+    return replace(test_run, results=results)
+
+
+__all__ = ["fill_from_baseline", "order_failed_first", "select_changed", "select_last_failed"]
@@ -0,0 +1,160 @@
+"""Server-side storage, filtering and paging of result rows for the UI."""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .models import TestResult
+from .reports import json_default
+
+RESULT_COLUMNS = ("pipeline", "id", "passed", "output", "expected_output", "error", "duration_seconds")
+SORT_COLUMNS = ("order", "pipeline", "id", "passed", "duration_seconds")
+STATUS_FILTERS = ("all", "passed", "failed")
+
+
+@dataclass(slots=True)
+class _Row:
+    order: int
+    pipeline: str
+    result: TestResult
+    duration_seconds: float
+
+
+@dataclass(slots=True)
+class ResultQuery:
+    """Filter, sort and paging parameters for :meth:`ResultTable.query`."""
+
+    status: str = "all"
+    pipelines: tuple[str, ...] = ()
+    error_contains: str = ""
+    min_duration_seconds: float | None = None
+    sort_by: str = "order"
+    descending: bool = False
+    page: int = 1
+    page_size: int = 50
+
+
+@dataclass(slots=True)
+class ResultPage:
+    """One page of formatted rows plus totals for the pager."""
+
+    rows: list[list[Any]]
+    matched: int
+    total: int
+    page: int
+    pages: int
+
+
+def _render_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1] + "…"
+
+
+class ResultTable:
+    """Result rows kept on the server; only the requested page is formatted.
+
+    Outputs are serialized lazily and cut to ``max_cell_chars`` so that the
+    browser never receives whole objects for thousands of rows. Use
+    :meth:`detail` to fetch one case in full.
+    """
+
+    def __init__(self, *, max_cell_chars: int = 160) -> None:
+        self.max_cell_chars = max_cell_chars
+        self._rows: list[_Row] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def pipelines(self) -> list[str]:
+        return sorted({row.pipeline for row in self._rows})
+
+    def add(self, result: TestResult, *, pipeline_name: str) -> None:
+        self._rows.append(
+            _Row(
+                order=len(self._rows),
+                pipeline=pipeline_name,
+                result=result,
+                duration_seconds=result.duration_seconds,
+            )
+        )
+
+    def extend(self, results: Iterable[TestResult], *, pipeline_name: str) -> None:
+        for result in results:
+            self.add(result, pipeline_name=pipeline_name)
+
+    def query(self, query: ResultQuery | None = None) -> ResultPage:
+        query = query or ResultQuery()
+        if query.status not in STATUS_FILTERS:
+            msg = f"Unknown status filter '{query.status}'"
+            raise ValueError(msg)
+        if query.sort_by not in SORT_COLUMNS:
+            msg = f"Unknown sort column '{query.sort_by}'"
+            raise ValueError(msg)
+
+        rows = self._rows[:]
+        total = len(rows)
+        if query.status != "all":
+            wanted = query.status == "passed"
+            rows = [row for row in rows if row.result.passed is wanted]
+        if query.pipelines:
+            allowed = set(query.pipelines)
+            rows = [row for row in rows if row.pipeline in allowed]
+        if query.error_contains:
+            needle = query.error_contains.lower()
+            rows = [row for row in rows if row.result.error and needle in row.result.error.lower()]
+        if query.min_duration_seconds is not None:
+            threshold = query.min_duration_seconds
+            rows = [row for row in rows if row.duration_seconds >= threshold]
+
+        if query.sort_by != "order" or query.descending:
+            if query.sort_by in ("id", "passed"):
+                rows.sort(key=lambda row: getattr(row.result, query.sort_by), reverse=query.descending)
+            else:
+                rows.sort(key=lambda row: getattr(row, query.sort_by), reverse=query.descending)
+
+        page_size = max(1, query.page_size)
+        pages = max(1, math.ceil(len(rows) / page_size))
+        page = min(max(1, query.page), pages)
+        start = (page - 1) * page_size
+        return ResultPage(
+            rows=[self._format(row) for row in rows[start : start + page_size]],
+            matched=len(rows),
+            total=total,
+            page=page,
+            pages=pages,
+        )
+
+    def detail(self, case_id: str, pipeline_name: str | None = None) -> dict[str, Any] | None:
+        """Full, untruncated result of one case (first match when pipeline is omitted)."""
+
+        for row in self._rows:
+            if row.result.id == case_id and (pipeline_name is None or row.pipeline == pipeline_name):
+                return {"pipeline": row.pipeline, **row.result.to_dict()}
+        return None
+
+    def _format(self, row: _Row) -> list[Any]:
+        result = row.result
+        return [
+            row.pipeline,
+            result.id,
+            result.passed,
+            _truncate(_render_value(result.output), self.max_cell_chars),
+            _truncate(_render_value(result.expected_output), self.max_cell_chars),
+            _truncate(result.error or "", self.max_cell_chars),
+            row.duration_seconds,
+        ]
+
+
+__all__ = ["RESULT_COLUMNS", "ResultPage", "ResultQuery", "ResultTable", "SORT_COLUMNS", "STATUS_FILTERS"]
@@ -1,10 +1,138 @@
 """Test runner that executes pipelines against test cases."""
 from __future__ import annotations
 
+import contextvars
+import logging
+import threading
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import Any, Callable, Iterable, Mapping, Protocol
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping, Protocol, Sequence, TypeVar
 
-from .models import Comparator, TestCase, TestResult, TestRun
+from sgr.llm.deadline import DeadlineExceeded, deadline, deadline_reason, remaining
+from sgr.llm.pricing import ModelPrice, PriceTable
+from sgr.llm.usage import track_usage
+
+from .budget import COST_BUDGET_STOP_REASON, TOKEN_BUDGET_STOP_REASON, RunBudget
+from .compact import KEEP_OUTPUTS, OUTPUT_MODES, CompactResults
+from .fingerprint import case_fingerprint, describe_model, pipeline_fingerprint
+from .models import Comparator, SampleResult, TestCase, TestResult, TestRun
+
+_logger = logging.getLogger(__name__)
+
+_WorkItem = tuple[int, TestCase, Comparator]
+T = TypeVar("T")
+
+DEADLINE_STOP_REASON = "deadline"
+BACKENDS = ("thread", "process", "queue")
+
+
+class _RunLimits:
+    """Run deadline and budget of one :meth:`TestRunner.run` call."""
+
+    def __init__(self, run_timeout: float | None, budget: RunBudget | None, price: ModelPrice | None) -> None:
+        self.deadline_at = time.monotonic() + run_timeout if run_timeout is not None else None
+        self.budget = budget
+        self.price = price
+
+    def add(self, result: TestResult) -> None:
+        if self.budget is not None:
+            self.budget.charge(result.usage, self.price)
+
+    def exceeded(self) -> str | None:
+        if self.deadline_at is not None and time.monotonic() >= self.deadline_at:
+            return DEADLINE_STOP_REASON
+        return self.budget.exhausted() if self.budget is not None else None
+
+
+class _Finished:
+    """Results of one run as they finish, handed back in input order."""
+
+    def __init__(self, compact: CompactResults | None) -> None:
+        self._items: list[tuple[int, TestResult]] = []
+        self._compact = compact
+        self._indexes = array("q")
+
+    def add(self, index: int, result: TestResult) -> None:
+        if self._compact is None:
+            self._items.append((index, result))
+        else:
+            self._compact.append(result)
+            self._indexes.append(index)
+
+    def results(self) -> Sequence[TestResult]:
+        if self._compact is None:
+            self._items.sort(key=lambda item: item[0])
+            return [result for _, result in self._items]
+        order = sorted(range(len(self._indexes)), key=self._indexes.__getitem__)
+        if all(position == rank for rank, position in enumerate(order)):
+            return self._compact
+        return self._compact.permuted(order)
+
+
+def _call_within_deadline(func: Callable[..., T], *args: Any) -> T:
+    """Call ``func`` and give up when the current deadline passes.
+
+    Without a deadline ``func`` runs inline. Otherwise it runs in a daemon
+    thread with a copy of the context; the LLM client inside it stops at the
+    same deadline, and anything that ignores it is abandoned.
+    """
+
+    left = remaining()
+    if left is None:
+        return func(*args)
+    future: Future[T] = Future()
+    context = contextvars.copy_context()
+
+    def _target() -> None:
+        try:
+            future.set_result(context.run(func, *args))
+        except BaseException as error:  # noqa: BLE001
+            future.set_exception(error)
+
+    threading.Thread(target=_target, name="sgr-test-case", daemon=True).start()
+    try:
+        return future.result(timeout=max(0.0, left))
+    except FutureTimeoutError:
+        raise DeadlineExceeded(deadline_reason()) from None
+
+
+def _split_usage(usage: dict[str, int] | None, parts: int) -> list[dict[str, int] | None]:
+    """Divide integer counters between ``parts`` cases; remainders go to the first ones."""
+
+    if usage is None:
+        return [None] * parts
+    shares: list[dict[str, int] | None] = []
+    for position in range(parts):
+        shares.append(
+            {name: value // parts + (1 if position < value % parts else 0) for name, value in usage.items()}
+        )
+    return shares
+
+
+def _group_by_prefix(pipeline: Pipeline, indexed: Iterable[tuple[int, TestCase]]) -> list[tuple[int, TestCase]]:
+    """Stable reorder that puts cases with the same prompt prefix next to each other."""
+
+    groups: dict[str | None, list[tuple[int, TestCase]]] = {}
+    for index, test_case in indexed:
+        try:
+            key: str | None = pipeline.prefix_key(**test_case.params)  # type: ignore[attr-defined]
+        except Exception:  # noqa: BLE001
+            key = None
+        groups.setdefault(key, []).append((index, test_case))
+    return [item for group in groups.values() for item in group]
+
+
+def _merge_usage(first: dict[str, int] | None, second: dict[str, int] | None) -> dict[str, int] | None:
+    if first is None or second is None:
+        return first or second
+    merged = dict(first)
+    for name, value in second.items():
+        merged[name] = merged.get(name, 0) + value
+    return merged
 
 
 class Pipeline(Protocol):
@@ -22,51 +150,498 @@ def default_comparator(actual: Any, expected: Any) -> bool:
 
 
 class TestRunner:
-    """Execute pipelines against a suite of test cases."""
+    """Execute pipelines against a suite of test cases.
+
+    With ``max_workers > 1`` cases run concurrently on a thread pool; at most
+    ``max_workers`` cases are in flight, so lazily produced test cases are
+    still consumed incrementally. Passing ``executor`` lets several runners
+    share one pool (see :mod:`sgr.testing.sweep`). Results are always
+    returned in input order.
+
+    With ``repeat > 1`` every case is sampled several times. Pipelines that
+    define ``run_samples(n, **params)`` get all samples from one request
+    (the API ``n`` parameter); missing samples are drawn with concurrent
+    ``run`` calls. The result keeps the first sample as ``passed``/``output``
+    and all of them in ``samples``.
+
+    With ``batch_size > 1`` pipelines that define ``run_batch(items)`` get
+    up to ``batch_size`` cases per request. Items the batch could not answer
+    (returned as exceptions) are retried with a single-item ``run``. Usage of
+    the batched request is split evenly between its cases, and every case
+    reports the batch latency.
+
+    ``group_by_prefix=True`` reorders cases of pipelines with
+    ``prefix_key(**params)`` so that requests sharing a prompt prefix are sent
+    back to back, which raises provider prompt-cache hits. Results still come
+    back in input order.
+
+    ``case_timeout`` bounds the wall-clock time of one case including
+    retries; ``run_timeout`` bounds the whole run. Cases still running when
+    a deadline passes are cut short with the timeout as their ``error``, no
+    new cases start, and the run gets ``stop_reason="deadline"``.
+
+    ``token_budget`` (total tokens) and ``cost_budget`` (USD, priced with
+    ``price_table``, see :mod:`sgr.llm.pricing`) stop scheduling new cases
+    once finished cases spent them; the run gets ``stop_reason`` of
+    ``"token_budget"`` or ``"cost_budget"`` and a ``budget`` report section.
+    Pass a :class:`~sgr.testing.budget.RunBudget` as ``budget`` to share one
+    budget between several runs.
+
+    ``backend="process"`` runs cases on ``max_workers`` processes for
+    CPU-bound pipelines and comparators. :meth:`run` then takes the pipeline
+    as a ``module:attribute`` reference; every worker builds its own
+    pipeline from it and sends back compact result tuples, which the parent
+    turns into the same :class:`TestRun` as the threaded backend. Runner
+    comparators must be picklable (module-level functions).
+
+    ``backend="queue"`` puts the cases into the SQLite work queue at
+    ``queue`` (see :mod:`sgr.testing.work_queue`) and waits while workers
+    started with ``sgr-test worker`` lease, run and report them; a worker
+    that stops heartbeating loses its leases after ``lease_timeout``
+    seconds and its cases go to other workers.
+
+    ``compact=True`` stores finished results in columns
+    (:class:`~sgr.testing.compact.CompactResults`) instead of a list of
+    objects, for suites of hundreds of thousands of cases. ``outputs``
+    (``"keep"``, ``"failed"`` or ``"spill"`` to a temporary file in
+    ``spill_dir``) also sheds outputs and expected outputs; any mode other
+    than ``"keep"`` implies ``compact``.
+    """
 
     def __init__(
         self,
         *,
         comparator: Comparator | None = None,
         comparators: Mapping[str, Comparator] | None = None,
+        max_workers: int = 1,
+        executor: Executor | None = None,
+        repeat: int = 1,
+        batch_size: int = 1,
+        group_by_prefix: bool = False,
+        case_timeout: float | None = None,
+        run_timeout: float | None = None,
+        token_budget: int | None = None,
+        cost_budget: float | None = None,
+        price_table: PriceTable | None = None,
+        budget: RunBudget | None = None,
+        backend: str = "thread",
+        queue: Path | str | None = None,
+        lease_timeout: float = 60.0,
+        compact: bool = False,
+        outputs: str = KEEP_OUTPUTS,
+        spill_dir: Path | None = None,
     ) -> None:
+        if backend not in BACKENDS:
+            msg = f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}"
+            raise ValueError(msg)
+        if backend != "thread" and executor is not None:
+            msg = f"The {backend} backend manages its own workers and cannot use an executor"
+            raise ValueError(msg)
+        if (backend == "queue") != (queue is not None):
+            msg = "The queue backend needs a queue path, and a queue path needs backend='queue'"
+            raise ValueError(msg)
+        if lease_timeout <= 0:
+            msg = "lease_timeout must be positive"
+            raise ValueError(msg)
+        if outputs not in OUTPUT_MODES:
+            msg = f"Unknown outputs mode '{outputs}', expected one of {', '.join(OUTPUT_MODES)}"
+            raise ValueError(msg)
+        if max_workers < 1:
+            msg = "max_workers must be at least 1"
+            raise ValueError(msg)
+        if repeat < 1:
+            msg = "repeat must be at least 1"
+            raise ValueError(msg)
+        if batch_size < 1:
+            msg = "batch_size must be at least 1"
+            raise ValueError(msg)
+        if repeat > 1 and batch_size > 1:
+            msg = "repeat and batch_size cannot be combined"
+            raise ValueError(msg)
+        for name, limit in (("case_timeout", case_timeout), ("run_timeout", run_timeout)):
+            if limit is not None and limit <= 0:
+                msg = f"{name} must be positive"
+                raise ValueError(msg)
         self._runner_comparator = comparator
         self._comparators = dict(comparators or {})
+        self._max_workers = max_workers
+        self._executor = executor
+        self._repeat = repeat
+        self._batch_size = batch_size
+        self._group_by_prefix = group_by_prefix
+        self._case_timeout = case_timeout
+        self._run_timeout = run_timeout
+        self._budget = budget
+        self._budget_options: dict[str, Any] | None = None
+        if budget is None and (token_budget is not None or cost_budget is not None):
+            self._budget_options = {"token_budget": token_budget, "cost_budget": cost_budget, "price_table": price_table}
+            RunBudget(**self._budget_options)  # validates the limits up front
+        self._backend = backend
+        self._queue = Path(queue) if queue is not None else None
+        self._lease_timeout = lease_timeout
+        self._compact = compact or outputs != KEEP_OUTPUTS
+        self._outputs = outputs
+        self._spill_dir = spill_dir
+
+    def run(
+        self,
+        pipeline: Pipeline | str,
+        test_cases: Iterable[TestCase],
+        *,
+        on_result: Callable[[TestResult], None] | None = None,
+        stop_event: threading.Event | None = None,
+    ) -> TestRun:
+        """Execute a pipeline against provided test cases.
+
+        ``pipeline`` may be a ``module:attribute`` reference (required by the
+        process and queue backends). ``on_result`` is called after every finished case,
+        which lets callers stream progress. Setting ``stop_event`` stops
+        scheduling new cases; the returned run then contains only finished
+        cases and has ``stop_reason="cancelled"``.
+        """
+
+        reference: str | None = None
+        if isinstance(pipeline, str):
+            from .references import load_pipeline
 
-    def run(self, pipeline: Pipeline, test_cases: Iterable[TestCase]) -> TestRun:
-        """Execute a pipeline against provided test cases."""
+            reference, pipeline = pipeline, load_pipeline(pipeline)
+        if self._backend != "thread" and reference is None:
+            msg = f"The {self._backend} backend needs the pipeline as a 'module:attribute' reference"
+            raise ValueError(msg)
 
         started_at = datetime.utcnow()
-        results: list[TestResult] = []
+        budget = self._budget
+        if budget is None and self._budget_options is not None:
+            budget = RunBudget(**self._budget_options)
+        price = budget.price(describe_model(pipeline)[0]) if budget is not None else None
+        limits = _RunLimits(self._run_timeout, budget, price)
+        indexed: Iterable[tuple[int, TestCase]] = enumerate(test_cases)
+        if self._group_by_prefix and callable(getattr(pipeline, "prefix_key", None)):
+            indexed = _group_by_prefix(pipeline, indexed)
+        if self._backend == "queue":
+            results, stop_reason = self._run_queued(pipeline, indexed, on_result, stop_event, limits, reference)
+        elif self._backend == "process":
+            results, stop_reason = self._run_concurrent(pipeline, indexed, on_result, stop_event, limits, reference)
+        elif self._max_workers == 1 and self._executor is None:
+            results, stop_reason = self._run_sequential(pipeline, indexed, on_result, stop_event, limits)
+        else:
+            results, stop_reason = self._run_concurrent(pipeline, indexed, on_result, stop_event, limits)
+        if stop_reason is None and limits.exceeded() == DEADLINE_STOP_REASON:
+            # Every case was scheduled, but some were cut short by the run deadline.
+            stop_reason = DEADLINE_STOP_REASON
+
+        ended_at = datetime.utcnow()
+        pipeline_name = getattr(pipeline, "name", pipeline.__class__.__name__)
+        model, model_parameters = describe_model(pipeline)
+        return TestRun(
+            pipeline_name=pipeline_name,
+            started_at=started_at,
+            ended_at=ended_at,
+            results=results,
+            pipeline_fingerprint=pipeline_fingerprint(pipeline),
+            stop_reason=stop_reason,
+            model=model,
+            model_parameters=model_parameters,
+            budget=budget.to_dict() if budget is not None else None,
+        )
+
+    def _finished(self) -> _Finished:
+        compact = CompactResults(outputs=self._outputs, spill_dir=self._spill_dir) if self._compact else None
+        return _Finished(compact)
+
+    def _worker_options(self) -> dict[str, Any]:
+        """Constructor arguments of the per-process runners of the process backend."""
+
+        return {
+            "comparator": self._runner_comparator,
+            "comparators": self._comparators,
+            "repeat": self._repeat,
+            "batch_size": self._batch_size,
+            "case_timeout": self._case_timeout,
+        }
+
+    def _units(self, pipeline: Pipeline, indexed: Iterable[tuple[int, TestCase]]) -> Iterator[list[_WorkItem]]:
+        """Group cases into units of work: single cases, or batches for ``run_batch`` pipelines."""
+
+        size = self._batch_size if callable(getattr(pipeline, "run_batch", None)) else 1
+        unit: list[_WorkItem] = []
+        for index, test_case in indexed:
+            # Comparator lookup errors surface in the caller, before any case of the unit runs.
+            unit.append((index, test_case, self._select_comparator(test_case=test_case, pipeline=pipeline)))
+            if len(unit) == size:
+                yield unit
+                unit = []
+        if unit:
+            yield unit
+
+    def run_unit(
+        self, pipeline: Pipeline, cases: Iterable[tuple[int, TestCase]], deadline_at: float | None = None
+    ) -> list[tuple[int, TestResult]]:
+        """Run indexed cases in the calling thread and return ``(index, result)`` pairs.
+
+        This is the entry point of execution backends that run cases outside
+        :meth:`run` (process pool workers, queue workers). Cases run in order,
+        sent ``batch_size`` at a time to pipelines with ``run_batch``.
+        ``deadline_at`` is the ``time.monotonic()`` deadline of the whole run.
+        Comparator lookup errors are raised before any case runs.
+        """
+
+        units = list(self._units(pipeline, cases))
+        return [item for unit in units for item in self._run_unit(pipeline, unit, deadline_at)]
+
+    def _run_unit(
+        self, pipeline: Pipeline, unit: list[_WorkItem], deadline_at: float | None = None
+    ) -> list[tuple[int, TestResult]]:
+        with deadline(at=deadline_at, reason=f"Run deadline of {self._run_timeout}s exceeded"):
+            if len(unit) == 1:
+                index, test_case, comparator = unit[0]
+                return [(index, self._execute_case(pipeline, test_case, comparator))]
+            return self._execute_batch(pipeline, unit)
+
+    def _run_sequential(
+        self,
+        pipeline: Pipeline,
+        indexed: Iterable[tuple[int, TestCase]],
+        on_result: Callable[[TestResult], None] | None,
+        stop_event: threading.Event | None,
+        limits: _RunLimits,
+    ) -> tuple[Sequence[TestResult], str | None]:
+        finished = self._finished()
+        stop_reason: str | None = None
+        for unit in self._units(pipeline, indexed):
+            if stop_event is not None and stop_event.is_set():
+                stop_reason = "cancelled"
+                break
+            stop_reason = limits.exceeded()
+            if stop_reason is not None:
+                break
+
+            for index, result in self._run_unit(pipeline, unit, limits.deadline_at):
+                finished.add(index, result)
+                limits.add(result)
+                if on_result is not None:
+                    on_result(result)
+
+        return finished.results(), stop_reason
+
+    def _run_concurrent(
+        self,
+        pipeline: Pipeline,
+        indexed: Iterable[tuple[int, TestCase]],
+        on_result: Callable[[TestResult], None] | None,
+        stop_event: threading.Event | None,
+        limits: _RunLimits,
+        reference: str | None = None,
+    ) -> tuple[Sequence[TestResult], str | None]:
+        executor: Executor
+        if reference is not None:
+            from .processes import check_picklable, process_executor, run_packed_unit, unpack_result
+
+            options = self._worker_options()
+            # Per-case comparators travel with the cases; check them all before the first unit is sent.
+            indexed = list(indexed)
+            check_picklable(options, (test_case for _, test_case in indexed))
+            executor = process_executor(reference, self._max_workers, options)
+        else:
+            executor = self._executor or ThreadPoolExecutor(max_workers=self._max_workers)
+        finished = self._finished()
+        pending: set[Future[Any]] = set()
+        units: dict[Future[Any], list[_WorkItem]] = {}
+        stop_reason: str | None = None
+
+        def _submit(unit: list[_WorkItem]) -> Future[Any]:
+            if reference is None:
+                future = executor.submit(self._run_unit, pipeline, unit, limits.deadline_at)
+            else:
+                cases = [(index, test_case) for index, test_case, _ in unit]
+                future = executor.submit(run_packed_unit, cases, limits.deadline_at)
+            units[future] = unit
+            return future
 
-        for test_case in test_cases:
-            case_started_at = datetime.utcnow()
-            comparator = self._select_comparator(test_case=test_case, pipeline=pipeline)
+        def _results(future: Future[Any]) -> list[tuple[int, TestResult]]:
+            unit = units.pop(future)
+            if reference is None:
+                return future.result()
+            cases = {index: test_case for index, test_case, _ in unit}
+            return [
+                (packed[0], unpack_result(packed, cases[packed[0]], case_fingerprint(cases[packed[0]])))
+                for packed in future.result()
+            ]
+
+        def _collect(done: Iterable[Future[Any]]) -> None:
+            for future in done:
+                for index, result in _results(future):
+                    finished.add(index, result)
+                    limits.add(result)
+                    if on_result is not None:
+                        on_result(result)
+
+        try:
+            for unit in self._units(pipeline, indexed):
+                if stop_event is not None and stop_event.is_set():
+                    stop_reason = "cancelled"
+                    break
+                if len(pending) >= self._max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect(done)
+                stop_reason = limits.exceeded()
+                if stop_reason is not None:
+                    break
+                pending.add(_submit(unit))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done)
+        finally:
+            if self._executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return finished.results(), stop_reason
+
+    def _run_queued(
+        self,
+        pipeline: Pipeline,
+        indexed: Iterable[tuple[int, TestCase]],
+        on_result: Callable[[TestResult], None] | None,
+        stop_event: threading.Event | None,
+        limits: _RunLimits,
+        reference: str,
+    ) -> tuple[Sequence[TestResult], str | None]:
+        from .work_queue import WorkQueue, coordinate
+
+        options = self._worker_options()
+        cases = [(index, test_case) for unit in self._units(pipeline, indexed) for index, test_case, _ in unit]
+        wall_deadline = None if limits.deadline_at is None else time.time() + (limits.deadline_at - time.monotonic())
+        work_queue = WorkQueue(self._queue)  # type: ignore[arg-type]
+        work_queue.create(
+            cases,
+            pipeline=reference,
+            fingerprint=pipeline_fingerprint(pipeline),
+            options=options,
+            lease_timeout=self._lease_timeout,
+            deadline=wall_deadline,
+        )
+        finished = self._finished()
+
+        def _on_finished(index: int, result: TestResult) -> None:
+            finished.add(index, result)
+            limits.add(result)
+            if on_result is not None:
+                on_result(result)
+
+        def _should_stop() -> str | None:
+            if stop_event is not None and stop_event.is_set():
+                return "cancelled"
+            return limits.exceeded()
+
+        stop_reason = coordinate(work_queue, _on_finished, _should_stop)
+        return finished.results(), stop_reason
+
+    def _case_timeout_reason(self) -> str:
+        return f"Case timed out after {self._case_timeout}s"
+
+    def _execute_batch(self, pipeline: Pipeline, unit: list[_WorkItem]) -> list[tuple[int, TestResult]]:
+        started_at = datetime.utcnow()
+        with track_usage() as usage, deadline(self._case_timeout, reason=self._case_timeout_reason()):
             try:
-                output = pipeline.run(**test_case.params)
-                passed = comparator(output, test_case.expected_output)
-                error: str | None = None
+                items = [test_case.params for _, test_case, _ in unit]
+                outputs = list(_call_within_deadline(pipeline.run_batch, items))  # type: ignore[attr-defined]
             except Exception as exc:  # noqa: BLE001
-                output = None
-                passed = False
-                error = str(exc)
-            case_ended_at = datetime.utcnow()
+                outputs = [exc] * len(unit)
+        ended_at = datetime.utcnow()
+        missing = len(unit) - len(outputs)
+        outputs.extend(ValueError("Item is missing from the batched response") for _ in range(missing))
+        shares = _split_usage(usage.as_dict() if usage.requests else None, len(unit))
 
-            results.append(
-                TestResult(
+        results: list[tuple[int, TestResult]] = []
+        for (index, test_case, comparator), output, share in zip(unit, outputs, shares):
+            if isinstance(output, Exception):
+                result = self._execute_case(pipeline, test_case, comparator)
+                result.started_at = started_at
+                result.usage = _merge_usage(share, result.usage)
+            else:
+                judged = self._judge(output, test_case, comparator)
+                result = TestResult(
                     id=test_case.id,
-                    passed=passed,
-                    output=output,
+                    passed=judged.passed,
+                    output=judged.output,
                     expected_output=test_case.expected_output,
-                    started_at=case_started_at,
-                    ended_at=case_ended_at,
-                    error=error,
+                    started_at=started_at,
+                    ended_at=ended_at,
+                    error=judged.error,
+                    case_hash=case_fingerprint(test_case),
+                    usage=share,
                 )
-            )
+            results.append((index, result))
+        return results
 
-        ended_at = datetime.utcnow()
-        pipeline_name = getattr(pipeline, "name", pipeline.__class__.__name__)
-        return TestRun(pipeline_name=pipeline_name, started_at=started_at, ended_at=ended_at, results=results)
+    def _run_case(self, pipeline: Pipeline, test_case: TestCase) -> TestResult:
+        comparator = self._select_comparator(test_case=test_case, pipeline=pipeline)
+        return self._execute_case(pipeline, test_case, comparator)
+
+    def _execute_case(self, pipeline: Pipeline, test_case: TestCase, comparator: Comparator) -> TestResult:
+        case_started_at = datetime.utcnow()
+        samples: list[SampleResult] | None = None
+        with track_usage() as usage, deadline(self._case_timeout, reason=self._case_timeout_reason()):
+            try:
+                if self._repeat == 1:
+                    first = _call_within_deadline(self._attempt, pipeline, test_case, comparator)
+                else:
+                    samples = _call_within_deadline(self._sample, pipeline, test_case, comparator)
+                    first = samples[0]
+            except DeadlineExceeded as exc:
+                first = SampleResult(passed=False, output=None, error=str(exc))
+        case_ended_at = datetime.utcnow()
+
+        return TestResult(
+            id=test_case.id,
+            passed=first.passed,
+            output=first.output,
+            expected_output=test_case.expected_output,
+            started_at=case_started_at,
+            ended_at=case_ended_at,
+            error=first.error,
+            case_hash=case_fingerprint(test_case),
+            usage=usage.as_dict() if usage.requests else None,
+            samples=samples,
+        )
+
+    @staticmethod
+    def _judge(output: Any, test_case: TestCase, comparator: Comparator) -> SampleResult:
+        if isinstance(output, Exception):
+            return SampleResult(passed=False, output=None, error=str(output))
+        try:
+            return SampleResult(passed=bool(comparator(output, test_case.expected_output)), output=output)
+        except Exception as exc:  # noqa: BLE001
+            return SampleResult(passed=False, output=output, error=str(exc))
+
+    def _attempt(self, pipeline: Pipeline, test_case: TestCase, comparator: Comparator) -> SampleResult:
+        try:
+            output = pipeline.run(**test_case.params)
+        except Exception as exc:  # noqa: BLE001
+            return SampleResult(passed=False, output=None, error=str(exc))
+        return self._judge(output, test_case, comparator)
+
+    def _sample(self, pipeline: Pipeline, test_case: TestCase, comparator: Comparator) -> list[SampleResult]:
+        samples: list[SampleResult] = []
+        run_samples = getattr(pipeline, "run_samples", None)
+        if callable(run_samples):
+            try:
+                outputs = list(run_samples(self._repeat, **test_case.params))[: self._repeat]
+            except Exception as exc:  # noqa: BLE001
+                _logger.debug("run_samples failed for %s, falling back to separate calls: %s", test_case.id, exc)
+                outputs = []
+            samples = [self._judge(output, test_case, comparator) for output in outputs]
+
+        missing = self._repeat - len(samples)
+        if missing:
+            # Each call runs in a copy of the current context so its usage lands in this case's recorder.
+            with ThreadPoolExecutor(max_workers=missing) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self._attempt, pipeline, test_case, comparator)
+                    for _ in range(missing)
+                ]
+                samples.extend(future.result() for future in futures)
+        return samples
 
     def _select_comparator(self, *, test_case: TestCase, pipeline: Pipeline) -> Comparator:
         if callable(test_case.comparator):
@@ -93,4 +668,12 @@ class TestRunner:
         return default_comparator
 
 
-__all__ = ["Pipeline", "TestRunner", "default_comparator"]
+__all__ = [
+    "BACKENDS",
+    "COST_BUDGET_STOP_REASON",
+    "DEADLINE_STOP_REASON",
+    "TOKEN_BUDGET_STOP_REASON",
+    "Pipeline",
+    "TestRunner",
+    "default_comparator",
+]
@@ -0,0 +1,127 @@
+"""pass@k and flakiness statistics for cases run with several samples."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from .models import TestResult
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """Unbiased estimate of the chance that at least one of ``k`` samples passes.
+
+    ``n`` samples were drawn and ``c`` of them passed: ``1 - C(n-c, k) / C(n, k)``.
+    """
+
+    if not 0 < k <= n:
+        msg = f"k must be in 1..{n}, got {k}"
+        raise ValueError(msg)
+    if n - c < k:
+        return 1.0
+    return 1.0 - math.comb(n - c, k) / math.comb(n, k)
+
+
+def default_ks(n: int) -> list[int]:
+    """Powers of two up to ``n`` plus ``n`` itself."""
+
+    ks = [1]
+    while ks[-1] * 2 < n:
+        ks.append(ks[-1] * 2)
+    if ks[-1] != n:
+        ks.append(n)
+    return ks
+
+
+@dataclass(frozen=True, slots=True)
+class CaseSampling:
+    """Samples of one case."""
+
+    id: str
+    samples: int
+    passed: int
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.samples if self.samples else 0.0
+
+    @property
+    def flaky(self) -> bool:
+        """Passed in some samples and failed in others."""
+
+        return 0 < self.passed < self.samples
+
+
+@dataclass(slots=True)
+class SamplingStats:
+    """Per-case pass rates and suite-level pass@k."""
+
+    cases: list[CaseSampling]
+    pass_at_k: dict[int, float]
+
+    @property
+    def samples_per_case(self) -> int:
+        return min((case.samples for case in self.cases), default=0)
+
+    @property
+    def mean_pass_rate(self) -> float:
+        return sum(case.pass_rate for case in self.cases) / len(self.cases) if self.cases else 0.0
+
+    @property
+    def flaky(self) -> list[CaseSampling]:
+        return [case for case in self.cases if case.flaky]
+
+
+def sampling_stats(results: Iterable[TestResult], ks: Iterable[int] | None = None) -> SamplingStats | None:
+    """Statistics over results that carry samples; ``None`` for single-sample runs."""
+
+    cases = [
+        CaseSampling(
+            id=result.id,
+            samples=len(result.samples),
+            passed=sum(1 for sample in result.samples if sample.passed),
+        )
+        for result in results
+        if result.samples
+    ]
+    if not cases:
+        return None
+
+    n = min(case.samples for case in cases)
+    estimates = {
+        k: sum(pass_at_k(case.samples, case.passed, k) for case in cases) / len(cases)
+        for k in (ks if ks is not None else default_ks(n))
+        if 0 < k <= n
+    }
+    return SamplingStats(cases=cases, pass_at_k=estimates)
+
+
+def sampling_summary(results: Iterable[TestResult]) -> dict[str, Any] | None:
+    """JSON section of the run report.
+
+    ``accuracy_basis`` records that the run summary (passed/failed/accuracy)
+    counts the first sample of every case; ``mean_pass_rate`` covers all samples.
+    """
+
+    stats = sampling_stats(results)
+    if stats is None:
+        return None
+    return {
+        "accuracy_basis": "first_sample",
+        "samples_per_case": stats.samples_per_case,
+        "pass_at_k": {str(k): value for k, value in stats.pass_at_k.items()},
+        "mean_pass_rate": stats.mean_pass_rate,
+        "pass_rates": {case.id: case.pass_rate for case in stats.cases},
+        "flaky": [case.id for case in stats.flaky],
+    }
+
+
+__all__ = [
+    "CaseSampling",
+    "SamplingStats",
+    "default_ks",
+    "pass_at_k",
+    "sampling_stats",
+    "sampling_summary",
+]
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from pydantic import RootModel, ValidationError, BaseModel, Field
 
@@ -28,6 +28,16 @@ class TestCasePayload(BaseModel):
         description="Произвольные метаданные (например, тема, язык, заметки)",
     )
 
+    def to_test_case(self) -> TestCase:
+        return TestCase(
+            id=self.id,
+            params=self.params,
+            expected_output=self.expected_output,
+            comparator=self.comparator,
+            description=self.description,
+            metadata=self.metadata,
+        )
+
 
 class TestCasesFile(RootModel[list[TestCasePayload]]):
     """Корневой объект JSON-файла с тестами."""
@@ -35,24 +45,51 @@ class TestCasesFile(RootModel[list[TestCasePayload]]):
     root: list[TestCasePayload]
 
     def to_test_cases(self) -> list[TestCase]:
-        return [
-            TestCase(
-                id=item.id,
-                params=item.params,
-                expected_output=item.expected_output,
-                comparator=item.comparator,
-                description=item.description,
-                metadata=item.metadata,
-            )
-            for item in self.root
-        ]
+        return [item.to_test_case() for item in self.root]
 
 
 TEST_CASES_JSON_SCHEMA = TestCasesFile.model_json_schema()
 
 
+JSONL_SUFFIXES = frozenset({".jsonl", ".ndjson"})
+
+
+def is_jsonl(path: Path) -> bool:
+    """Проверить, что файл хранит тест-кейсы построчно (JSON Lines)."""
+
+    return path.suffix.lower() in JSONL_SUFFIXES
+
+
+def iter_test_cases(path: Path) -> Iterator[TestCase]:
+    """Лениво читать тест-кейсы, валидируя каждый по отдельности.
+
+    Для JSONL-файлов каждая непустая строка — один объект ``TestCasePayload``;
+    файл читается построчно, поэтому в памяти одновременно находится только
+    текущий кейс. Ошибка валидации содержит номер строки. Обычные JSON-файлы
+    загружаются целиком через :func:`load_test_cases`.
+    """
+
+    if not is_jsonl(path):
+        yield from load_test_cases(path)
+        return
+
+    with path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                payload = TestCasePayload.model_validate_json(line)
+            except ValidationError as exc:  # noqa: B904
+                msg = f"Invalid test case at {path}:{line_number}: {exc}"
+                raise ValueError(msg) from exc
+            yield payload.to_test_case()
+
+
 def load_test_cases(path: Path) -> list[TestCase]:
-    """Загрузить и провалидировать тест-кейсы из JSON-файла."""
+    """Загрузить и провалидировать тест-кейсы из JSON- или JSONL-файла."""
+
+    if is_jsonl(path):
+        return list(iter_test_cases(path))
 
     try:
         payload = TestCasesFile.model_validate_json(path.read_text())
@@ -63,4 +100,11 @@ def load_test_cases(path: Path) -> list[TestCase]:
     return payload.to_test_cases()
 
 
-__all__ = ["TEST_CASES_JSON_SCHEMA", "load_test_cases", "TestCasePayload", "TestCasesFile"]
+__all__ = [
+    "TEST_CASES_JSON_SCHEMA",
+    "is_jsonl",
+    "iter_test_cases",
+    "load_test_cases",
+    "TestCasePayload",
+    "TestCasesFile",
+]
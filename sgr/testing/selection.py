@@ -0,0 +1,267 @@
+"""Selector expressions and an in-memory index for picking test-case subsets.
+
+Selector syntax::
+
+    topic=logistics and locale=ru-RU
+    routing-* or id=splitter-two-*
+    tag=smoke and not topic!=fulfillment
+    (topic=logistics or topic=fulfillment) and not id=*-basic
+
+* ``key=value`` / ``key!=value`` compare a field; values may contain glob
+  wildcards (``*``, ``?``, ``[...]``) and may be quoted.
+* ``id`` matches the case id, ``tag`` matches an element of
+  ``metadata["tags"]``, ``comparator`` matches the comparator name; any other
+  key is looked up in ``metadata`` (list values match any element).
+* A bare token is an id glob, so ``routing-*`` is ``id=routing-*``.
+* ``and`` binds tighter than ``or``; ``not`` and parentheses work as usual.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Iterable, Iterator, Protocol
+
+from .models import TestCase
+
+_TOKEN_RE = re.compile(r"""\s*(?:(\()|(\))|(!=|=)|"([^"]*)"|'([^']*)'|([^\s()=!"']+))""")
+_GLOB_CHARS = frozenset("*?[")
+_KEYWORDS = frozenset({"and", "or", "not"})
+
+
+def case_values(case: TestCase, key: str) -> list[str]:
+    """Return normalised string values of ``key`` for a test case."""
+
+    if key == "id":
+        return [case.id]
+    if key == "comparator":
+        return [case.comparator] if isinstance(case.comparator, str) else []
+
+    metadata = case.metadata or {}
+    value: Any = metadata.get("tags") if key == "tag" else metadata.get(key)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+class TestCaseIndex:
+    """Index over ids, tags and metadata values of a suite.
+
+    Equality lookups resolve through posting lists; globs only scan the
+    distinct values of one key, never the cases themselves.
+    """
+
+    def __init__(self, test_cases: Iterable[TestCase]) -> None:
+        self.test_cases: list[TestCase] = list(test_cases)
+        self._postings: dict[str, dict[str, set[int]]] = {}
+        for position, case in enumerate(self.test_cases):
+            keys = ["id", "comparator", "tag", *(case.metadata or {})]
+            for key in keys:
+                for value in case_values(case, key):
+                    self._postings.setdefault(key, {}).setdefault(value, set()).add(position)
+
+    def __len__(self) -> int:
+        return len(self.test_cases)
+
+    @property
+    def keys(self) -> list[str]:
+        """Keys available for selection."""
+
+        return sorted(self._postings)
+
+    def values(self, key: str) -> list[str]:
+        """Distinct values indexed for ``key``."""
+
+        return sorted(self._postings.get(key, {}))
+
+    def positions(self, key: str, pattern: str) -> set[int]:
+        postings = self._postings.get(key, {})
+        if not _GLOB_CHARS.intersection(pattern):
+            return set(postings.get(pattern, ()))
+
+        matched: set[int] = set()
+        for value, positions in postings.items():
+            if fnmatchcase(value, pattern):
+                matched |= positions
+        return matched
+
+    def select(self, selector: Selector | str) -> list[TestCase]:
+        """Return cases matching ``selector`` in their original order."""
+
+        if isinstance(selector, str):
+            selector = parse_selector(selector)
+        return [self.test_cases[position] for position in sorted(selector.evaluate(self))]
+
+
+class Selector(Protocol):
+    """Parsed selector expression."""
+
+    def matches(self, case: TestCase) -> bool: ...
+
+    def evaluate(self, index: TestCaseIndex) -> set[int]: ...
+
+
+@dataclass(frozen=True, slots=True)
+class _Compare:
+    key: str
+    pattern: str
+    negate: bool = False
+
+    def _hit(self, case: TestCase) -> bool:
+        return any(fnmatchcase(value, self.pattern) for value in case_values(case, self.key))
+
+    def matches(self, case: TestCase) -> bool:
+        return self._hit(case) != self.negate
+
+    def evaluate(self, index: TestCaseIndex) -> set[int]:
+        hits = index.positions(self.key, self.pattern)
+        if self.negate:
+            return set(range(len(index))) - hits
+        return hits
+
+
+@dataclass(frozen=True, slots=True)
+class _Not:
+    operand: Selector
+
+    def matches(self, case: TestCase) -> bool:
+        return not self.operand.matches(case)
+
+    def evaluate(self, index: TestCaseIndex) -> set[int]:
+        return set(range(len(index))) - self.operand.evaluate(index)
+
+
+@dataclass(frozen=True, slots=True)
+class _And:
+    operands: tuple[Selector, ...]
+
+    def matches(self, case: TestCase) -> bool:
+        return all(operand.matches(case) for operand in self.operands)
+
+    def evaluate(self, index: TestCaseIndex) -> set[int]:
+        result = self.operands[0].evaluate(index)
+        for operand in self.operands[1:]:
+            if not result:
+                break
+            result &= operand.evaluate(index)
+        return result
+
+
+@dataclass(frozen=True, slots=True)
+class _Or:
+    operands: tuple[Selector, ...]
+
+    def matches(self, case: TestCase) -> bool:
+        return any(operand.matches(case) for operand in self.operands)
+
+    def evaluate(self, index: TestCaseIndex) -> set[int]:
+        result: set[int] = set()
+        for operand in self.operands:
+            result |= operand.evaluate(index)
+        return result
+
+
+def _tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if match is None or match.end() == position:
+            msg = f"Unexpected character in selector at position {position}: {expression[position:]!r}"
+            raise ValueError(msg)
+        position = match.end()
+        lparen, rparen, operator, double_quoted, single_quoted, word = match.groups()
+        if lparen:
+            tokens.append(("(", lparen))
+        elif rparen:
+            tokens.append((")", rparen))
+        elif operator:
+            tokens.append(("op", operator))
+        elif double_quoted is not None or single_quoted is not None:
+            tokens.append(("value", double_quoted if double_quoted is not None else single_quoted))
+        elif word.lower() in _KEYWORDS:
+            tokens.append((word.lower(), word))
+        else:
+            tokens.append(("value", word))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, expression: str) -> None:
+        self._tokens = _tokenize(expression)
+        self._position = 0
+
+    def _peek(self) -> str | None:
+        return self._tokens[self._position][0] if self._position < len(self._tokens) else None
+
+    def _take(self, kind: str) -> str:
+        if self._peek() != kind:
+            found = self._tokens[self._position][1] if self._position < len(self._tokens) else "end of selector"
+            msg = f"Expected {kind!r} in selector, found {found!r}"
+            raise ValueError(msg)
+        value = self._tokens[self._position][1]
+        self._position += 1
+        return value
+
+    def parse(self) -> Selector:
+        if not self._tokens:
+            msg = "Selector expression is empty"
+            raise ValueError(msg)
+        selector = self._or()
+        if self._peek() is not None:
+            msg = f"Unexpected token {self._tokens[self._position][1]!r} in selector"
+            raise ValueError(msg)
+        return selector
+
+    def _or(self) -> Selector:
+        operands = [self._and()]
+        while self._peek() == "or":
+            self._take("or")
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else _Or(tuple(operands))
+
+    def _and(self) -> Selector:
+        operands = [self._not()]
+        while self._peek() == "and":
+            self._take("and")
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else _And(tuple(operands))
+
+    def _not(self) -> Selector:
+        if self._peek() == "not":
+            self._take("not")
+            return _Not(self._not())
+        return self._atom()
+
+    def _atom(self) -> Selector:
+        if self._peek() == "(":
+            self._take("(")
+            selector = self._or()
+            self._take(")")
+            return selector
+
+        left = self._take("value")
+        if self._peek() != "op":
+            return _Compare(key="id", pattern=left)
+        operator = self._take("op")
+        return _Compare(key=left, pattern=self._take("value"), negate=operator == "!=")
+
+
+def parse_selector(expression: str) -> Selector:
+    """Parse a selector expression, raising ``ValueError`` on syntax errors."""
+
+    return _Parser(expression).parse()
+
+
+def filter_test_cases(test_cases: Iterable[TestCase], selector: Selector | str) -> Iterator[TestCase]:
+    """Lazily filter a stream of cases without building an index."""
+
+    if isinstance(selector, str):
+        selector = parse_selector(selector)
+    return (case for case in test_cases if selector.matches(case))
+
+
+__all__ = ["Selector", "TestCaseIndex", "case_values", "filter_test_cases", "parse_selector"]
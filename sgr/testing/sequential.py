@@ -0,0 +1,148 @@
+"""Sequential early stopping: run cases until accuracy is clearly above or below a target."""
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Callable, Sequence
+
+from .models import TestCase, TestResult, TestRun
+from .runner import Pipeline, TestRunner
+
+ABOVE = "above"
+BELOW = "below"
+UNDECIDED = "undecided"
+EARLY_STOP_REASON = "early_stop"
+
+
+def wilson_interval(passed: int, total: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+
+    if total == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    proportion = passed / total
+    denominator = 1 + z**2 / total
+    centre = (proportion + z**2 / (2 * total)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / total + z**2 / (4 * total**2)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+@dataclass(slots=True)
+class SequentialEstimate:
+    """Running Wilson interval on accuracy with a stopping decision.
+
+    The interval is checked after every result once ``min_cases`` are in.
+    Looking at the interval repeatedly makes the nominal confidence
+    optimistic, so prefer a stricter ``confidence`` (e.g. 0.99) and a
+    reasonable ``min_cases`` for go/no-go decisions.
+    """
+
+    threshold: float
+    confidence: float = 0.95
+    min_cases: int = 30
+    passed: int = 0
+    evaluated: int = 0
+    requests: int = 0
+    tokens: int = 0
+    decision: str = UNDECIDED
+
+    @property
+    def accuracy(self) -> float:
+        return self.passed / self.evaluated if self.evaluated else 0.0
+
+    @property
+    def interval(self) -> tuple[float, float]:
+        return wilson_interval(self.passed, self.evaluated, self.confidence)
+
+    def update(self, result: TestResult) -> str:
+        """Add one result and return the current decision."""
+
+        self.evaluated += 1
+        self.passed += int(result.passed)
+        if result.usage:
+            self.requests += result.usage.get("requests", 0)
+            self.tokens += result.usage.get("total_tokens", 0)
+        if self.decision == UNDECIDED and self.evaluated >= self.min_cases:
+            low, high = self.interval
+            if low >= self.threshold:
+                self.decision = ABOVE
+            elif high < self.threshold:
+                self.decision = BELOW
+        return self.decision
+
+    def to_dict(self, suite_size: int) -> dict[str, Any]:
+        """Report section with the estimate and the work saved by stopping early."""
+
+        low, high = self.interval
+        skipped = max(0, suite_size - self.evaluated)
+        per_case = 1 / self.evaluated if self.evaluated else 0.0
+        return {
+            "method": "sequential_wilson",
+            "threshold": self.threshold,
+            "confidence": self.confidence,
+            "decision": self.decision,
+            "accuracy": self.accuracy,
+            "interval": [low, high],
+            "evaluated": self.evaluated,
+            "suite_size": suite_size,
+            "cases_skipped": skipped,
+            "requests_saved_estimate": round(self.requests * per_case * skipped),
+            "tokens_saved_estimate": round(self.tokens * per_case * skipped),
+        }
+
+
+@dataclass(slots=True)
+class EarlyStopper:
+    """Connects a :class:`SequentialEstimate` to ``TestRunner.run`` callbacks."""
+
+    estimate: SequentialEstimate
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    forward: Callable[[TestResult], None] | None = None
+
+    def on_result(self, result: TestResult) -> None:
+        if self.estimate.update(result) != UNDECIDED:
+            self.stop_event.set()
+        if self.forward is not None:
+            self.forward(result)
+
+
+def run_until_confident(
+    runner: TestRunner,
+    pipeline: Pipeline,
+    test_cases: Sequence[TestCase],
+    *,
+    threshold: float,
+    confidence: float = 0.95,
+    min_cases: int = 30,
+    on_result: Callable[[TestResult], None] | None = None,
+) -> TestRun:
+    """Run ``test_cases`` in the given order until the interval clears ``threshold``.
+
+    Shuffle or stratify the cases beforehand (see :mod:`sgr.testing.strata`);
+    a suite sorted by topic would give a biased early estimate. The run gets
+    ``stop_reason="early_stop"`` when it stopped before the end and an
+    ``estimate`` section with the interval and the calls saved.
+    """
+
+    stopper = EarlyStopper(
+        SequentialEstimate(threshold=threshold, confidence=confidence, min_cases=min_cases), forward=on_result
+    )
+    test_run = runner.run(pipeline, test_cases, on_result=stopper.on_result, stop_event=stopper.stop_event)
+    if stopper.estimate.decision != UNDECIDED and len(test_run.results) < len(test_cases):
+        test_run.stop_reason = EARLY_STOP_REASON
+    test_run.estimate = stopper.estimate.to_dict(len(test_cases))
+    return test_run
+
+
+__all__ = [
+    "ABOVE",
+    "BELOW",
+    "EARLY_STOP_REASON",
+    "EarlyStopper",
+    "SequentialEstimate",
+    "UNDECIDED",
+    "run_until_confident",
+    "wilson_interval",
+]
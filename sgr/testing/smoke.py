@@ -0,0 +1,150 @@
+"""Stratified subsets of a suite for fast smoke runs and their weighted estimate."""
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Sequence
+
+from .models import TestCase, TestRun
+from .strata import assign_strata
+
+
+@dataclass(slots=True)
+class SmokeSample:
+    """Selected cases plus what is needed to weight their results back to the suite."""
+
+    key: str
+    seed: int
+    cases: list[TestCase]
+    strata: dict[str, str] = field(default_factory=dict)
+    """Stratum of every selected case id."""
+    population: dict[str, int] = field(default_factory=dict)
+    """Number of suite cases in every stratum."""
+
+    @property
+    def suite_size(self) -> int:
+        return sum(self.population.values())
+
+
+def _allocate(population: dict[str, int], target: int, min_per_stratum: int) -> dict[str, int]:
+    """Proportional allocation (largest remainder) with a floor per stratum."""
+
+    total = sum(population.values())
+    quotas = {stratum: target * size / total for stratum, size in population.items()}
+    allocation = {
+        stratum: min(size, max(min_per_stratum, math.floor(quotas[stratum]))) for stratum, size in population.items()
+    }
+    remaining = target - sum(allocation.values())
+    by_remainder = sorted(population, key=lambda stratum: (-(quotas[stratum] % 1), stratum))
+    for stratum in by_remainder:
+        if remaining <= 0:
+            break
+        if allocation[stratum] < population[stratum]:
+            allocation[stratum] += 1
+            remaining -= 1
+    return allocation
+
+
+def smoke_sample(
+    cases: Sequence[TestCase],
+    key: str,
+    *,
+    fraction: float | None = None,
+    size: int | None = None,
+    seed: int = 0,
+    min_per_stratum: int = 1,
+) -> SmokeSample:
+    """Pick a stratified subset of ``cases``.
+
+    Exactly one of ``fraction`` and ``size`` sets the target size. Strata get
+    a proportional share but never fewer than ``min_per_stratum`` cases, so
+    rare classes are always represented (the subset may therefore be a bit
+    larger than requested). The selection depends only on the suite and
+    ``seed`` and keeps the suite's original order.
+    """
+
+    if (fraction is None) == (size is None):
+        msg = "Pass exactly one of fraction and size"
+        raise ValueError(msg)
+    if fraction is not None and not 0 < fraction <= 1:
+        msg = "fraction must be in (0, 1]"
+        raise ValueError(msg)
+
+    assigned = assign_strata(cases, key)
+    members: dict[str, list[int]] = {}
+    for position, stratum in enumerate(assigned):
+        members.setdefault(stratum, []).append(position)
+    population = {stratum: len(positions) for stratum, positions in sorted(members.items())}
+    if not cases:
+        return SmokeSample(key=key, seed=seed, cases=[], population=population)
+
+    target = size if size is not None else math.ceil(fraction * len(cases))  # type: ignore[operator]
+    allocation = _allocate(population, min(max(target, 1), len(cases)), min_per_stratum)
+
+    rng = random.Random(seed)
+    chosen: list[int] = []
+    for stratum in population:
+        chosen.extend(rng.sample(members[stratum], allocation[stratum]))
+    chosen.sort()
+    return SmokeSample(
+        key=key,
+        seed=seed,
+        cases=[cases[position] for position in chosen],
+        strata={cases[position].id: assigned[position] for position in chosen},
+        population=population,
+    )
+
+
+def stratified_estimate(test_run: TestRun, sample: SmokeSample, confidence: float = 0.95) -> dict[str, Any]:
+    """Per-stratum accuracy and the population-weighted overall estimate.
+
+    The interval uses the stratified standard error with a finite population
+    correction. Every stratum's variance comes from its Agresti–Coull
+    adjusted proportion, so a stratum that passed or failed completely still
+    adds uncertainty (the Wald variance would be zero). Strata without
+    finished cases are left out of the estimate.
+    """
+
+    counts: dict[str, list[int]] = {stratum: [0, 0] for stratum in sample.population}
+    for result in test_run.results:
+        stratum = sample.strata.get(result.id)
+        if stratum is not None:
+            counts[stratum][0] += int(result.passed)
+            counts[stratum][1] += 1
+
+    covered = {stratum: value for stratum, value in counts.items() if value[1]}
+    covered_population = sum(sample.population[stratum] for stratum in covered)
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    weighted = 0.0
+    variance = 0.0
+    strata: dict[str, dict[str, Any]] = {}
+    for stratum, (passed, total) in counts.items():
+        size = sample.population[stratum]
+        accuracy = passed / total if total else None
+        strata[stratum] = {"passed": passed, "total": total, "population": size, "accuracy": accuracy}
+        if not total:
+            continue
+        weight = size / covered_population
+        weighted += weight * accuracy
+        correction = (size - total) / (size - 1) if size > 1 else 0.0
+        adjusted_total = total + z**2
+        adjusted = (passed + z**2 / 2) / adjusted_total
+        variance += weight**2 * adjusted * (1 - adjusted) / adjusted_total * correction
+
+    margin = z * math.sqrt(variance)
+    return {
+        "method": "stratified",
+        "key": sample.key,
+        "seed": sample.seed,
+        "confidence": confidence,
+        "accuracy": weighted,
+        "interval": [max(0.0, weighted - margin), min(1.0, weighted + margin)],
+        "evaluated": sum(total for _, total in counts.values()),
+        "suite_size": sample.suite_size,
+        "strata": strata,
+    }
+
+
+__all__ = ["SmokeSample", "smoke_sample", "stratified_estimate"]
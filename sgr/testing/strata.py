@@ -0,0 +1,89 @@
+"""Grouping test cases into strata and deterministic sampling orders."""
+from __future__ import annotations
+
+import itertools
+import random
+from collections import Counter
+from typing import Any, Sequence
+
+from .models import TestCase
+from .selection import case_values
+
+EXPECTED_PREFIX = "expected."
+MISSING_STRATUM = "(none)"
+
+
+def stratum_values(case: TestCase, key: str) -> list[str]:
+    """Values of ``key`` for one case.
+
+    ``expected.<field>`` reads a field of ``expected_output`` (e.g.
+    ``expected.categories``); any other key resolves like in selectors
+    (``id``, ``tag``, or a ``metadata`` entry).
+    """
+
+    if not key.startswith(EXPECTED_PREFIX):
+        return case_values(case, key)
+
+    expected = case.expected_output
+    field = key[len(EXPECTED_PREFIX) :]
+    value: Any = expected.get(field) if isinstance(expected, dict) else getattr(expected, field, None)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def assign_strata(cases: Sequence[TestCase], key: str) -> list[str]:
+    """One stratum per case, aligned with ``cases``.
+
+    A case with several values (e.g. two expected categories) goes to its
+    rarest value across the suite, so that rare classes keep their own
+    stratum instead of being absorbed by common ones.
+    """
+
+    values = [stratum_values(case, key) for case in cases]
+    frequency = Counter(value for own in values for value in set(own))
+    return [min(own, key=lambda value: (frequency[value], value)) if own else MISSING_STRATUM for own in values]
+
+
+def random_order(cases: Sequence[TestCase], seed: int | None = None) -> list[TestCase]:
+    """Shuffled copy of ``cases``; the same seed gives the same order."""
+
+    shuffled = list(cases)
+    random.Random(seed).shuffle(shuffled)
+    return shuffled
+
+
+def stratified_order(cases: Sequence[TestCase], key: str, seed: int | None = None) -> list[TestCase]:
+    """Order in which every prefix is close to proportional across strata.
+
+    Cases are shuffled within their stratum and the ``i``-th of ``n`` cases
+    is placed at ``(i + u) / n`` with a random ``u`` in ``[0, 1)``; sorting by
+    that position interleaves strata by their share of the suite.
+    """
+
+    rng = random.Random(seed)
+    groups: dict[str, list[TestCase]] = {}
+    for case, stratum in zip(cases, assign_strata(cases, key)):
+        groups.setdefault(stratum, []).append(case)
+
+    tiebreak = itertools.count()
+    placed: list[tuple[float, int, TestCase]] = []
+    for stratum in sorted(groups):
+        members = groups[stratum]
+        rng.shuffle(members)
+        size = len(members)
+        placed.extend(((rank + rng.random()) / size, next(tiebreak), case) for rank, case in enumerate(members))
+    placed.sort(key=lambda item: (item[0], item[1]))
+    return [case for _, _, case in placed]
+
+
+__all__ = [
+    "EXPECTED_PREFIX",
+    "MISSING_STRATUM",
+    "assign_strata",
+    "random_order",
+    "stratified_order",
+    "stratum_values",
+]
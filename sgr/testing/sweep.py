@@ -0,0 +1,329 @@
+"""Running one suite against a matrix of models and request parameters."""
+from __future__ import annotations
+
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+from sgr.llm.client import LLMClientConfig, OpenAIClient
+from sgr.llm.endpoints import LEAST_OUTSTANDING, EndpointConfig
+from sgr.llm.hedging import HedgePolicy
+from sgr.llm.pricing import load_price_table
+from sgr.llm.rate_limit import RateLimiter
+
+from .budget import RunBudget
+from .cache import SuiteCache
+from .history import RunRecord, summarize_run
+from .models import TestCase, TestRun
+from .references import load_reference
+from .reports import save_report
+from .runner import Pipeline, TestRunner
+from .schema import is_jsonl, iter_test_cases
+from .selection import TestCaseIndex
+
+_CLIENT_KEYS = ("model", "base_url", "api_key_env", "label", "batch_size", "hedge", "endpoints", "routing")
+COMPARISON_COLUMNS = (
+    "variant",
+    "model",
+    "accuracy",
+    "passed",
+    "total",
+    "mean_latency_seconds",
+    "p95_latency_seconds",
+    "total_tokens",
+    "duration_seconds",
+    "cases_per_second",
+)
+
+
+@dataclass(slots=True)
+class SweepVariant:
+    """One combination of the sweep: model, endpoint, request parameters and batch size.
+
+    ``hedge`` holds :class:`~sgr.llm.hedging.HedgePolicy` keyword arguments
+    (``{}`` for the defaults); ``None`` disables hedging. ``endpoints`` spreads
+    the variant over several gateways (see :class:`~sgr.llm.endpoints.EndpointConfig`).
+    """
+
+    model: str
+    base_url: str | None = None
+    api_key_env: str = "OPENAI_API_KEY"
+    request_kwargs: dict[str, Any] = field(default_factory=dict)
+    label: str | None = None
+    batch_size: int = 1
+    hedge: dict[str, Any] | None = None
+    endpoints: list[EndpointConfig] = field(default_factory=list)
+    routing: str = LEAST_OUTSTANDING
+
+    @property
+    def name(self) -> str:
+        if self.label:
+            return self.label
+        parts = [self.model, *(f"{key}={value}" for key, value in sorted(self.request_kwargs.items()))]
+        if self.batch_size > 1:
+            parts.append(f"batch={self.batch_size}")
+        if self.hedge is not None:
+            parts.append("hedge")
+        return ",".join(parts)
+
+    def client_config(self) -> LLMClientConfig:
+        api_key = os.environ.get(self.api_key_env)
+        if not api_key:
+            msg = f"Environment variable {self.api_key_env} is not set (variant {self.name})"
+            raise ValueError(msg)
+        return LLMClientConfig(
+            api_key=api_key,
+            base_url=self.base_url,
+            model=self.model,
+            request_kwargs=dict(self.request_kwargs),
+            endpoints=list(self.endpoints),
+            routing=self.routing,
+        )
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> SweepVariant:
+        if "model" not in payload:
+            msg = f"Sweep variant without 'model': {dict(payload)}"
+            raise ValueError(msg)
+        return cls(
+            model=payload["model"],
+            base_url=payload.get("base_url"),
+            api_key_env=payload.get("api_key_env") or "OPENAI_API_KEY",
+            request_kwargs={key: value for key, value in payload.items() if key not in _CLIENT_KEYS},
+            label=payload.get("label"),
+            batch_size=int(payload.get("batch_size") or 1),
+            hedge=_hedge_options(payload.get("hedge")),
+            endpoints=[EndpointConfig.from_dict(item) for item in payload.get("endpoints") or []],
+            routing=payload.get("routing") or LEAST_OUTSTANDING,
+        )
+
+
+def _hedge_options(value: Any) -> dict[str, Any] | None:
+    if value is None or value is False:
+        return None
+    return {} if value is True else dict(value)
+
+
+def expand_matrix(matrix: Mapping[str, Any]) -> list[SweepVariant]:
+    """Cartesian product of matrix axes.
+
+    ``model``, ``base_url`` and ``api_key_env`` configure the client and
+    ``batch_size`` the runner (see ``TestRunner(batch_size=...)``), ``hedge``
+    enables request hedging (``true`` or policy options); every
+    other key becomes a request parameter. Scalar values are single-value axes.
+    """
+
+    axes = {key: value if isinstance(value, list) else [value] for key, value in matrix.items()}
+    keys = list(axes)
+    return [SweepVariant.from_dict(dict(zip(keys, values))) for values in itertools.product(*axes.values())]
+
+
+@dataclass(slots=True)
+class SweepConfig:
+    """Sweep definition, usually loaded from JSON with :func:`load_sweep_config`.
+
+    ``pipeline`` references a factory that accepts the client as its only
+    argument, e.g. ``sgr.pipelines.routing.pipeline:build_pipeline``.
+    ``token_budget`` and ``cost_budget`` (USD) cap the whole sweep: all
+    variants charge one :class:`~sgr.testing.budget.RunBudget`.
+    """
+
+    pipeline: str
+    tests: Path
+    variants: list[SweepVariant]
+    select: str | None = None
+    max_workers: int = 8
+    requests_per_minute: float | None = None
+    report_dir: Path | None = None
+    token_budget: int | None = None
+    cost_budget: float | None = None
+    price_table: Path | None = None
+
+    def budget(self) -> RunBudget | None:
+        if self.token_budget is None and self.cost_budget is None:
+            return None
+        return RunBudget(
+            token_budget=self.token_budget,
+            cost_budget=self.cost_budget,
+            price_table=load_price_table(self.price_table) if self.price_table else None,
+        )
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any], *, base_dir: Path = Path(".")) -> SweepConfig:
+        variants = expand_matrix(payload["matrix"]) if payload.get("matrix") else []
+        variants.extend(SweepVariant.from_dict(item) for item in payload.get("variants", []))
+        if not variants:
+            msg = "Sweep config needs a 'matrix' or a list of 'variants'"
+            raise ValueError(msg)
+        report_dir = payload.get("report_dir")
+        price_table = payload.get("price_table")
+        return cls(
+            pipeline=payload["pipeline"],
+            tests=base_dir / payload["tests"],
+            variants=variants,
+            select=payload.get("select"),
+            max_workers=int(payload.get("max_workers", 8)),
+            requests_per_minute=payload.get("requests_per_minute"),
+            report_dir=base_dir / report_dir if report_dir else None,
+            token_budget=payload.get("token_budget"),
+            cost_budget=payload.get("cost_budget"),
+            price_table=base_dir / price_table if price_table else None,
+        )
+
+
+def load_sweep_config(path: Path) -> SweepConfig:
+    """Read a sweep JSON file; relative paths are resolved against the working directory."""
+
+    try:
+        payload = json.loads(path.read_text())
+        return SweepConfig.from_dict(payload)
+    except (json.JSONDecodeError, KeyError, TypeError) as exc:  # noqa: B904
+        msg = f"Invalid sweep config at {path}: {exc}"
+        raise ValueError(msg) from exc
+
+
+@dataclass(slots=True)
+class SweepOutcome:
+    """Run (or failure to build the pipeline) of one variant."""
+
+    variant: SweepVariant
+    test_run: TestRun | None = None
+    report_path: Path | None = None
+    error: str | None = None
+
+    @property
+    def record(self) -> RunRecord | None:
+        if self.test_run is None:
+            return None
+        return summarize_run(self.test_run, path=str(self.report_path or ""))
+
+
+ClientFactory = Callable[[SweepVariant, RateLimiter | None], Any]
+
+
+def _default_client(variant: SweepVariant, rate_limiter: RateLimiter | None) -> OpenAIClient:
+    hedging = HedgePolicy(**variant.hedge) if variant.hedge is not None else None
+    return OpenAIClient(variant.client_config(), rate_limiter=rate_limiter, hedging=hedging)
+
+
+def _load_cases(config: SweepConfig, cache: SuiteCache | None) -> list[TestCase]:
+    if cache is None or is_jsonl(config.tests):
+        test_cases = list(iter_test_cases(config.tests))
+    else:
+        test_cases = cache.load(config.tests)
+    if config.select:
+        test_cases = TestCaseIndex(test_cases).select(config.select)
+    return test_cases
+
+
+def run_sweep(
+    config: SweepConfig,
+    *,
+    test_cases: Sequence[TestCase] | None = None,
+    factory: Callable[[Any], Pipeline] | None = None,
+    client_factory: ClientFactory = _default_client,
+    cache: SuiteCache | None = None,
+    save_reports: bool = True,
+    on_finished: Callable[[SweepOutcome], None] | None = None,
+) -> list[SweepOutcome]:
+    """Run every variant concurrently through one shared worker pool and rate limiter.
+
+    All combinations submit cases to the same ``max_workers`` pool, so the
+    total number of in-flight requests never exceeds it, and all clients
+    share one :class:`RateLimiter` when ``requests_per_minute`` is set and
+    one budget when ``token_budget`` or ``cost_budget`` is set.
+    Outcomes are returned in variant order.
+    """
+
+    cases = list(test_cases) if test_cases is not None else _load_cases(config, cache)
+    build = factory or load_reference(config.pipeline)
+    if not callable(build):
+        msg = f"Sweep pipeline '{config.pipeline}' must be a factory accepting a client"
+        raise ValueError(msg)
+    rate_limiter = RateLimiter(config.requests_per_minute) if config.requests_per_minute else None
+    budget = config.budget()
+    workers = max(1, config.max_workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sweep-case") as case_pool:
+
+        def _run_variant(variant: SweepVariant) -> SweepOutcome:
+            try:
+                pipeline = build(client_factory(variant, rate_limiter))
+                runner = TestRunner(
+                    max_workers=workers, executor=case_pool, batch_size=variant.batch_size, budget=budget
+                )
+                test_run = runner.run(pipeline=pipeline, test_cases=cases)
+            except Exception as exc:  # noqa: BLE001
+                outcome = SweepOutcome(variant=variant, error=str(exc))
+            else:
+                outcome = SweepOutcome(variant=variant, test_run=test_run)
+                if save_reports and config.report_dir is not None:
+                    outcome.report_path = save_report(test_run, config.report_dir, label=variant.name)
+            if on_finished is not None:
+                on_finished(outcome)
+            return outcome
+
+        with ThreadPoolExecutor(max_workers=len(config.variants), thread_name_prefix="sweep-variant") as coordinators:
+            return list(coordinators.map(_run_variant, config.variants))
+
+
+def comparison_rows(outcomes: Sequence[SweepOutcome]) -> list[list[Any]]:
+    """Rows for :data:`COMPARISON_COLUMNS`, best accuracy first, then lower p95 latency."""
+
+    rows: list[tuple[RunRecord, SweepOutcome]] = []
+    for outcome in outcomes:
+        record = outcome.record
+        if record is not None:
+            rows.append((record, outcome))
+    rows.sort(key=lambda item: (-item[0].accuracy, item[0].p95_latency_seconds, item[0].total_tokens))
+    return [
+        [
+            outcome.variant.name,
+            record.model_label,
+            record.accuracy,
+            record.passed,
+            record.total,
+            record.mean_latency_seconds,
+            record.p95_latency_seconds,
+            record.total_tokens,
+            record.duration_seconds,
+            record.total / record.duration_seconds if record.duration_seconds else 0.0,
+        ]
+        for record, outcome in rows
+    ]
+
+
+def format_comparison(outcomes: Sequence[SweepOutcome]) -> str:
+    """Markdown table of accuracy vs. latency, tokens and throughput, plus failed variants."""
+
+    lines = [
+        "| Variant | Model | Accuracy | Passed | Mean latency | p95 latency | Tokens | Duration | Cases/s |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for name, model, accuracy, passed, total, mean, p95, tokens, duration, rate in comparison_rows(outcomes):
+        lines.append(
+            f"| {name} | {model} | {accuracy:.2%} | {passed}/{total} | {mean:.3f}s | {p95:.3f}s "
+            f"| {tokens} | {duration:.2f}s | {rate:.2f} |"
+        )
+    failed = [outcome for outcome in outcomes if outcome.error is not None]
+    if failed:
+        lines.append("")
+        lines.extend(f"Failed: {outcome.variant.name}: {outcome.error}" for outcome in failed)
+    return "\n".join(lines)
+
+
+__all__ = [
+    "COMPARISON_COLUMNS",
+    "SweepConfig",
+    "SweepOutcome",
+    "SweepVariant",
+    "comparison_rows",
+    "expand_matrix",
+    "format_comparison",
+    "load_sweep_config",
+    "run_sweep",
+]
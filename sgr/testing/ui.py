@@ -1,13 +1,25 @@
 """Gradio UI for launching test runs and inspecting results."""
 from __future__ import annotations
 
+import json
+import queue
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable, Mapping
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
 import gradio as gr
 
+from .cache import SuiteCache
+from .diff import STILL_PASSING, diff_runs
+from .discovery import PIPELINES_PACKAGE, PIPELINES_ROOT, discover_suites
+from .history import RunHistory, RunRecord
 from .models import Comparator, TestCase, TestResult, TestRun
+from .reports import json_default, load_report, save_report
+from .results_table import RESULT_COLUMNS, SORT_COLUMNS, ResultQuery, ResultTable
 from .runner import Pipeline, TestRunner
+from .selection import TestCaseIndex, parse_selector
 
 
 @dataclass(slots=True)
@@ -18,6 +30,54 @@ class PipelineSuite:
     test_cases: list[TestCase]
     name: str | None = None
     description: str | None = None
+    reports_dir: Path | None = None
+
+    @classmethod
+    def from_path(
+        cls,
+        pipeline: Pipeline,
+        tests_path: Path,
+        *,
+        name: str | None = None,
+        description: str | None = None,
+        reports_dir: Path | None = None,
+        cache: SuiteCache | None = None,
+    ) -> PipelineSuite:
+        """Собрать набор из файла с тестами, используя кэш провалидированных наборов."""
+
+        test_cases = (cache or SuiteCache.default()).load(tests_path)
+        return cls(
+            pipeline=pipeline,
+            test_cases=test_cases,
+            name=name,
+            description=description,
+            reports_dir=reports_dir,
+        )
+
+
+def discovered_pipeline_suites(
+    root: Path = PIPELINES_ROOT,
+    *,
+    package: str = PIPELINES_PACKAGE,
+    cache: SuiteCache | None = None,
+) -> list[PipelineSuite]:
+    """Собрать наборы для UI из автоматически найденных пакетов пайплайнов.
+
+    Пайплайны подключаются лениво: модуль импортируется только при первом
+    запуске набора.
+    """
+
+    cache = cache or SuiteCache.default()
+    return [
+        PipelineSuite(
+            pipeline=suite.pipeline,
+            test_cases=suite.load_test_cases(cache),
+            name=suite.name,
+            description=f"`{suite.pipeline_reference}` · {suite.tests_path.name}",
+            reports_dir=suite.reports_dir,
+        )
+        for suite in discover_suites(root, package=package)
+    ]
 
 
 def _format_summary(test_run: TestRun) -> str:
@@ -27,24 +87,122 @@ def _format_summary(test_run: TestRun) -> str:
         f"**Тестов:** {summary.total}, **Пройдено:** {summary.passed}, **Провалено:** {summary.failed}\n\n"
         f"**Точность:** {summary.accuracy:.0%}\n\n"
         f"**Длительность:** {test_run.duration_seconds:.2f} сек"
+        + (f"\n\n**Токены:** {test_run.usage.get('total_tokens', 0)}" if test_run.usage else "")
+        + ("\n\n**Остановлено:** прогон прерван до завершения" if test_run.stop_reason else "")
     )
 
 
-def _format_results(test_results: Iterable[TestResult], *, pipeline_name: str) -> list[list[Any]]:
-    rows: list[list[Any]] = []
-    for result in test_results:
-        rows.append(
-            [
-                pipeline_name,
-                result.id,
-                result.passed,
-                result.output,
-                result.expected_output,
-                result.error,
-                result.duration_seconds,
-            ]
-        )
-    return rows
+def _format_progress(name: str, done: int, total: int, passed: int) -> str:
+    width = 20
+    filled = round(width * done / total) if total else width
+    bar = "█" * filled + "░" * (width - filled)
+    return f"**Выполняется:** {name}\n\n`{bar}` {done}/{total} · пройдено {passed}"
+
+
+HISTORY_COLUMNS = (
+    "pipeline",
+    "model",
+    "started_at",
+    "accuracy",
+    "passed",
+    "total",
+    "mean_latency_seconds",
+    "p95_latency_seconds",
+    "total_tokens",
+    "cache_hit_ratio",
+    "report",
+)
+HISTORY_DATATYPES = ("str", "str", "str", "number", "number", "number", "number", "number", "number", "number", "str")
+
+
+def _history_rows(records: Iterable[RunRecord]) -> list[list[Any]]:
+    return [
+        [
+            record.pipeline_name,
+            record.model_label,
+            record.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            round(record.accuracy, 4),
+            record.passed,
+            record.total,
+            round(record.mean_latency_seconds, 3),
+            round(record.p95_latency_seconds, 3),
+            record.total_tokens,
+            round(record.prompt_cache_hit_ratio, 4) if record.prompt_cache_hit_ratio is not None else None,
+            Path(record.path).name,
+        ]
+        for record in records
+    ]
+
+
+DIFF_COLUMNS = ("id", "status", "baseline_passed", "candidate_passed", "latency_delta_seconds", "tokens_delta", "error")
+
+
+def _format_diff_summary(baseline_path: str, candidate_path: str) -> tuple[str, list[list[Any]]]:
+    run_diff = diff_runs(load_report(Path(baseline_path)), load_report(Path(candidate_path)))
+    counts = run_diff.counts
+    baseline, candidate = run_diff.baseline.summary, run_diff.candidate.summary
+    summary = (
+        f"**A:** {Path(baseline_path).name} — {baseline.passed}/{baseline.total} ({baseline.accuracy:.1%})\n\n"
+        f"**B:** {Path(candidate_path).name} — {candidate.passed}/{candidate.total} ({candidate.accuracy:.1%})\n\n"
+        f"**Изменение точности:** {run_diff.accuracy_delta:+.1%}\n\n"
+        f"**Стали падать:** {counts['newly_failing']}, **Исправлены:** {counts['fixed']}, "
+        f"**Падают в обоих:** {counts['still_failing']}, **Новые:** {counts['added']}, "
+        f"**Удалены:** {counts['removed']}\n\n"
+        f"**Средняя разница латентности:** {run_diff.mean_latency_delta_seconds:+.3f} сек, "
+        f"**разница токенов:** {run_diff.tokens_delta:+d}"
+    )
+    if run_diff.mcnemar is not None:
+        test = run_diff.mcnemar
+        verdict = "значимо" if test.significant() else "незначимо"
+        summary += f"\n\n**Тест Макнемара ({test.method}):** p = {test.p_value:.4f} — {verdict} при α = 0.05"
+
+    rows = [
+        [
+            case.id,
+            case.status,
+            case.baseline_passed,
+            case.candidate_passed,
+            case.latency_delta_seconds,
+            case.tokens_delta,
+            case.candidate_error or "",
+        ]
+        for case in run_diff.cases
+        if case.status != STILL_PASSING
+    ]
+    return summary, rows
+
+
+def _build_query(
+    status: str,
+    pipelines: list[str] | None,
+    error_contains: str | None,
+    min_duration: float | None,
+    sort_by: str,
+    descending: bool,
+    page: float | None,
+    page_size: float | None,
+) -> ResultQuery:
+    return ResultQuery(
+        status=status or "all",
+        pipelines=tuple(pipelines or ()),
+        error_contains=(error_contains or "").strip(),
+        min_duration_seconds=min_duration if min_duration else None,
+        sort_by=sort_by or "order",
+        descending=bool(descending),
+        page=int(page or 1),
+        page_size=int(page_size or 50),
+    )
+
+
+def _render_page(table: ResultTable | None, query: ResultQuery) -> tuple[list[list[Any]], str]:
+    if table is None or not len(table):
+        return [], "Результатов пока нет."
+    result_page = table.query(query)
+    info = (
+        f"Страница **{result_page.page}** из {result_page.pages} · "
+        f"по фильтру {result_page.matched} из {result_page.total} строк"
+    )
+    return result_page.rows, info
 
 
 def _ensure_suites(
@@ -63,6 +221,7 @@ def _ensure_suites(
                     test_cases=list(suite.test_cases),
                     name=name,
                     description=suite.description,
+                    reports_dir=suite.reports_dir,
                 )
             )
 
@@ -85,6 +244,8 @@ def build_gradio_app(
     comparators: Mapping[str, Comparator] | None = None,
     title: str = "Sgr Test Suite",
     description: str | None = None,
+    report_dirs: Iterable[Path] | None = None,
+    save_reports: bool = True,
 ) -> gr.Blocks:
     """Create a Gradio Blocks application to run tests for one or more pipelines.
 
@@ -95,6 +256,9 @@ def build_gradio_app(
         comparator: Пользовательская функция сравнения результатов.
         title: Заголовок UI.
         description: Описание под заголовком.
+        report_dirs: Каталоги с JSON-отчётами для вкладки истории. По умолчанию —
+            ``reports_dir`` всех наборов.
+        save_reports: Сохранять ли отчёты прогонов из UI в ``reports_dir`` набора.
 
     Returns:
         Конфигурированный ``gr.Blocks``.
@@ -103,8 +267,18 @@ def build_gradio_app(
     suites = _ensure_suites(pipeline=pipeline, test_cases=test_cases, pipeline_suites=pipeline_suites)
     runner = TestRunner(comparator=comparator, comparators=comparators)
     suite_by_name = {suite.name: suite for suite in suites if suite.name is not None}
-
-    def _format_pipeline_info(selected: list[str] | None) -> str:
+    index_by_name = {name: TestCaseIndex(suite.test_cases) for name, suite in suite_by_name.items()}
+    if report_dirs is None:
+        report_dirs = {suite.reports_dir for suite in suites if suite.reports_dir is not None}
+    history = RunHistory.with_default_cache(sorted(report_dirs))
+    history_lock = threading.Lock()
+
+    def _select_cases(name: str, case_filter: str | None) -> list[TestCase]:
+        if not case_filter or not case_filter.strip():
+            return suite_by_name[name].test_cases
+        return index_by_name[name].select(parse_selector(case_filter))
+
+    def _format_pipeline_info(selected: list[str] | None, case_filter: str | None = None) -> str:
         if not selected:
             return "Выберите один или несколько пайплайнов, чтобы увидеть детали."
 
@@ -114,23 +288,212 @@ def build_gradio_app(
             lines.append(f"### {name}")
             if suite.description:
                 lines.append(suite.description)
-            lines.append(f"Тест-кейсов: **{len(suite.test_cases)}**\n")
+            if case_filter and case_filter.strip():
+                try:
+                    matched = len(_select_cases(name, case_filter))
+                except ValueError as exc:
+                    return f"Некорректный фильтр: {exc}"
+                lines.append(f"Тест-кейсов: **{matched}** из {len(suite.test_cases)} по фильтру\n")
+            else:
+                lines.append(f"Тест-кейсов: **{len(suite.test_cases)}**\n")
 
         return "\n".join(lines)
 
-    def _run_selected(selected: list[str] | None) -> tuple[str, list[list[Any]]]:
+    stop_events: dict[str, threading.Event] = {}
+    update_interval_seconds = 0.25
+
+    def _session_key(request: gr.Request | None) -> str:
+        return getattr(request, "session_hash", None) or "default"
+
+    def _run_in_background(
+        suite: PipelineSuite,
+        cases: list[TestCase],
+        updates: queue.Queue[Any],
+        stop_event: threading.Event,
+    ) -> None:
+        # The terminal item (run or error) always reaches the queue, otherwise _run_selected waits forever.
+        outcome: TestRun | BaseException = RuntimeError("прогон прерван")
+        try:
+            outcome = runner.run(
+                pipeline=suite.pipeline,
+                test_cases=cases,
+                on_result=updates.put,
+                stop_event=stop_event,
+            )
+            if save_reports and suite.reports_dir is not None:
+                try:
+                    save_report(outcome, suite.reports_dir)
+                except Exception as exc:  # noqa: BLE001
+                    updates.put(f"**Отчёт не сохранён:** {exc}")
+        except Exception as exc:  # noqa: BLE001
+            outcome = exc
+        finally:
+            updates.put(outcome)
+
+    def _run_selected(
+        selected: list[str] | None,
+        case_filter: str | None,
+        status: str,
+        pipelines: list[str] | None,
+        error_contains: str | None,
+        min_duration: float | None,
+        sort_column: str,
+        sort_descending: bool,
+        page: float | None,
+        rows_per_page: float | None,
+        request: gr.Request | None = None,
+        progress: gr.Progress = gr.Progress(),
+    ) -> Iterator[tuple[Any, ...]]:
+        table = ResultTable()
+        query = _build_query(
+            status, pipelines, error_contains, min_duration, sort_column, sort_descending, page, rows_per_page
+        )
+
+        def _update(summary: str) -> tuple[Any, ...]:
+            rows, info = _render_page(table, query)
+            return summary, rows, info, table, gr.update(choices=table.pipelines)
+
         if not selected:
-            return "Сначала выберите хотя бы один пайплайн.", []
+            yield _update("Сначала выберите хотя бы один пайплайн.")
+            return
+
+        try:
+            cases_by_name = {name: _select_cases(name, case_filter) for name in selected}
+        except ValueError as exc:
+            yield _update(f"Некорректный фильтр: {exc}")
+            return
+
+        total = sum(len(cases) for cases in cases_by_name.values())
+        session_key = _session_key(request)
+        stop_event = threading.Event()
+        stop_events[session_key] = stop_event
 
         summaries: list[str] = []
-        all_rows: list[list[Any]] = []
-        for name in selected:
-            suite = suite_by_name[name]
-            test_run = runner.run(pipeline=suite.pipeline, test_cases=suite.test_cases)
-            summaries.append(_format_summary(test_run))
-            all_rows.extend(_format_results(test_run.results, pipeline_name=name))
+        done = 0
+        try:
+            for name in selected:
+                if stop_event.is_set():
+                    break
+
+                updates: queue.Queue[Any] = queue.Queue()
+                worker = threading.Thread(
+                    target=_run_in_background,
+                    args=(suite_by_name[name], cases_by_name[name], updates, stop_event),
+                    daemon=True,
+                )
+                worker.start()
+
+                passed = 0
+                last_update = 0.0
+                notes: list[str] = []
+                while True:
+                    item = updates.get()
+                    if isinstance(item, str):
+                        notes.append(item)
+                        continue
+                    if isinstance(item, TestResult):
+                        done += 1
+                        passed += int(item.passed)
+                        table.add(item, pipeline_name=name)
+                        progress(done / total if total else 1.0, desc=f"{name}: {done}/{total}")
+                        now = time.monotonic()
+                        if now - last_update >= update_interval_seconds:
+                            last_update = now
+                            partial = [*summaries, _format_progress(name, done, total, passed)]
+                            yield _update("\n\n".join(partial))
+                        continue
+
+                    if isinstance(item, TestRun):
+                        summaries.append("\n\n".join([_format_summary(item), *notes]))
+                    else:
+                        summaries.append(f"**Пайплайн:** {name}\n\n**Ошибка запуска:** {item}")
+                    break
+
+                yield _update("\n\n".join(summaries))
+        finally:
+            # Stop the background run also when the client went away and the generator was closed.
+            stop_event.set()
+            if stop_events.get(session_key) is stop_event:
+                stop_events.pop(session_key)
+
+        yield _update("\n\n".join(summaries))
+
+    def _refresh_page(table: ResultTable | None, *query_args: Any) -> tuple[list[list[Any]], str]:
+        try:
+            return _render_page(table, _build_query(*query_args))
+        except ValueError as exc:
+            return [], f"Некорректный запрос: {exc}"
+
+    def _show_detail(table: ResultTable | None, case_ref: str | None) -> str:
+        if table is None or not case_ref or not case_ref.strip():
+            return ""
+        pipeline_name, _, case_id = case_ref.strip().rpartition("/")
+        detail = table.detail(case_id, pipeline_name or None)
+        if detail is None:
+            return json.dumps({"error": f"Кейс '{case_ref}' не найден"}, ensure_ascii=False)
+        return json.dumps(detail, ensure_ascii=False, indent=2, default=json_default)
+
+    def _cancel_run(request: gr.Request | None = None) -> str:
+        stop_event = stop_events.get(_session_key(request))
+        if stop_event is None:
+            return "Нет активного прогона."
+        stop_event.set()
+        return "Остановка: новые тест-кейсы больше не запускаются, ждём завершения текущих."
+
+    def _refresh_history(trend_name: str | None) -> tuple[Any, ...]:
+        with history_lock:
+            history.refresh()
+            records = history.records
+            pipelines = history.pipelines
+            errors = history.errors
+
+        if not history.report_dirs:
+            info = "Каталоги с отчётами не заданы."
+        else:
+            info = f"Прогонов в истории: **{len(records)}**"
+            if errors:
+                info += f" · не удалось прочитать отчётов: {len(errors)}"
+        selected = trend_name if trend_name in pipelines else (pipelines[0] if pipelines else None)
+        report_choices = [
+            (
+                f"{record.pipeline_name} · {record.model_label} · "
+                f"{record.started_at:%Y-%m-%d %H:%M} · {Path(record.path).name}",
+                record.path,
+            )
+            for record in reversed(records)
+        ]
+        return (
+            info,
+            _history_rows(history.latest()),
+            _history_rows(history.best()),
+            gr.update(choices=pipelines, value=selected),
+            gr.update(choices=report_choices),
+            gr.update(choices=report_choices),
+        )
 
-        return "\n\n".join(summaries), all_rows
+    def _compare_reports(baseline_path: str | None, candidate_path: str | None) -> tuple[str, list[list[Any]]]:
+        if not baseline_path or not candidate_path:
+            return "Выберите два отчёта для сравнения.", []
+        try:
+            return _format_diff_summary(baseline_path, candidate_path)
+        except ValueError as exc:
+            return f"Не удалось сравнить отчёты: {exc}", []
+
+    def _render_trend(trend_name: str | None) -> tuple[Any, ...]:
+        import pandas as pd
+
+        with history_lock:
+            records = history.trend(trend_name) if trend_name else []
+        frame = pd.DataFrame(
+            {
+                "started_at": [record.started_at for record in records],
+                "model": [record.model_label for record in records],
+                "accuracy": [record.accuracy for record in records],
+                "p95_latency_seconds": [record.p95_latency_seconds for record in records],
+                "total_tokens": [record.total_tokens for record in records],
+            }
+        )
+        return frame, frame, frame
 
     pipeline_names = list(suite_by_name)
 
@@ -139,32 +502,127 @@ def build_gradio_app(
         if description:
             gr.Markdown(description)
 
-        pipeline_selector = gr.Dropdown(
-            choices=pipeline_names,
-            multiselect=True,
-            label="Выберите пайплайн(ы)",
-            info="Можно запустить один или сразу несколько пайплайнов",
-        )
+        with gr.Tab("Запуск"):
+            pipeline_selector = gr.Dropdown(
+                choices=pipeline_names,
+                multiselect=True,
+                label="Выберите пайплайн(ы)",
+                info="Можно запустить один или сразу несколько пайплайнов",
+            )
 
-        info_box = gr.Markdown()
-        run_button = gr.Button("Запустить выбранные пайплайны")
-        summary_box = gr.Markdown()
-        results_table = gr.Dataframe(
-            headers=[
-                "pipeline",
-                "id",
-                "passed",
-                "output",
-                "expected_output",
-                "error",
-                "duration_seconds",
-            ],
-            datatype=["str", "str", "bool", "str", "str", "str", "number"],
-            interactive=False,
-        )
+            case_filter = gr.Textbox(
+                label="Фильтр тест-кейсов",
+                placeholder="topic=logistics and locale=ru-RU или routing-*",
+                info="Поддерживаются key=value, key!=value, маски id, and/or/not и скобки",
+            )
 
-        pipeline_selector.change(_format_pipeline_info, inputs=pipeline_selector, outputs=info_box)
-        run_button.click(_run_selected, inputs=pipeline_selector, outputs=[summary_box, results_table])
+            info_box = gr.Markdown()
+            with gr.Row():
+                run_button = gr.Button("Запустить выбранные пайплайны", variant="primary")
+                cancel_button = gr.Button("Остановить", variant="stop")
+            cancel_status = gr.Markdown()
+            summary_box = gr.Markdown()
+            results_state = gr.State(None)
+
+            with gr.Row():
+                status_filter = gr.Radio(
+                    choices=[("все", "all"), ("пройденные", "passed"), ("проваленные", "failed")],
+                    value="all",
+                    label="Статус",
+                )
+                pipeline_filter = gr.Dropdown(choices=[], multiselect=True, label="Пайплайны")
+                error_filter = gr.Textbox(label="Ошибка содержит")
+                duration_filter = gr.Number(value=None, label="Длительность от, сек")
+            with gr.Row():
+                sort_by = gr.Dropdown(choices=list(SORT_COLUMNS), value="order", label="Сортировка")
+                descending = gr.Checkbox(value=False, label="По убыванию")
+                page_number = gr.Number(value=1, precision=0, minimum=1, label="Страница")
+                page_size = gr.Dropdown(choices=[25, 50, 100, 200], value=50, label="Строк на странице")
+
+            page_info = gr.Markdown()
+            results_table = gr.Dataframe(
+                headers=list(RESULT_COLUMNS),
+                datatype=["str", "str", "bool", "str", "str", "str", "number"],
+                interactive=False,
+            )
+
+            with gr.Row():
+                detail_ref = gr.Textbox(
+                    label="Подробнее о кейсе",
+                    placeholder="id или pipeline/id",
+                    info="Полные output и expected_output без обрезки",
+                )
+                detail_button = gr.Button("Показать")
+            detail_view = gr.Code(language="json", label="Полный результат")
+
+            pipeline_selector.change(_format_pipeline_info, inputs=[pipeline_selector, case_filter], outputs=info_box)
+            case_filter.submit(_format_pipeline_info, inputs=[pipeline_selector, case_filter], outputs=info_box)
+            query_inputs = [
+                status_filter,
+                pipeline_filter,
+                error_filter,
+                duration_filter,
+                sort_by,
+                descending,
+                page_number,
+                page_size,
+            ]
+            run_button.click(
+                _run_selected,
+                inputs=[pipeline_selector, case_filter, *query_inputs],
+                outputs=[summary_box, results_table, page_info, results_state, pipeline_filter],
+            )
+            for control in query_inputs:
+                control.change(_refresh_page, inputs=[results_state, *query_inputs], outputs=[results_table, page_info])
+            detail_button.click(_show_detail, inputs=[results_state, detail_ref], outputs=detail_view)
+            detail_ref.submit(_show_detail, inputs=[results_state, detail_ref], outputs=detail_view)
+            cancel_button.click(_cancel_run, inputs=None, outputs=cancel_status)
+
+        with gr.Tab("История прогонов"):
+            history_info = gr.Markdown()
+            history_refresh = gr.Button("Обновить")
+            gr.Markdown("### Последние прогоны")
+            latest_table = gr.Dataframe(headers=list(HISTORY_COLUMNS), datatype=list(HISTORY_DATATYPES), interactive=False)
+            gr.Markdown("### Лучшие прогоны")
+            best_table = gr.Dataframe(headers=list(HISTORY_COLUMNS), datatype=list(HISTORY_DATATYPES), interactive=False)
+            gr.Markdown("### Динамика")
+            trend_pipeline = gr.Dropdown(choices=[], label="Пайплайн")
+            with gr.Row():
+                accuracy_plot = gr.LinePlot(x="started_at", y="accuracy", color="model", title="Точность")
+                latency_plot = gr.LinePlot(x="started_at", y="p95_latency_seconds", color="model", title="p95, сек")
+                tokens_plot = gr.LinePlot(x="started_at", y="total_tokens", color="model", title="Токены")
+
+        with gr.Tab("Сравнение прогонов"):
+            with gr.Row():
+                baseline_report = gr.Dropdown(choices=[], label="Отчёт A (базовый)")
+                candidate_report = gr.Dropdown(choices=[], label="Отчёт B (новый)")
+            compare_button = gr.Button("Сравнить")
+            diff_summary = gr.Markdown()
+            diff_table = gr.Dataframe(
+                headers=list(DIFF_COLUMNS),
+                datatype=["str", "str", "bool", "bool", "number", "number", "str"],
+                interactive=False,
+            )
+            compare_button.click(
+                _compare_reports, inputs=[baseline_report, candidate_report], outputs=[diff_summary, diff_table]
+            )
+
+        history_outputs = [
+            history_info,
+            latest_table,
+            best_table,
+            trend_pipeline,
+            baseline_report,
+            candidate_report,
+        ]
+        trend_outputs = [accuracy_plot, latency_plot, tokens_plot]
+        history_refresh.click(_refresh_history, inputs=trend_pipeline, outputs=history_outputs).then(
+            _render_trend, inputs=trend_pipeline, outputs=trend_outputs
+        )
+        trend_pipeline.change(_render_trend, inputs=trend_pipeline, outputs=trend_outputs)
+        demo.load(_refresh_history, inputs=trend_pipeline, outputs=history_outputs).then(
+            _render_trend, inputs=trend_pipeline, outputs=trend_outputs
+        )
 
     return demo
 
@@ -178,6 +636,8 @@ def launch_gradio_app(
     comparators: Mapping[str, Comparator] | None = None,
     title: str = "Sgr Test Suite",
     description: str | None = None,
+    report_dirs: Iterable[Path] | None = None,
+    save_reports: bool = True,
     **launch_kwargs: Any,
 ) -> None:
     """Convenience wrapper that builds and launches the app.
@@ -195,8 +655,10 @@ def launch_gradio_app(
         comparators=comparators,
         title=title,
         description=description,
+        report_dirs=report_dirs,
+        save_reports=save_reports,
     )
     app.launch(**launch_kwargs)
 
 
-__all__ = ["PipelineSuite", "build_gradio_app", "launch_gradio_app"]
+__all__ = ["PipelineSuite", "build_gradio_app", "discovered_pipeline_suites", "launch_gradio_app"]
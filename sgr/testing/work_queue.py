@@ -0,0 +1,434 @@
+"""SQLite-backed work queue: one coordinator enqueues cases, any number of workers lease and run them."""
+from __future__ import annotations
+
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from .fingerprint import case_fingerprint, pipeline_fingerprint
+from .models import TestCase, TestResult
+from .processes import PackedResult, pack_result, unpack_result
+from .references import load_pipeline
+from .runner import Pipeline, TestRunner
+
+RUNNING = "running"
+CLOSED = "closed"
+FINISHED = "finished"
+
+POLL_INTERVAL = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    run_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    fingerprint TEXT,
+    options BLOB NOT NULL,
+    lease_timeout REAL NOT NULL,
+    max_attempts INTEGER NOT NULL,
+    deadline REAL
+);
+CREATE TABLE IF NOT EXISTS cases (
+    position INTEGER PRIMARY KEY,
+    idx INTEGER NOT NULL,
+    case_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS cases_status ON cases (status, position);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class QueuedRun:
+    """Settings the coordinator left for the workers of the current run."""
+
+    run_id: str
+    state: str
+    pipeline: str
+    fingerprint: str | None
+    options: dict[str, Any]
+    lease_timeout: float
+    max_attempts: int
+    deadline: float | None
+
+    @property
+    def deadline_at(self) -> float | None:
+        """The wall-clock deadline on this process's monotonic clock."""
+
+        return None if self.deadline is None else time.monotonic() + (self.deadline - time.time())
+
+
+class WorkQueue:
+    """Cases of one run stored in a SQLite file shared by the coordinator and workers.
+
+    A worker *leases* cases for ``lease_timeout`` seconds and keeps the
+    lease alive with :meth:`heartbeat`. A lease that expires (the worker
+    died or hung) makes the case available again, up to ``max_attempts``
+    leases; after that the coordinator records the case as failed. The
+    first result pushed for a case wins, so a slow worker whose lease
+    expired cannot overwrite the result of the worker that took over.
+
+    Every operation opens its own short transaction, so one queue object
+    may be used from several threads and any number of processes. For
+    workers on other machines put the file on storage with working file
+    locks.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def create(
+        self,
+        cases: Iterable[tuple[int, TestCase]],
+        *,
+        pipeline: str,
+        fingerprint: str | None = None,
+        options: Mapping[str, Any] | None = None,
+        lease_timeout: float = 60.0,
+        max_attempts: int = 3,
+        deadline: float | None = None,
+    ) -> str:
+        """Replace whatever the file held with a new run and return its id.
+
+        ``options`` are the worker runner arguments (see
+        :meth:`TestRunner._worker_options`); ``deadline`` is a wall-clock
+        ``time.time()`` value.
+        """
+
+        if lease_timeout <= 0:
+            msg = "lease_timeout must be positive"
+            raise ValueError(msg)
+        try:
+            rows = [
+                (position, index, test_case.id, pickle.dumps(test_case, protocol=pickle.HIGHEST_PROTOCOL))
+                for position, (index, test_case) in enumerate(cases)
+            ]
+            packed_options = pickle.dumps(dict(options or {}), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as exc:  # noqa: B904
+            msg = f"Queue backend needs test cases and comparators that can be pickled: {exc}"
+            raise ValueError(msg) from exc
+
+        run_id = uuid.uuid4().hex
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM cases")
+            connection.execute("DELETE FROM run")
+            connection.execute(
+                "INSERT INTO run (id, run_id, state, pipeline, fingerprint, options, lease_timeout, max_attempts,"
+                " deadline) VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, RUNNING, pipeline, fingerprint, packed_options, lease_timeout, max_attempts, deadline),
+            )
+            connection.executemany("INSERT INTO cases (position, idx, case_id, payload) VALUES (?, ?, ?, ?)", rows)
+        return run_id
+
+    def run_info(self) -> QueuedRun | None:
+        """Current run, or ``None`` while the file or the run does not exist yet."""
+
+        if not self.path.exists():
+            return None
+        try:
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT run_id, state, pipeline, fingerprint, options, lease_timeout, max_attempts, deadline"
+                    " FROM run WHERE id = 1"
+                ).fetchone()
+        except sqlite3.OperationalError:
+            # The coordinator has not created the tables yet.
+            return None
+        if row is None:
+            return None
+        run_id, state, pipeline, fingerprint, options, lease_timeout, max_attempts, deadline = row
+        return QueuedRun(
+            run_id, state, pipeline, fingerprint, pickle.loads(options), lease_timeout, max_attempts, deadline
+        )
+
+    @staticmethod
+    def _is_current(connection: sqlite3.Connection, run_id: str) -> bool:
+        row = connection.execute("SELECT run_id, state FROM run WHERE id = 1").fetchone()
+        return row is not None and row[0] == run_id and row[1] == RUNNING
+
+    def lease(self, run_id: str, worker: str, limit: int = 1) -> list[tuple[int, TestCase]]:
+        """Take up to ``limit`` pending (or expired) cases of run ``run_id`` for ``worker``."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            if not self._is_current(connection, run_id):
+                return []
+            lease_timeout, max_attempts = connection.execute(
+                "SELECT lease_timeout, max_attempts FROM run WHERE id = 1"
+            ).fetchone()
+            rows = connection.execute(
+                "SELECT position, idx, payload FROM cases"
+                " WHERE status = 'pending' OR (status = 'leased' AND expires < ? AND attempts < ?)"
+                " ORDER BY position LIMIT ?",
+                (now, max_attempts, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE cases SET status = 'leased', owner = ?, expires = ?, attempts = attempts + 1"
+                " WHERE position = ?",
+                [(worker, now + lease_timeout, position) for position, _, _ in rows],
+            )
+        return [(index, pickle.loads(payload)) for _, index, payload in rows]
+
+    def heartbeat(self, run_id: str, worker: str) -> int:
+        """Extend all leases of ``worker``; returns how many cases it still holds."""
+
+        with self._transaction() as connection:
+            row = connection.execute("SELECT run_id, lease_timeout FROM run WHERE id = 1").fetchone()
+            if row is None or row[0] != run_id:
+                return 0
+            return connection.execute(
+                "UPDATE cases SET expires = ? WHERE status = 'leased' AND owner = ?",
+                (time.time() + row[1], worker),
+            ).rowcount
+
+    def complete(self, run_id: str, results: Iterable[PackedResult]) -> int:
+        """Store results of run ``run_id``; results of cases that already have one are dropped."""
+
+        with self._transaction() as connection:
+            row = connection.execute("SELECT run_id FROM run WHERE id = 1").fetchone()
+            if row is None or row[0] != run_id:
+                return 0
+            stored = 0
+            for packed in results:
+                stored += connection.execute(
+                    "UPDATE cases SET status = 'done', result = ? WHERE idx = ? AND status != 'done'",
+                    (pickle.dumps(packed, protocol=pickle.HIGHEST_PROTOCOL), packed[0]),
+                ).rowcount
+            return stored
+
+    def collect(self) -> list[tuple[int, TestCase, PackedResult | None]]:
+        """New results since the last call; ``None`` marks a case whose leases all expired."""
+
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE cases SET status = 'done' WHERE status = 'leased' AND expires < ?"
+                " AND attempts >= (SELECT max_attempts FROM run WHERE id = 1)",
+                (time.time(),),
+            )
+            rows = connection.execute(
+                "SELECT position, idx, payload, result FROM cases WHERE status = 'done' AND collected = 0"
+            ).fetchall()
+            connection.executemany(
+                "UPDATE cases SET collected = 1 WHERE position = ?", [(position,) for position, _, _, _ in rows]
+            )
+        return [
+            (index, pickle.loads(payload), pickle.loads(result) if result is not None else None)
+            for _, index, payload, result in rows
+        ]
+
+    def outstanding(self) -> tuple[int, int]:
+        """Pending cases and cases under a live lease.
+
+        A case whose lease expired with attempts left counts as pending: any
+        worker can lease it again.
+        """
+
+        with self._transaction() as connection:
+            pending, leased = connection.execute(
+                "SELECT COALESCE(SUM(status = 'pending' OR (status = 'leased' AND expires < :now"
+                " AND attempts < (SELECT max_attempts FROM run WHERE id = 1))), 0),"
+                " COALESCE(SUM(status = 'leased' AND expires >= :now), 0) FROM cases",
+                {"now": time.time()},
+            ).fetchone()
+        return pending, leased
+
+    def set_state(self, state: str) -> None:
+        with self._transaction() as connection:
+            connection.execute("UPDATE run SET state = ? WHERE id = 1", (state,))
+
+
+def _lost_result(test_case: TestCase) -> TestResult:
+    now = datetime.utcnow()
+    return TestResult(
+        id=test_case.id,
+        passed=False,
+        output=None,
+        expected_output=test_case.expected_output,
+        started_at=now,
+        ended_at=now,
+        error="No worker finished the case before its last lease expired",
+        case_hash=case_fingerprint(test_case),
+    )
+
+
+def coordinate(
+    work_queue: WorkQueue,
+    on_finished: Callable[[int, TestResult], None],
+    should_stop: Callable[[], str | None],
+    *,
+    poll_interval: float = POLL_INTERVAL,
+) -> str | None:
+    """Wait for the workers, passing every result to ``on_finished`` as it arrives.
+
+    ``should_stop`` is polled between rounds; once it returns a reason the
+    queue is closed, cases already leased may still finish, and the reason
+    is returned. Returns ``None`` when every case has a result.
+    """
+
+    stop_reason: str | None = None
+    try:
+        while True:
+            for index, test_case, packed in work_queue.collect():
+                if packed is None:
+                    on_finished(index, _lost_result(test_case))
+                else:
+                    on_finished(index, unpack_result(packed, test_case, case_fingerprint(test_case)))
+            if stop_reason is None:
+                stop_reason = should_stop()
+                if stop_reason is not None:
+                    work_queue.set_state(CLOSED)
+            pending, leased = work_queue.outstanding()
+            if leased == 0 and (pending == 0 or stop_reason is not None):
+                return stop_reason
+            time.sleep(poll_interval)
+    finally:
+        work_queue.set_state(FINISHED)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _error_results(unit: list[tuple[int, TestCase]], error: Exception) -> list[tuple[int, TestResult]]:
+    now = datetime.utcnow()
+    return [
+        (
+            index,
+            TestResult(
+                id=test_case.id,
+                passed=False,
+                output=None,
+                expected_output=test_case.expected_output,
+                started_at=now,
+                ended_at=now,
+                error=str(error),
+                case_hash=case_fingerprint(test_case),
+            ),
+        )
+        for index, test_case in unit
+    ]
+
+
+def run_worker(
+    work_queue: WorkQueue,
+    pipeline: str | None = None,
+    *,
+    worker_id: str | None = None,
+    concurrency: int = 1,
+    wait: float = 60.0,
+    poll_interval: float = POLL_INTERVAL,
+    on_result: Callable[[TestResult], None] | None = None,
+) -> int:
+    """Serve the current run of ``work_queue`` until it is finished; returns the number of cases run.
+
+    ``pipeline`` defaults to the reference the coordinator used; a pipeline
+    whose prompt/model fingerprint differs from the coordinator's is
+    refused. The worker waits up to ``wait`` seconds for the coordinator
+    to create the run and runs ``concurrency`` units at a time, leasing
+    ``batch_size`` cases per unit for ``run_batch`` pipelines.
+    """
+
+    waited_until = time.monotonic() + wait
+    queued = work_queue.run_info()
+    while queued is None or queued.state != RUNNING:
+        if time.monotonic() >= waited_until:
+            msg = f"No running queue at {work_queue.path}"
+            raise TimeoutError(msg)
+        time.sleep(poll_interval)
+        queued = work_queue.run_info()
+
+    loaded: Pipeline = load_pipeline(pipeline or queued.pipeline)
+    if queued.fingerprint is not None and pipeline_fingerprint(loaded) != queued.fingerprint:
+        msg = f"Pipeline {pipeline or queued.pipeline} differs from the coordinator's (prompt or model changed)"
+        raise ValueError(msg)
+    runner = TestRunner(**queued.options)
+    worker = worker_id or default_worker_id()
+    unit_size = queued.options.get("batch_size", 1) if callable(getattr(loaded, "run_batch", None)) else 1
+    done = threading.Event()
+    finished = 0
+    lock = threading.Lock()
+
+    def _heartbeat() -> None:
+        while not done.wait(queued.lease_timeout / 3):
+            work_queue.heartbeat(queued.run_id, worker)
+
+    def _serve() -> None:
+        nonlocal finished
+        while True:
+            unit = work_queue.lease(queued.run_id, worker, unit_size)
+            if not unit:
+                current = work_queue.run_info()
+                if current is None or current.run_id != queued.run_id or current.state != RUNNING:
+                    return
+                # Leases held by other workers may still expire and come back.
+                time.sleep(poll_interval)
+                continue
+            try:
+                results = runner.run_unit(loaded, unit, queued.deadline_at)
+            except Exception as exc:  # noqa: BLE001
+                results = _error_results(unit, exc)
+            work_queue.complete(queued.run_id, [pack_result(index, result) for index, result in results])
+            with lock:
+                finished += len(results)
+            if on_result is not None:
+                for _, result in results:
+                    on_result(result)
+
+    heartbeat = threading.Thread(target=_heartbeat, name="sgr-test-heartbeat", daemon=True)
+    heartbeat.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for future in [executor.submit(_serve) for _ in range(max(1, concurrency))]:
+                future.result()
+    finally:
+        done.set()
+    return finished
+
+
+__all__ = [
+    "CLOSED",
+    "FINISHED",
+    "RUNNING",
+    "QueuedRun",
+    "WorkQueue",
+    "coordinate",
+    "default_worker_id",
+    "run_worker",
+]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import re
+from types import SimpleNamespace
+from typing import Any
+
+from sgr.llm.usage import record_response_usage
+from sgr.pipelines.routing.pipeline import OrderIssue, OrderIssuePipeline
+from sgr.testing.models import TestCase
+from sgr.testing.runner import TestRunner
+
+_ITEM_RE = re.compile(r"### Элемент (\d+)\n(.*?)(?=\n\n### Элемент|\Z)", re.S)
+
+
+def _issue(number: str) -> dict[str, Any]:
+    return {
+        "thinking": "-",
+        "categories": ["order_status"],
+        "confidence": "high",
+        "order_number": number,
+        "sentiment": "neutral",
+    }
+
+
+class BatchClient:
+    """Answers batches but drops every item mentioning "skip" and breaks "broken" ones."""
+
+    config = SimpleNamespace(model="fake", base_url=None)
+
+    def __init__(self) -> None:
+        self.requests: list[list[dict[str, str]]] = []
+
+    def chat(self, messages: list[dict[str, str]], **kwargs: Any) -> Any:
+        self.requests.append(messages)
+        user = messages[-1]["content"]
+        items = _ITEM_RE.findall(user)
+        if items:
+            answers = []
+            for index, text in items:
+                if "skip" in text:
+                    continue
+                answer = {"index": int(index), **_issue(text.split()[-1])}
+                if "broken" in text:
+                    answer["categories"] = ["unknown"]
+                answers.append(answer)
+            content = json.dumps({"items": answers})
+        else:
+            content = json.dumps(_issue(user.split()[-1]))
+        usage = SimpleNamespace(prompt_tokens=90, completion_tokens=30, total_tokens=120)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+        record_response_usage(response)
+        return response
+
+
+def test_run_batch_returns_exceptions_for_missing_and_invalid_items() -> None:
+    client = BatchClient()
+    pipeline = OrderIssuePipeline(client)
+
+    outputs = pipeline.run_batch(
+        [{"review_text": "order 1111111"}, {"review_text": "skip 2222222"}, {"review_text": "broken 3333333"}]
+    )
+
+    assert isinstance(outputs[0], OrderIssue) and outputs[0].order_number == "1111111"
+    assert "missing" in str(outputs[1])
+    assert "schema" in str(outputs[2])
+    assert len(client.requests) == 1
+    assert client.requests[0][0]["content"].startswith(pipeline.prompt.system)
+
+
+def _case(index: int, text: str) -> TestCase:
+    number = text.split()[-1]
+    return TestCase(
+        id=str(index),
+        params={"review_text": text},
+        expected_output=OrderIssue.model_validate(_issue(number)),
+    )
+
+
+def test_runner_batches_cases_and_falls_back_to_single_requests() -> None:
+    client = BatchClient()
+    cases = [_case(0, "a 1000000"), _case(1, "skip 1000001"), _case(2, "c 1000002"), _case(3, "d 1000003")]
+
+    run = TestRunner(batch_size=3, max_workers=2).run(OrderIssuePipeline(client), cases)
+
+    assert [result.id for result in run.results] == ["0", "1", "2", "3"]
+    assert all(result.passed for result in run.results)
+    # One batch of three, one single-item fallback for "skip", one trailing single case.
+    assert len(client.requests) == 3
+    assert run.results[0].usage["total_tokens"] == 40
+    assert run.results[1].usage["total_tokens"] == 160
+    assert run.usage["total_tokens"] == 360
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from sgr.llm.pricing import ModelPrice, load_price_table, price_for
+from sgr.llm.usage import current_recorder
+from sgr.testing.budget import COST_BUDGET_STOP_REASON, RunBudget
+from sgr.testing.models import TestCase, TestRun
+from sgr.testing.reports import serialize_run
+from sgr.testing.runner import TestRunner
+
+
+class MeteredPipeline:
+    name = "Metered"
+
+    def __init__(self, model: str = "gpt-4o-mini") -> None:
+        self.client = SimpleNamespace(config=SimpleNamespace(model=model, request_kwargs={}))
+
+    def run(self, text: str) -> str:
+        current_recorder().add(requests=1, prompt_tokens=900, completion_tokens=100, total_tokens=1000)  # type: ignore[union-attr]
+        return text
+
+
+def _cases(count: int) -> list[TestCase]:
+    return [TestCase(id=str(index), params={"text": "a"}, expected_output="a") for index in range(count)]
+
+
+def test_prices_match_snapshots_and_discount_cached_tokens(tmp_path: Path) -> None:
+    assert price_for("gpt-4o-mini-2024-07-18") == price_for("gpt-4o-mini")
+    assert price_for("gpt-4o-2024-08-06") == price_for("gpt-4o")
+    assert price_for("unknown-model") is None
+
+    price = ModelPrice(input=2.0, output=8.0, cached_input=0.5)
+    usage = {"prompt_tokens": 1_000_000, "cached_tokens": 500_000, "completion_tokens": 100_000}
+    assert price.cost(usage) == pytest.approx(1.0 + 0.25 + 0.8)
+
+    path = tmp_path / "prices.json"
+    path.write_text(json.dumps({"local-qwen": {"input": 0, "output": 0}}))
+    table = load_price_table(path)
+    assert table["local-qwen"].cost(usage) == 0 and "gpt-4o" in table
+    path.write_text(json.dumps({"broken": {"input": 1}}))
+    with pytest.raises(ValueError, match="Invalid price table"):
+        load_price_table(path)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_cost_budget_stops_scheduling_and_keeps_a_valid_report(workers: int) -> None:
+    run = TestRunner(max_workers=workers, cost_budget=0.002).run(MeteredPipeline(), _cases(50))
+
+    assert run.stop_reason == COST_BUDGET_STOP_REASON
+    assert 11 <= len(run.results) < 11 + workers
+    assert run.budget is not None and run.budget["exhausted"] == COST_BUDGET_STOP_REASON
+    assert run.budget["cost_usd"] == pytest.approx(0.000195 * len(run.results))
+
+    restored = TestRun.from_dict(json.loads(serialize_run(run)))
+    assert restored.budget == run.budget
+    assert restored.summary.total == len(run.results)
+
+
+def test_cost_budget_needs_a_price_for_the_model() -> None:
+    with pytest.raises(ValueError, match="No price for model"):
+        TestRunner(cost_budget=1.0).run(MeteredPipeline("local-model"), _cases(1))
+
+
+def test_shared_budget_spans_runs_and_projects_totals() -> None:
+    budget = RunBudget(token_budget=5000)
+    first = TestRunner(budget=budget).run(MeteredPipeline(), _cases(3))
+    second = TestRunner(budget=budget).run(MeteredPipeline("gpt-4o"), _cases(10))
+
+    assert first.stop_reason is None and len(first.results) == 3
+    assert len(second.results) == 2 and second.stop_reason == "token_budget"
+    projection = budget.projection(50)
+    assert projection["cases"] == 5 and projection["projected_tokens"] == 50_000
+    assert projection["cost_usd"] == pytest.approx(3 * 0.000195 + 2 * 0.00325)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from sgr.testing.compact import CompactResults
+from sgr.testing.models import SampleResult, TestCase, TestResult, TestRun
+from sgr.testing.reports import load_report, serialize_run, write_report
+from sgr.testing.runner import TestRunner
+
+START = datetime(2024, 5, 1, 12, 0, 0, 123456)
+
+
+def _results() -> list[TestResult]:
+    return [
+        TestResult(
+            id="passed",
+            passed=True,
+            output={"category": "delivery", "items": [1, 2]},
+            expected_output={"category": "delivery"},
+            started_at=START,
+            ended_at=START + timedelta(seconds=1.5),
+            case_hash="0123456789abcdef0123456789abcdef",
+            usage={"requests": 1, "prompt_tokens": 120, "cached_tokens": 0},
+        ),
+        TestResult(
+            id="failed",
+            passed=False,
+            output=None,
+            expected_output="refund",
+            started_at=START,
+            ended_at=START + timedelta(microseconds=7),
+            error="ValueError: bad json",
+            case_hash="legacy-hash",
+        ),
+        TestResult(
+            id="flaky",
+            passed=True,
+            output="a",
+            expected_output="a",
+            started_at=START,
+            ended_at=START,
+            usage={"requests": 2, "total_tokens": 50},
+            samples=[SampleResult(passed=True, output="a"), SampleResult(passed=False, output="b", error=None)],
+        ),
+    ]
+
+
+def _run(results: object) -> TestRun:
+    return TestRun(pipeline_name="Compact", started_at=START, ended_at=START, results=results)  # type: ignore[arg-type]
+
+
+def test_compact_results_report_matches_list() -> None:
+    compact = CompactResults(_results())
+
+    assert len(compact) == 3 and compact[-1].id == "flaky"
+    assert [result.id for result in compact[:2]] == ["passed", "failed"]
+    assert compact == _results()
+    assert serialize_run(_run(compact)) == serialize_run(_run(_results()))
+    assert _run(compact).usage == _run(_results()).usage == {
+        "requests": 3,
+        "prompt_tokens": 120,
+        "cached_tokens": 0,
+        "total_tokens": 50,
+    }
+
+
+def test_failed_and_spilled_outputs(tmp_path: Path) -> None:
+    failed_only = CompactResults(_results(), outputs="failed")
+    assert failed_only[0].output is None and failed_only[0].expected_output is None
+    assert failed_only[1].expected_output == "refund"
+    assert [sample.output for sample in failed_only[2].samples] == [None, "b"]
+
+    spilled = CompactResults(_results(), outputs="spill", spill_dir=tmp_path)
+    assert spilled == _results()
+    assert spilled.permuted([2, 0, 1]) == [_results()[2], _results()[0], _results()[1]]
+
+    with pytest.raises(ValueError, match="outputs mode"):
+        CompactResults(outputs="drop")
+
+
+def test_streamed_report_matches_serialized_run(tmp_path: Path) -> None:
+    for results in (CompactResults(_results(), outputs="spill", spill_dir=tmp_path), []):
+        path = write_report(_run(results), tmp_path / "report.json")
+        assert path.read_text() == serialize_run(_run(results))
+    assert load_report(path).results == []
+
+
+class EchoPipeline:
+    name = "Echo"
+
+    def run(self, text: str) -> str:
+        if text == "boom":
+            raise ValueError("boom")
+        return text.upper()
+
+
+def test_runner_keeps_input_order_in_compact_mode(tmp_path: Path) -> None:
+    cases = [
+        TestCase(id=f"case-{index}", params={"text": f"t{index}"}, expected_output=f"T{index}") for index in range(40)
+    ]
+    cases[7] = TestCase(id="case-7", params={"text": "boom"}, expected_output="BOOM")
+
+    plain = TestRunner(max_workers=4).run(EchoPipeline(), cases)
+    compact = TestRunner(max_workers=4, outputs="spill", spill_dir=tmp_path).run(EchoPipeline(), cases)
+
+    assert isinstance(compact.results, CompactResults)
+    assert [(result.id, result.passed, result.output, result.error) for result in compact.results] == [
+        (result.id, result.passed, result.output, result.error) for result in plain.results
+    ]
+    assert compact.summary == plain.summary
+
+
+def test_compact_results_use_a_fraction_of_the_memory() -> None:
+    def _measure(build: object) -> int:
+        tracemalloc.start()
+        kept = build()  # type: ignore[operator]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size
+
+    def _many() -> list[TestResult]:
+        return [
+            TestResult(
+                id=f"case-{index}",
+                passed=index % 3 != 0,
+                output={"answer": f"value {index}"},
+                expected_output={"answer": f"value {index}"},
+                started_at=START + timedelta(seconds=index),
+                ended_at=START + timedelta(seconds=index + 1),
+                case_hash=f"{index:032x}",
+                usage={"requests": 1, "prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+            )
+            for index in range(5000)
+        ]
+
+    as_list = _measure(_many)
+    as_columns = _measure(lambda: CompactResults(_many(), outputs="failed"))
+
+    assert as_columns < as_list / 2
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from models.composite import FanOutPipeline, StageCache
+from sgr.llm.usage import current_recorder, track_usage
+from sgr.pipelines.routing.pipeline import SYSTEM_PROMPT
+from sgr.pipelines.split_route import SplitRoutePipeline
+from sgr.testing.models import TestCase
+from sgr.testing.reports import serialize_run
+from sgr.testing.runner import TestRunner
+
+
+class Splitter:
+    name = "Splitter"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run(self, text: str) -> list[str]:
+        self.calls += 1
+        current_recorder().add(requests=1)
+        return text.split(";")
+
+
+class Upper:
+    name = "Upper"
+
+    def __init__(self) -> None:
+        self.threads: set[str] = set()
+        self.barrier = threading.Barrier(3, timeout=2)
+
+    def run(self, part: str) -> str:
+        self.threads.add(threading.current_thread().name)
+        current_recorder().add(requests=1)
+        if part == "boom":
+            raise ValueError("cannot route")
+        self.barrier.wait()
+        return part.upper()
+
+
+def _fan_out(splitter: Splitter, mapper: Upper, cache: StageCache | None = None) -> FanOutPipeline[str]:
+    return FanOutPipeline(
+        splitter=splitter,
+        mapper=mapper,
+        split_items=list,
+        item_params=lambda part: {"part": part},
+        split_cache=cache,
+    )
+
+
+def test_parts_run_concurrently_and_usage_is_attributed_to_the_caller() -> None:
+    mapper = Upper()
+    pipeline = _fan_out(Splitter(), mapper)
+
+    with track_usage() as usage:
+        output = pipeline.run(text="a;b;c;boom")
+
+    assert output.outputs == ["A", "B", "C", None]
+    assert output.errors == [None, None, None, "cannot route"]
+    assert len(mapper.threads) >= 3
+    assert usage.requests == 5
+    assert len(output.timings.item_seconds) == 4
+    assert output.timings.total_seconds >= output.timings.map_seconds
+
+
+def test_split_cache_is_reused_between_pipeline_instances(tmp_path: Path) -> None:
+    cache = StageCache(tmp_path)
+    first, second = Splitter(), Splitter()
+
+    with track_usage():
+        _fan_out(first, Upper(), cache).run(text="a;b;c")
+        output = _fan_out(second, Upper(), cache).run(text="a;b;c")
+
+    assert (first.calls, second.calls) == (1, 0)
+    assert output.timings.split_cached is True
+    assert output.split == ["a", "b", "c"]
+
+
+class FakeClient:
+    config = SimpleNamespace(model="fake", base_url=None)
+
+    def chat(self, messages: list[dict[str, str]], **kwargs: Any) -> Any:
+        system, user = messages[0]["content"], messages[-1]["content"]
+        if system == SYSTEM_PROMPT:
+            number = "1234567" if "1234567" in user else "7654321"
+            category = "incomplete_order" if "ершик" in user else "order_status"
+            payload = {
+                "thinking": "-",
+                "categories": [category],
+                "confidence": "high",
+                "order_number": number,
+                "sentiment": "negative",
+            }
+        else:
+            payload = {
+                "thinking": "-",
+                "has_request_several_orders": True,
+                "orders": [{"context_text": part.strip()} for part in user.split("?") if part.strip()],
+            }
+        message = SimpleNamespace(content=json.dumps(payload, ensure_ascii=False))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_split_route_pipeline_works_with_the_runner() -> None:
+    case = TestCase(
+        id="two",
+        params={"message_text": "Где мой заказ 1234567? И еще вопрос про заказ 7654321 - там не хватает ершика"},
+        expected_output={
+            "orders": [
+                {"categories": ["incomplete_order"], "order_number": "7654321"},
+                {"categories": ["order_status"], "order_number": "1234567"},
+            ]
+        },
+    )
+
+    run = TestRunner().run(SplitRoutePipeline(FakeClient()), [case])
+
+    assert run.results[0].error is None
+    assert run.results[0].passed is True
+    assert run.model == "fake"
+    report = json.loads(serialize_run(run))
+    assert report["results"][0]["output"]["outputs"][1]["categories"] == ["incomplete_order"]
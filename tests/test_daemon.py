@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from sgr.testing.entry import submit
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PIPELINE_SOURCE = '''
+class Shout:
+    name = "Shout"
+
+    def run(self, text):
+        return text.upper() + "{suffix}"
+
+
+def build_pipeline():
+    print("Building Shout")
+    return Shout()
+'''
+
+
+def _write_module(directory: Path, name: str, suffix: str) -> None:
+    path = directory / f"{name}.py"
+    path.write_text(PIPELINE_SOURCE.format(suffix=suffix))
+    # Make the change visible even on file systems with coarse timestamps.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture()
+def pipeline_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    name = f"warm_pipeline_{uuid.uuid4().hex[:8]}"
+    _write_module(tmp_path, name, "")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "cases.json").write_text(
+        json.dumps([{"id": f"case-{index}", "params": {"text": "hi"}, "expected_output": "HI"} for index in range(3)])
+    )
+    return name
+
+
+@pytest.fixture()
+def daemon(tmp_path: Path) -> Iterator[dict]:
+    state_path = tmp_path / "daemon.json"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "sgr.testing.cli", "serve", "--state-file", str(state_path)],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(tmp_path), "SGR_TEST_CACHE_DIR": str(tmp_path / "cache")},
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        yield {"state_path": state_path, **_wait_until_healthy(state_path)}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _wait_until_healthy(state_path: Path, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            state = json.loads(state_path.read_text())
+            connection = http.client.HTTPConnection(state["host"], state["port"], timeout=5)
+            try:
+                connection.request("GET", "/health", headers={"Authorization": f"Bearer {state['token']}"})
+                if connection.getresponse().status == 200:
+                    return state
+            finally:
+                connection.close()
+        except (OSError, ValueError, KeyError):
+            pass
+        time.sleep(0.05)
+    msg = f"Daemon did not become healthy within {timeout} seconds"
+    raise TimeoutError(msg)
+
+
+def test_submitted_runs_reuse_warm_pipeline_and_reload_changes(
+    daemon: dict,
+    pipeline_module: str,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    argv = ["--pipeline", f"{pipeline_module}:build_pipeline", "--tests", "cases.json"]
+    monkeypatch.chdir(tmp_path)
+
+    assert submit(argv, state_path=daemon["state_path"]) == 0
+    first = capsys.readouterr().out
+    assert submit(argv, state_path=daemon["state_path"]) == 0
+    second = capsys.readouterr().out
+    assert "Building Shout" in first and "Total: 3 | Passed: 3 | Failed: 0" in first
+    assert "Building Shout" not in second and "Passed: 3" in second
+
+    _write_module(tmp_path, pipeline_module, "!")
+    assert submit(argv, state_path=daemon["state_path"]) == 1
+    reloaded = capsys.readouterr().out
+    assert "Building Shout" in reloaded and "Passed: 0 | Failed: 3" in reloaded
+
+    missing = ["--pipeline", "missing_module:attr", "--tests", "cases.json"]
+    assert submit(missing, state_path=daemon["state_path"]) == 1
+    assert "No module named 'missing_module'" in capsys.readouterr().out
+
+    connection = http.client.HTTPConnection(daemon["host"], daemon["port"])
+    connection.request("GET", "/health", headers={"Authorization": f"Bearer {daemon['token']}"})
+    health = json.loads(connection.getresponse().read())
+    assert health["pipelines"] == [f"{pipeline_module}:build_pipeline"] and health["suites"] == 1
+    connection.request("POST", "/run", body="{}", headers={"Authorization": "Bearer wrong"})
+    assert connection.getresponse().status == 403
+
+
+def test_submit_runs_locally_without_daemon(
+    pipeline_module: str, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cases = str(tmp_path / "cases.json")
+    argv = ["--pipeline", f"{pipeline_module}:build_pipeline", "--tests", cases, "--no-cache"]
+
+    assert submit(argv, state_path=tmp_path / "absent.json") == 0
+    captured = capsys.readouterr()
+    assert "running locally" in captured.err and "Passed: 3" in captured.out
+
+
+def test_thin_client_does_not_import_heavy_dependencies() -> None:
+    code = (
+        "import sys, sgr.testing.entry; "
+        "print([name for name in ('gradio', 'openai', 'pydantic') if name in sys.modules])"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from sgr.llm.client import LLMClientConfig, OpenAIClient
+from sgr.llm.deadline import DeadlineExceeded, check_deadline, deadline, remaining
+from sgr.llm.usage import current_recorder
+from sgr.testing.models import TestCase
+from sgr.testing.runner import DEADLINE_STOP_REASON, TOKEN_BUDGET_STOP_REASON, TestRunner
+
+
+class SleepyPipeline:
+    name = "Sleepy"
+
+    def run(self, seconds: float, tokens: int = 0) -> str:
+        recorder = current_recorder()
+        if recorder is not None and tokens:
+            recorder.add(requests=1, total_tokens=tokens)
+        time.sleep(seconds)
+        return "ok"
+
+
+def _cases(*seconds: float, tokens: int = 0) -> list[TestCase]:
+    return [
+        TestCase(id=str(index), params={"seconds": value, "tokens": tokens}, expected_output="ok")
+        for index, value in enumerate(seconds)
+    ]
+
+
+def test_nested_deadlines_only_shorten() -> None:
+    assert remaining() is None
+    with deadline(10):
+        with deadline(100):
+            assert remaining() <= 10
+        with deadline(0.0, reason="inner"):
+            with pytest.raises(DeadlineExceeded, match="inner"):
+                check_deadline()
+
+
+def test_case_timeout_cuts_hung_case_and_keeps_the_rest() -> None:
+    started = time.monotonic()
+    run = TestRunner(case_timeout=0.2).run(SleepyPipeline(), _cases(0.0, 5.0, 0.0))
+
+    assert time.monotonic() - started < 2
+    assert [result.passed for result in run.results] == [True, False, True]
+    assert run.results[1].error == "Case timed out after 0.2s"
+    assert run.stop_reason is None
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_deadline_stops_scheduling_and_fails_running_cases(workers: int) -> None:
+    started = time.monotonic()
+    run = TestRunner(max_workers=workers, run_timeout=0.3).run(SleepyPipeline(), _cases(0.05, 5.0, 0.0, 0.0, 0.0))
+
+    assert time.monotonic() - started < 2
+    assert run.stop_reason == DEADLINE_STOP_REASON
+    assert len(run.results) == (2 if workers == 1 else 5)
+    timed_out = [result for result in run.results if result.error]
+    assert [result.id for result in timed_out] == ["1"]
+    assert timed_out[0].error == "Run deadline of 0.3s exceeded"
+
+
+def test_token_budget_stops_after_budget_is_spent() -> None:
+    run = TestRunner(token_budget=250).run(SleepyPipeline(), _cases(0, 0, 0, 0, 0, tokens=100))
+
+    assert run.stop_reason == TOKEN_BUDGET_STOP_REASON
+    assert len(run.results) == 3
+    assert run.usage["total_tokens"] == 300
+
+
+def test_client_shortens_request_timeout_and_skips_backoff_past_deadline() -> None:
+    client = OpenAIClient(LLMClientConfig(api_key="test", timeout=30, backoff_factor=10))
+    timeouts: list[float] = []
+
+    def _create(**kwargs: object) -> None:
+        timeouts.append(float(kwargs["timeout"]))  # type: ignore[arg-type]
+        raise APIConnectionError(request=httpx.Request("POST", "http://gateway"))
+
+    client.endpoint_pool.endpoints[0].client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_create))
+    )
+
+    started = time.monotonic()
+    with deadline(1.0, reason="case budget"), pytest.raises(DeadlineExceeded, match="case budget"):
+        client.chat([{"role": "user", "content": "hi"}])
+
+    assert time.monotonic() - started < 0.5
+    assert len(timeouts) == 1 and timeouts[0] <= 1.0
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from sgr.testing.cli import main
+from sgr.testing.diff import FIXED, NEWLY_FAILING, STILL_FAILING, diff_runs, format_diff, mcnemar_test
+from sgr.testing.models import TestResult, TestRun
+from sgr.testing.reports import write_report
+
+
+def _run(outcomes: dict[str, bool], *, seconds: float = 1.0, tokens: int = 10) -> TestRun:
+    started = datetime(2024, 1, 1)
+    results = [
+        TestResult(
+            id=case_id,
+            passed=passed,
+            output=None,
+            expected_output=None,
+            started_at=started,
+            ended_at=started + timedelta(seconds=seconds),
+            usage={"total_tokens": tokens},
+        )
+        for case_id, passed in outcomes.items()
+    ]
+    return TestRun(pipeline_name="Routing", started_at=started, ended_at=started, results=results)
+
+
+def test_classifies_flips_and_deltas() -> None:
+    baseline = _run({"a": True, "b": False, "c": False, "gone": True})
+    candidate = _run({"a": False, "b": True, "c": False, "new": True}, seconds=1.5, tokens=12)
+
+    run_diff = diff_runs(baseline, candidate)
+
+    assert [case.id for case in run_diff.by_status(NEWLY_FAILING)] == ["a"]
+    assert [case.id for case in run_diff.by_status(FIXED)] == ["b"]
+    assert [case.id for case in run_diff.by_status(STILL_FAILING)] == ["c"]
+    assert run_diff.counts["added"] == 1 and run_diff.counts["removed"] == 1
+    assert run_diff.by_status(FIXED)[0].latency_delta_seconds == pytest.approx(0.5)
+    assert run_diff.tokens_delta == 6
+
+
+def test_format_diff_lists_still_failing_cases_up_to_limit() -> None:
+    baseline = _run({"ok": True, **{f"broken-{index}": False for index in range(5)}})
+    candidate = _run({"ok": False, **{f"broken-{index}": False for index in range(5)}})
+
+    lines = format_diff(diff_runs(baseline, candidate), limit=3).splitlines()
+
+    still = lines.index("Still failing:")
+    listed = [line.split()[0] for line in lines[still + 1 : still + 4]]
+    assert listed == ["broken-0", "broken-1", "broken-2"] and lines[still + 4] == "  ... and 2 more"
+    assert lines[lines.index("Newly failing:") + 1].split()[0] == "ok"
+
+
+def test_mcnemar_exact_and_chi_square() -> None:
+    assert mcnemar_test(0, 0).p_value == 1.0
+    assert mcnemar_test(1, 9).p_value == pytest.approx(0.021484375)
+    large = mcnemar_test(10, 40)
+    assert large.method == "chi2"
+    assert large.statistic == pytest.approx(16.82)
+    assert large.p_value < 0.001
+
+
+def test_cli_diff_fails_on_regression(capsys: pytest.CaptureFixture[str]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = write_report(_run({"a": True, "b": True}), Path(tmpdir) / "a.json")
+        second = write_report(_run({"a": False, "b": True}), Path(tmpdir) / "b.json")
+
+        exit_code = main(["diff", str(first), str(second), "--fail-on-regression"])
+
+    assert exit_code == 1
+    assert "Newly failing: 1" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from sgr.testing.cli import main
+from sgr.testing.discovery import discover_suites
+from sgr.testing.reports import find_reports, load_report
+
+PIPELINE_SOURCE = """
+class Upper:
+    name = "Upper-{suffix}"
+
+    def run(self, text):
+        return text.upper()
+
+
+def build_pipeline():
+    return Upper()
+"""
+
+
+class DiscoveryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.package = "discovered_pipelines_fixture"
+        self.root = Path(tmpdir.name) / self.package
+        for suffix in ("alpha", "beta"):
+            suite_dir = self.root / suffix
+            suite_dir.mkdir(parents=True)
+            (suite_dir / "__init__.py").write_text("")
+            (suite_dir / "pipeline.py").write_text(PIPELINE_SOURCE.format(suffix=suffix))
+            (suite_dir / "test_cases.json").write_text(
+                json.dumps([{"id": f"{suffix}-1", "params": {"text": "ping"}, "expected_output": "PING"}])
+            )
+        (self.root / "__init__.py").write_text("")
+        (self.root / "not_a_suite").mkdir()
+
+        sys.path.insert(0, tmpdir.name)
+        self.addCleanup(sys.path.remove, tmpdir.name)
+        self.addCleanup(self._forget_modules)
+
+    def _forget_modules(self) -> None:
+        for module in [name for name in sys.modules if name.startswith(self.package)]:
+            del sys.modules[module]
+
+    def test_discovers_suites_without_importing(self) -> None:
+        suites = discover_suites(self.root, package=self.package)
+
+        self.assertEqual(["alpha", "beta"], [suite.name for suite in suites])
+        self.assertEqual(f"{self.package}.alpha.pipeline:build_pipeline", suites[0].pipeline_reference)
+        self.assertNotIn(f"{self.package}.alpha.pipeline", sys.modules)
+        self.assertEqual("alpha", suites[0].pipeline.name)
+
+        self.assertEqual("PING", suites[0].pipeline.run(text="ping"))
+        self.assertEqual("Upper-alpha", suites[0].pipeline.name)
+        self.assertNotIn(f"{self.package}.beta.pipeline", sys.modules)
+
+    def test_run_all_writes_report_per_suite(self) -> None:
+        exit_code = main(["run-all", "--root", str(self.root), "--package", self.package, "--no-cache"])
+
+        self.assertEqual(0, exit_code)
+        for suffix in ("alpha", "beta"):
+            reports = find_reports(self.root / suffix / "reports")
+            self.assertEqual(1, len(reports))
+            self.assertEqual(f"Upper-{suffix}", load_report(reports[0]).pipeline_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
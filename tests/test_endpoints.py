@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from sgr.llm.client import LLMClientConfig, OpenAIClient
+from sgr.llm.deadline import DeadlineExceeded, deadline
+from sgr.llm.endpoints import LATENCY, Endpoint, EndpointConfig, EndpointPool
+from sgr.testing.fingerprint import describe_model
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(*configs: EndpointConfig, **kwargs: object) -> EndpointPool:
+    return EndpointPool([Endpoint(config, client=None) for config in configs], **kwargs)
+
+
+def _connection_error() -> APIConnectionError:
+    return APIConnectionError(request=httpx.Request("POST", "http://gateway/v1/chat/completions"))
+
+
+def test_least_outstanding_spreads_load_by_weight_and_concurrency() -> None:
+    pool = _pool(EndpointConfig(name="big", weight=2), EndpointConfig(name="small"))
+    for _ in range(30):
+        pool.call(lambda endpoint: endpoint.name, set())
+    assert {stats.name: stats.requests for stats in pool.stats()} == {"big": 20, "small": 10}
+
+    capped = _pool(EndpointConfig(name="a", weight=10, max_concurrency=1), EndpointConfig(name="b"))
+    nested = capped.call(lambda outer: (outer.name, capped.call(lambda inner: inner.name, set())), set())
+    assert nested == ("a", "b")
+
+
+def test_concurrent_callers_wait_for_endpoint_capacity() -> None:
+    pool = _pool(EndpointConfig(name="a", max_concurrency=1), EndpointConfig(name="b", max_concurrency=2))
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def _track(endpoint: Endpoint, delta: int) -> None:
+        with lock:
+            in_flight[endpoint.name] += delta
+            peak[endpoint.name] = max(peak[endpoint.name], in_flight[endpoint.name])
+
+    def _request(endpoint: Endpoint) -> str:
+        _track(endpoint, 1)
+        time.sleep(0.02)
+        _track(endpoint, -1)
+        return endpoint.name
+
+    async def _arequest(endpoint: Endpoint) -> str:
+        _track(endpoint, 1)
+        await asyncio.sleep(0.02)
+        _track(endpoint, -1)
+        return endpoint.name
+
+    async def _acalls() -> list[str]:
+        return await asyncio.gather(*(pool.acall(_arequest, set()) for _ in range(6)))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        threaded = list(executor.map(lambda _: pool.call(_request, set()), range(12)))
+        mixed = executor.submit(asyncio.run, _acalls())
+        threaded += list(executor.map(lambda _: pool.call(_request, set()), range(6)))
+        assert len(mixed.result()) == 6
+
+    assert len(threaded) == 18 and peak == {"a": 1, "b": 2}
+    assert sum(stats.requests for stats in pool.stats()) == 24
+    assert all(stats.outstanding == 0 for stats in pool.stats())
+
+    full = _pool(EndpointConfig(name="only", max_concurrency=1))
+    with pytest.raises(DeadlineExceeded), deadline(0.1):
+        full.call(lambda endpoint: full.call(lambda inner: inner.name, set()), set())
+
+
+def test_latency_routing_prefers_the_faster_endpoint() -> None:
+    clock = FakeClock()
+    pool = _pool(EndpointConfig(name="slow"), EndpointConfig(name="fast"), strategy=LATENCY, clock=clock)
+
+    def _request(endpoint: Endpoint) -> str:
+        clock.now += 2.0 if endpoint.name == "slow" else 0.1
+        return endpoint.name
+
+    chosen = [pool.call(_request, set()) for _ in range(20)]
+    assert chosen[:2] == ["slow", "fast"]
+    assert chosen.count("fast") >= 17
+
+
+def test_failing_endpoint_is_ejected_and_recovers_after_cooldown() -> None:
+    clock = FakeClock()
+    pool = _pool(EndpointConfig(name="a"), EndpointConfig(name="b"), failure_threshold=2, cooldown=10, clock=clock)
+
+    def _failing(endpoint: Endpoint) -> str:
+        if endpoint.name == "a":
+            raise RuntimeError("down")
+        return endpoint.name
+
+    results = []
+    for _ in range(4):
+        try:
+            results.append(pool.call(_failing, set()))
+        except RuntimeError:
+            results.append("error")
+    assert results.count("error") == 2
+    assert not pool.stats()[0].healthy
+
+    assert {pool.call(_failing, set()) for _ in range(3)} == {"b"}
+    clock.now += 10
+    assert pool.stats()[0].healthy
+
+
+def test_client_fails_over_to_next_endpoint_without_backoff() -> None:
+    config = LLMClientConfig(
+        api_key="default",
+        backoff_factor=60,
+        endpoints=[
+            EndpointConfig(name="self-hosted", base_url="http://local/v1", weight=5),
+            EndpointConfig(name="cloud", base_url="http://cloud/v1", api_key="cloud-key", model="cloud-model"),
+        ],
+    )
+    client = OpenAIClient(config)
+    models: list[str] = []
+
+    def _down(**kwargs: object) -> None:
+        raise _connection_error()
+
+    def _up(**kwargs: object) -> SimpleNamespace:
+        models.append(str(kwargs["model"]))
+        return SimpleNamespace(usage=None, choices=[])
+
+    local, cloud = client.endpoint_pool.endpoints
+    assert cloud.client.api_key == "cloud-key" and local.client.api_key == "default"
+    local.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_down)))
+    cloud.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_up)))
+
+    client.chat([{"role": "user", "content": "hi"}])
+
+    assert models == ["cloud-model"]
+    stats = {item["name"]: item for item in client.endpoint_stats()}
+    assert stats["self-hosted"]["failures"] == 1 and stats["cloud"]["requests"] == 1
+
+    model, parameters = describe_model(SimpleNamespace(client=client))
+    assert parameters["routing"] == "least_outstanding"
+    assert [endpoint["name"] for endpoint in parameters["endpoints"]] == ["self-hosted", "cloud"]
+
+
+def test_endpoint_config_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+    with pytest.raises(ValueError, match="Unknown endpoint settings"):
+        EndpointConfig.from_dict({"base_url": "http://x", "wieght": 2})
+    with pytest.raises(ValueError, match="routing strategy"):
+        _pool(EndpointConfig(), strategy="random")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "key")
+    monkeypatch.setenv("OPENAI_ENDPOINTS", '[{"base_url": "http://a/v1"}, {"base_url": "http://b/v1", "weight": 3}]')
+    config = LLMClientConfig.from_env()
+    assert [endpoint.weight for endpoint in config.endpoints] == [1.0, 3]
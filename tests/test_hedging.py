@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from sgr.llm.client import LLMClientConfig, OpenAIClient
+from sgr.llm.hedging import HedgePolicy
+from sgr.llm.rate_limit import RateLimiter
+from sgr.llm.usage import track_usage
+from sgr.testing.sweep import SweepVariant
+
+
+class SlowFirstCompletions:
+    """Fake ``chat.completions``: the first call straggles, later calls are fast."""
+
+    def __init__(self, slow_seconds: float = 1.0, usage: SimpleNamespace | None = None) -> None:
+        self.slow_seconds = slow_seconds
+        self.usage = usage
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next(self) -> tuple[int, float]:
+        with self._lock:
+            self.calls += 1
+            return self.calls, self.slow_seconds if self.calls == 1 else 0.01
+
+    def create(self, **kwargs: object) -> SimpleNamespace:
+        call, seconds = self._next()
+        time.sleep(seconds)
+        return SimpleNamespace(call=call, usage=self.usage)
+
+    async def acreate(self, **kwargs: object) -> SimpleNamespace:
+        call, seconds = self._next()
+        await asyncio.sleep(seconds)
+        return SimpleNamespace(call=call, usage=self.usage)
+
+
+def _client(completions: SlowFirstCompletions, policy: HedgePolicy, **kwargs: object) -> OpenAIClient:
+    client = OpenAIClient(LLMClientConfig(api_key="test"), hedging=policy, **kwargs)
+    endpoint = client.endpoint_pool.endpoints[0]
+    endpoint.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=completions.create)))
+    endpoint.async_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=completions.acreate))
+    )
+    return client
+
+
+def test_policy_delay_follows_observed_quantile_and_budget_caps_hedges() -> None:
+    policy = HedgePolicy(quantile=0.9, budget_ratio=0.5, min_samples=10, min_delay=0.0)
+    assert policy.delay() is None
+    for latency in range(1, 11):
+        policy.observe(float(latency))
+    assert policy.delay() == 9.0
+
+    policy.start_request()
+    assert not policy.try_hedge()
+    policy.start_request()
+    assert policy.try_hedge()
+    assert policy.stats().as_dict()["hedges"] == 1
+    assert policy.stats().skipped_budget == 1
+
+
+def test_straggler_is_hedged_and_fast_duplicate_wins() -> None:
+    completions = SlowFirstCompletions()
+    policy = HedgePolicy(initial_delay=0.05, budget_ratio=1.0)
+    client = _client(completions, policy)
+
+    started = time.perf_counter()
+    with track_usage() as usage:
+        response = client.chat([{"role": "user", "content": "hi"}])
+
+    assert time.perf_counter() - started < 0.5
+    assert response.call == 2
+    assert usage.as_dict()["hedged_requests"] == 1
+    assert usage.as_dict()["hedge_wins"] == 1
+    assert policy.stats().hedge_wins == 1
+
+
+def test_usage_of_losing_sync_call_is_recorded_when_it_arrives() -> None:
+    usage_per_call = SimpleNamespace(prompt_tokens=10, completion_tokens=2, total_tokens=12)
+    completions = SlowFirstCompletions(0.2, usage=usage_per_call)
+    client = _client(completions, HedgePolicy(initial_delay=0.05, budget_ratio=1.0))
+
+    with track_usage() as usage:
+        assert client.chat([{"role": "user", "content": "hi"}]).call == 2
+        winner_only = usage.as_dict()
+        time.sleep(0.4)
+
+    assert (winner_only["requests"], winner_only["total_tokens"]) == (1, 12)
+    assert usage.as_dict()["requests"] == 2
+    assert usage.as_dict()["prompt_tokens"] == 20 and usage.as_dict()["total_tokens"] == 24
+
+
+def test_async_hedge_wins_and_loser_is_cancelled() -> None:
+    completions = SlowFirstCompletions(slow_seconds=5.0)
+    client = _client(completions, HedgePolicy(initial_delay=0.05, budget_ratio=1.0))
+
+    async def _main() -> SimpleNamespace:
+        response = await client.achat([{"role": "user", "content": "hi"}])
+        await asyncio.sleep(0)
+        assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return response
+
+    assert asyncio.run(_main()).call == 2
+
+
+def test_hedges_skip_when_budget_or_rate_limiter_is_exhausted() -> None:
+    no_budget = HedgePolicy(initial_delay=0.05, budget_ratio=0.0)
+    response = _client(SlowFirstCompletions(0.2), no_budget).chat([])
+    assert response.call == 1 and no_budget.stats().skipped_budget == 1
+
+    limiter = RateLimiter(60, burst=1)
+    limited = HedgePolicy(initial_delay=0.05, budget_ratio=1.0)
+    response = _client(SlowFirstCompletions(0.2), limited, rate_limiter=limiter).chat([])
+    assert response.call == 1
+    assert limited.stats().skipped_rate_limit == 1 and limited.stats().hedges == 0
+
+
+def test_sweep_variant_hedge_option() -> None:
+    assert SweepVariant.from_dict({"model": "m", "hedge": True}).hedge == {}
+    variant = SweepVariant.from_dict({"model": "m", "hedge": {"quantile": 0.9}, "temperature": 0})
+    assert variant.hedge == {"quantile": 0.9}
+    assert variant.request_kwargs == {"temperature": 0}
+    assert variant.name == "m,temperature=0,hedge"
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from sgr.testing import history as history_module
+from sgr.testing.history import RunHistory
+from sgr.testing.models import TestResult, TestRun
+from sgr.testing.reports import write_report
+
+
+def _run(*, model: str, passed: list[bool], day: int) -> TestRun:
+    started = datetime(2024, 1, day)
+    results = [
+        TestResult(
+            id=str(index),
+            passed=flag,
+            output=None,
+            expected_output=None,
+            started_at=started,
+            ended_at=started + timedelta(seconds=index + 1),
+            usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        )
+        for index, flag in enumerate(passed)
+    ]
+    return TestRun(
+        pipeline_name="Routing",
+        started_at=started,
+        ended_at=started + timedelta(minutes=1),
+        results=results,
+        model=model,
+    )
+
+
+class RunHistoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.reports = Path(tmpdir.name) / "reports"
+        self.reports.mkdir()
+        self.cache_path = Path(tmpdir.name) / "history.pickle"
+        write_report(_run(model="gpt-a", passed=[True, False], day=1), self.reports / "Routing-20240101-000000.json")
+        write_report(_run(model="gpt-a", passed=[True, True], day=2), self.reports / "Routing-20240102-000000.json")
+        write_report(_run(model="gpt-b", passed=[False, False], day=3), self.reports / "Routing-20240103-000000.json")
+
+    def test_latest_best_and_trend(self) -> None:
+        history = RunHistory([self.reports])
+        history.refresh()
+
+        self.assertEqual([(r.model, r.started_at.day) for r in history.latest()], [("gpt-a", 2), ("gpt-b", 3)])
+        self.assertEqual([(r.model, r.accuracy) for r in history.best()], [("gpt-a", 1.0), ("gpt-b", 0.0)])
+        self.assertEqual([1, 2, 3], [record.started_at.day for record in history.trend("Routing")])
+        self.assertEqual(30, history.records[0].total_tokens)
+
+    def test_only_new_reports_are_parsed(self) -> None:
+        RunHistory([self.reports], cache_path=self.cache_path).refresh()
+        history = RunHistory([self.reports], cache_path=self.cache_path)
+
+        with mock.patch.object(history_module, "summarize_report", wraps=history_module.summarize_report) as spy:
+            self.assertFalse(history.refresh())
+            write_report(_run(model="gpt-b", passed=[True], day=4), self.reports / "Routing-20240104-000000.json")
+            self.assertTrue(history.refresh())
+
+        self.assertEqual(1, spy.call_count)
+        self.assertEqual(4, len(history.records))
+
+    def test_broken_and_deleted_reports(self) -> None:
+        history = RunHistory([self.reports])
+        history.refresh()
+        (self.reports / "Routing-20240101-000000.json").unlink()
+        (self.reports / "broken.json").write_text("{")
+
+        history.refresh()
+
+        self.assertEqual(2, len(history.records))
+        self.assertIn(str(self.reports / "broken.json"), history.errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
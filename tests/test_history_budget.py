@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any
+
+from sgr.llm.tokens import OMITTED_MARKER, compact_history, estimate_messages_tokens, estimate_tokens
+from sgr.llm.usage import record_response_usage, track_usage
+from sgr.pipelines.routing.pipeline import OrderIssuePipeline
+from sgr.testing.fingerprint import pipeline_fingerprint
+from sgr.testing.models import TestCase
+from sgr.testing.runner import TestRunner
+
+HISTORY = "\n".join(f"Клиент: сообщение {index} о заказе, который не привезли вовремя" for index in range(30))
+
+
+def test_estimate_tokens_scales_with_script_and_length() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 2
+    assert estimate_tokens("заказ") > estimate_tokens("order")
+    assert estimate_tokens("1234567") == 3
+    assert estimate_tokens(HISTORY) > 10 * estimate_tokens(HISTORY.splitlines()[0])
+    messages = [{"role": "system", "content": "hi"}, {"role": "user", "content": "hi"}]
+    assert estimate_messages_tokens(messages) == 2 * (estimate_tokens("hi") + 4)
+
+
+def test_compact_history_keeps_recent_turns_within_budget() -> None:
+    assert compact_history("коротко", 100).text == "коротко"
+
+    compacted = compact_history(HISTORY, 90)
+
+    lines = compacted.text.splitlines()
+    assert compacted.tokens <= 90
+    assert compacted.trimmed_tokens == compacted.original_tokens - compacted.tokens > 0
+    assert lines[-1] == HISTORY.splitlines()[-1]
+    assert lines[0] == OMITTED_MARKER.format(count=compacted.dropped_turns)
+    assert compacted.truncated_turns == 1 and lines[1].endswith("…")
+    assert compacted.dropped_turns + len(lines) - 1 == 30
+
+
+def test_routing_pipeline_applies_budget_and_records_trimmed_tokens() -> None:
+    client = SimpleNamespace(config=SimpleNamespace(model="m"))
+    unlimited = OrderIssuePipeline(client)
+    budgeted = OrderIssuePipeline(client, history_token_budget=50)
+
+    with track_usage() as usage:
+        query = budgeted._prompt_params("где заказ?", HISTORY)["query"]
+        budgeted.prefix_key(review_text="где заказ?", history_text=HISTORY)
+    assert HISTORY.splitlines()[-1] in query
+    assert HISTORY.splitlines()[0] not in query
+    assert "history_tokens_trimmed" not in usage.as_dict()
+    assert HISTORY in unlimited._prompt_params("где заказ?", HISTORY)["query"]
+    assert pipeline_fingerprint(budgeted) != pipeline_fingerprint(unlimited)
+
+
+def test_trimmed_history_is_recorded_once_per_case() -> None:
+    answer = {"thinking": "-", "categories": ["other"], "confidence": "high", "sentiment": "neutral"}
+
+    def _chat(messages: list[dict[str, str]], **kwargs: Any) -> SimpleNamespace:
+        items = messages[-1]["content"].count("### Элемент")
+        content = {"items": [{**answer, "index": index} for index in range(items)]} if items else answer
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))])
+        record_response_usage(response)
+        return response
+
+    client = SimpleNamespace(config=SimpleNamespace(model="m"), chat=_chat)
+    pipeline = OrderIssuePipeline(client, history_token_budget=50)
+    trimmed = compact_history(HISTORY, 50).trimmed_tokens
+    cases = [
+        TestCase(id=str(index), params={"review_text": "где заказ?", "history_text": HISTORY}, expected_output=answer)
+        for index in range(2)
+    ]
+
+    single = TestRunner(group_by_prefix=True).run(pipeline, cases)
+    batched = TestRunner(batch_size=2, group_by_prefix=True).run(pipeline, cases)
+
+    assert [result.usage["history_tokens_trimmed"] for result in single.results] == [trimmed, trimmed]
+    assert [result.usage["history_tokens_trimmed"] for result in batched.results] == [trimmed, trimmed]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import replace
+
+import pytest
+
+from sgr.testing.models import TestCase
+from sgr.testing.reports import serialize_run
+from sgr.testing.runner import TestRunner
+
+REFERENCE = "tests.test_process_backend:build_pipeline"
+_WORD_RE = re.compile(r"\w+")
+
+
+class WordCountPipeline:
+    """CPU-only pipeline; reports the worker pid so tests can see where it ran."""
+
+    name = "WordCount"
+
+    def run(self, text: str) -> dict[str, int]:
+        if text == "boom":
+            raise ValueError("cannot count")
+        return {"words": len(_WORD_RE.findall(text)), "pid": os.getpid()}
+
+
+def build_pipeline() -> WordCountPipeline:
+    return WordCountPipeline()
+
+
+def same_word_count(actual: dict[str, int], expected: int) -> bool:
+    return actual["words"] == expected
+
+
+def _cases() -> list[TestCase]:
+    texts = ["one two", "three", "boom", "a b c d", "x y", "q"]
+    return [
+        TestCase(id=f"case-{index}", params={"text": text}, expected_output=len(text.split()), metadata={"n": index})
+        for index, text in enumerate(texts)
+    ]
+
+
+def _comparable(run_dict: dict) -> dict:
+    for result in run_dict["results"]:
+        result.pop("started_at"), result.pop("ended_at"), result.pop("duration_seconds")
+        if result["output"]:
+            result["output"].pop("pid")
+    for key in ("started_at", "ended_at", "duration_seconds"):
+        run_dict.pop(key)
+    return run_dict
+
+
+def test_process_backend_matches_threaded_run() -> None:
+    runner_options = {"comparator": same_word_count, "max_workers": 2}
+
+    threaded = TestRunner(**runner_options).run(build_pipeline(), _cases())
+    processed = TestRunner(backend="process", **runner_options).run(REFERENCE, _cases())
+
+    assert _comparable(json.loads(serialize_run(processed))) == _comparable(json.loads(serialize_run(threaded)))
+    assert [result.passed for result in processed.results] == [True, True, False, True, True, True]
+    assert processed.results[2].error == "cannot count"
+    assert {result.output["pid"] for result in processed.results if result.output} - {os.getpid()}
+
+
+def test_process_backend_validates_reference_and_comparators() -> None:
+    with pytest.raises(ValueError, match="module:attribute"):
+        TestRunner(backend="process").run(build_pipeline(), _cases())
+    with pytest.raises(ValueError, match="can be pickled"):
+        TestRunner(backend="process", comparator=lambda actual, expected: True).run(REFERENCE, _cases())
+    with pytest.raises(ValueError, match="Unknown backend"):
+        TestRunner(backend="cluster")
+
+
+def test_process_backend_rejects_unpicklable_case_comparator_before_running() -> None:
+    cases = _cases()
+    cases[2] = replace(cases[2], comparator=lambda actual, expected: True)
+    cases[3] = replace(cases[3], comparator=same_word_count)
+    with pytest.raises(ValueError, match="test case case-2 has <function"):
+        TestRunner(backend="process", comparator=same_word_count).run(REFERENCE, cases)
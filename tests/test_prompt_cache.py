@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from sgr.llm.usage import record_response_usage, track_usage
+from sgr.pipelines.routing.pipeline import HISTORY_INSTRUCTIONS, OrderIssuePipeline
+from sgr.testing.models import TestCase
+from sgr.testing.runner import TestRunner
+
+
+def test_cached_tokens_are_recorded_and_reported_as_hit_ratio() -> None:
+    response = SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=1000,
+            completion_tokens=50,
+            total_tokens=1050,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=768),
+        )
+    )
+
+    class CachedPipeline:
+        name = "Cached"
+
+        def run(self, text: str) -> str:
+            record_response_usage(response)
+            return text
+
+    with track_usage() as usage:
+        CachedPipeline().run(text="x")
+    assert usage.as_dict()["cached_tokens"] == 768
+
+    run = TestRunner().run(CachedPipeline(), [TestCase(id="1", params={"text": "x"}, expected_output="x")])
+    assert run.prompt_cache_hit_ratio == pytest.approx(0.768)
+    assert run.to_dict()["prompt_cache_hit_ratio"] == pytest.approx(0.768)
+
+
+def test_cache_friendly_routing_keeps_one_prefix_with_and_without_history() -> None:
+    client = SimpleNamespace(config=SimpleNamespace(model="m"))
+    friendly = OrderIssuePipeline(client, cache_friendly=True)
+    plain = OrderIssuePipeline(client)
+
+    with_history = friendly._build_messages(friendly._prompt_params("где заказ?", "раньше писал"))
+    without_history = friendly._build_messages(friendly._prompt_params("где заказ?"))
+
+    assert with_history[0] == without_history[0]
+    assert HISTORY_INSTRUCTIONS in with_history[0]["content"]
+    assert HISTORY_INSTRUCTIONS not in with_history[-1]["content"]
+    assert with_history[-1]["content"].startswith("ИСТОРИЯ:\nраньше писал")
+    assert friendly.prefix_key(review_text="a") == friendly.prefix_key(review_text="b")
+    dialog_key = friendly.prefix_key(review_text="a", history_text="c")
+    assert dialog_key == friendly.prefix_key(review_text="b", history_text="c")
+    assert dialog_key != friendly.prefix_key(review_text="a", history_text="d")
+    assert dialog_key != friendly.prefix_key(review_text="a")
+    assert plain.prefix_key(review_text="a") != friendly.prefix_key(review_text="a")
+    assert plain._prompt_params("a", "h")["query"].startswith(HISTORY_INSTRUCTIONS)
+
+
+class PrefixPipeline:
+    name = "Prefix"
+
+    def __init__(self) -> None:
+        self.order: list[str] = []
+
+    def prefix_key(self, text: str) -> str:
+        return text[0]
+
+    def run(self, text: str) -> str:
+        self.order.append(text)
+        return text
+
+
+def test_group_by_prefix_sends_shared_prefixes_together_and_keeps_result_order() -> None:
+    pipeline = PrefixPipeline()
+    texts = ["a1", "b1", "a2", "c1", "b2", "a3"]
+    cases = [TestCase(id=text, params={"text": text}, expected_output=text) for text in texts]
+
+    run = TestRunner(group_by_prefix=True).run(pipeline, cases)
+
+    assert pipeline.order == ["a1", "a2", "a3", "b1", "b2", "c1"]
+    assert [result.id for result in run.results] == texts
+
+
+def test_group_by_prefix_sends_cases_of_one_dialog_together() -> None:
+    sent: list[str] = []
+    answer = {"thinking": "-", "categories": ["other"], "confidence": "high", "sentiment": "neutral"}
+
+    def _chat(messages: list[dict[str, str]], **kwargs: Any) -> SimpleNamespace:
+        sent.append(messages[-1]["content"].rsplit("\n", maxsplit=1)[-1])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))])
+
+    pipeline = OrderIssuePipeline(SimpleNamespace(config=SimpleNamespace(model="m"), chat=_chat), cache_friendly=True)
+    dialogs = [("q1", "диалог A"), ("q2", "диалог B"), ("q3", "диалог A"), ("q4", None), ("q5", "диалог B")]
+    cases = [
+        TestCase(id=text, params={"review_text": text, "history_text": history}, expected_output=answer)
+        for text, history in dialogs
+    ]
+
+    run = TestRunner(group_by_prefix=True).run(pipeline, cases)
+
+    assert sent == ["q1", "q3", "q2", "q5", "q4"]
+    assert [result.id for result in run.results] == ["q1", "q2", "q3", "q4", "q5"]
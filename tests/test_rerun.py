@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+
+from sgr.testing.cli import main
+from sgr.testing.fingerprint import pipeline_fingerprint
+from sgr.testing.models import TestCase
+from sgr.testing.reports import find_reports, load_report, save_report
+from sgr.testing.rerun import fill_from_baseline, order_failed_first, select_changed, select_last_failed
+from sgr.testing.runner import TestRunner
+
+CALLS: list[str] = []
+
+
+@dataclass
+class UpperPipeline:
+    name: str = "Upper"
+
+    def run(self, text: str) -> str:
+        CALLS.append(text)
+        return text.upper()
+
+
+def _cases(*, second_expected: str = "wrong") -> list[TestCase]:
+    return [
+        TestCase(id="ok", params={"text": "a"}, expected_output="A"),
+        TestCase(id="broken", params={"text": "b"}, expected_output=second_expected),
+        TestCase(id="also-ok", params={"text": "c"}, expected_output="C"),
+    ]
+
+
+class RerunSelectionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.report_dir = Path(tmpdir.name) / "reports"
+        self.pipeline = UpperPipeline()
+        self.baseline = load_report(save_report(TestRunner().run(self.pipeline, _cases()), self.report_dir))
+
+    def test_last_failed_and_failed_first(self) -> None:
+        cases = _cases() + [TestCase(id="new", params={"text": "d"}, expected_output="D")]
+
+        self.assertEqual(["broken", "new"], [case.id for case in select_last_failed(cases, self.baseline)])
+        self.assertEqual(
+            ["broken", "new", "ok", "also-ok"], [case.id for case in order_failed_first(cases, self.baseline)]
+        )
+
+    def test_changed_cases_and_pipeline_fingerprint(self) -> None:
+        cases = _cases(second_expected="B")
+        fingerprint = pipeline_fingerprint(self.pipeline)
+
+        changed = select_changed(cases, self.baseline, pipeline_fingerprint=fingerprint)
+        everything = select_changed(cases, self.baseline, pipeline_fingerprint="other-prompt")
+
+        self.assertEqual(["broken"], [case.id for case in changed])
+        self.assertEqual(3, len(everything))
+
+    def test_fill_from_baseline_restores_full_report(self) -> None:
+        cases = _cases(second_expected="B")
+        partial = TestRunner().run(self.pipeline, select_last_failed(cases, self.baseline))
+        partial.model, partial.model_parameters = "gpt-test", {"temperature": 0}
+        partial.estimate, partial.budget = {"accuracy": 1.0}, {"max_tokens": 100, "tokens": 10}
+
+        full = fill_from_baseline(partial, cases, self.baseline)
+
+        self.assertEqual(["ok", "broken", "also-ok"], [result.id for result in full.results])
+        self.assertTrue(all(result.passed for result in full.results))
+        self.assertEqual(
+            (partial.model, partial.model_parameters, partial.estimate, partial.budget),
+            (full.model, full.model_parameters, full.estimate, full.budget),
+        )
+
+    def test_fill_from_baseline_skips_changed_cases(self) -> None:
+        cases = _cases(second_expected="B")
+        cases[0] = TestCase(id="ok", params={"text": "z"}, expected_output="Z")
+        fingerprint = pipeline_fingerprint(self.pipeline)
+
+        partial = TestRunner().run(self.pipeline, select_last_failed(cases, self.baseline))
+        filled = fill_from_baseline(partial, cases, self.baseline)
+        partial.pipeline_fingerprint = "other-prompt"
+        other_pipeline = fill_from_baseline(partial, cases, self.baseline)
+
+        self.assertEqual(["broken", "also-ok"], [result.id for result in filled.results])
+        self.assertEqual(["broken"], [result.id for result in other_pipeline.results])
+
+        rerun = select_last_failed(cases, self.baseline, pipeline_fingerprint=fingerprint)
+        full = fill_from_baseline(TestRunner().run(self.pipeline, rerun), cases, self.baseline)
+
+        self.assertEqual(["ok", "broken"], [case.id for case in rerun])
+        self.assertEqual(["ok", "broken", "also-ok"], [result.id for result in full.results])
+        self.assertEqual("Z", full.results[0].output)
+
+    def test_cli_last_failed_reruns_only_failures(self) -> None:
+        tests_path = self.report_dir.parent / "cases.json"
+        payload = [{"id": case.id, "params": case.params, "expected_output": case.expected_output} for case in _cases()]
+        tests_path.write_text(json.dumps(payload))
+        CALLS.clear()
+
+        exit_code = main(
+            [
+                "--pipeline",
+                f"{__name__}:UpperPipeline",
+                "--tests",
+                str(tests_path),
+                "--no-cache",
+                "--report-dir",
+                str(self.report_dir),
+                "--last-failed",
+                "--fill-from-previous",
+            ]
+        )
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(["b"], CALLS)
+        latest = load_report(find_reports(self.report_dir, "Upper")[-1])
+        self.assertEqual(["ok", "broken", "also-ok"], [result.id for result in latest.results])
+
+
+if __name__ == "__main__":
+    unittest.main()
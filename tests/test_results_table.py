@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from sgr.testing.models import TestResult
+from sgr.testing.results_table import ResultQuery, ResultTable
+
+
+def _result(case_id: str, *, passed: bool, seconds: float, error: str | None = None) -> TestResult:
+    started = datetime(2024, 1, 1)
+    return TestResult(
+        id=case_id,
+        passed=passed,
+        output={"text": "x" * 500},
+        expected_output="short",
+        started_at=started,
+        ended_at=started + timedelta(seconds=seconds),
+        error=error,
+    )
+
+
+@pytest.fixture()
+def table() -> ResultTable:
+    table = ResultTable(max_cell_chars=20)
+    table.add(_result("a", passed=True, seconds=1.0), pipeline_name="routing")
+    table.add(_result("b", passed=False, seconds=5.0, error="Timeout while waiting"), pipeline_name="routing")
+    table.add(_result("c", passed=False, seconds=3.0, error="Invalid JSON"), pipeline_name="splitter")
+    return table
+
+
+def test_filters_combine(table: ResultTable) -> None:
+    page = table.query(ResultQuery(status="failed", pipelines=("routing",), error_contains="timeout"))
+
+    assert [row[1] for row in page.rows] == ["b"]
+    assert (page.matched, page.total) == (1, 3)
+
+
+def test_sort_and_paging(table: ResultTable) -> None:
+    first = table.query(ResultQuery(sort_by="duration_seconds", descending=True, page_size=2))
+    second = table.query(ResultQuery(sort_by="duration_seconds", descending=True, page_size=2, page=5))
+
+    assert [row[1] for row in first.rows] == ["b", "c"]
+    assert (second.page, second.pages, [row[1] for row in second.rows]) == (2, 2, ["a"])
+    assert [row[1] for row in table.query(ResultQuery(min_duration_seconds=3.0)).rows] == ["b", "c"]
+
+
+def test_large_cells_are_truncated_and_expandable(table: ResultTable) -> None:
+    row = table.query().rows[0]
+
+    assert len(row[3]) == 20 and row[3].endswith("…")
+    assert table.detail("a")["output"] == {"text": "x" * 500}
+    assert table.detail("a", "splitter") is None
+
+
+def test_rejects_unknown_sort_column(table: ResultTable) -> None:
+    with pytest.raises(ValueError):
+        table.query(ResultQuery(sort_by="output"))
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+from sgr.testing.models import TestCase, TestResult
+from sgr.testing.runner import TestRunner
+
+
+@dataclass
+class EchoPipeline:
+    name: str = "Echo"
+
+    def run(self, text: str) -> str:
+        return text
+
+
+def _cases(count: int) -> list[TestCase]:
+    return [TestCase(id=str(index), params={"text": "x"}, expected_output="x") for index in range(count)]
+
+
+def test_on_result_streams_every_case() -> None:
+    seen: list[TestResult] = []
+
+    run = TestRunner().run(EchoPipeline(), _cases(3), on_result=seen.append)
+
+    assert [result.id for result in seen] == ["0", "1", "2"]
+    assert run.stop_reason is None
+
+
+def test_stop_event_stops_scheduling_new_cases() -> None:
+    stop_event = threading.Event()
+
+    def _stop_after_two(result: TestResult) -> None:
+        if result.id == "1":
+            stop_event.set()
+
+    run = TestRunner().run(EchoPipeline(), _cases(5), on_result=_stop_after_two, stop_event=stop_event)
+
+    assert [result.id for result in run.results] == ["0", "1"]
+    assert run.stop_reason == "cancelled"
+    assert run.to_dict()["stop_reason"] == "cancelled"
+
+
+@dataclass
+class SlowPipeline:
+    name: str = "Slow"
+
+    def __post_init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def run(self, text: str) -> str:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        threading.Event().wait(0.01 * (int(text) % 3))
+        with self._lock:
+            self.active -= 1
+        return text
+
+
+def test_concurrent_run_keeps_input_order_and_bounds_in_flight_cases() -> None:
+    pipeline = SlowPipeline()
+    cases = [TestCase(id=str(index), params={"text": str(index)}, expected_output=str(index)) for index in range(12)]
+
+    run = TestRunner(max_workers=3).run(pipeline, cases)
+
+    assert [result.id for result in run.results] == [case.id for case in cases]
+    assert run.summary.passed == 12
+    assert 1 < pipeline.peak <= 3
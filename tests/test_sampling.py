@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from sgr.llm.usage import current_recorder
+from sgr.testing.cli import main
+from sgr.testing.models import TestCase, TestRun
+from sgr.testing.runner import TestRunner
+from sgr.testing.sampling import default_ks, pass_at_k, sampling_stats
+
+
+def test_pass_at_k_matches_the_unbiased_estimator() -> None:
+    assert pass_at_k(5, 0, 1) == 0.0
+    assert pass_at_k(5, 5, 3) == 1.0
+    assert pass_at_k(4, 1, 1) == pytest.approx(0.25)
+    assert pass_at_k(4, 1, 2) == pytest.approx(0.5)
+    assert pass_at_k(4, 3, 2) == 1.0
+    assert default_ks(5) == [1, 2, 4, 5]
+    assert default_ks(1) == [1]
+
+
+class AlternatingPipeline:
+    """Every other call returns the wrong answer."""
+
+    name = "Alternating"
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def run(self, text: str) -> str:
+        with self._lock:
+            value = next(self._counter)
+            self.calls += 1
+        current_recorder().add(requests=1, total_tokens=10)
+        return text if value % 2 == 0 else "wrong"
+
+
+class NChoicePipeline(AlternatingPipeline):
+    """Supports ``n`` but the provider caps it at two choices."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batched_calls = 0
+
+    def run_samples(self, n: int, text: str) -> list[object]:
+        self.batched_calls += 1
+        return [text, ValueError("bad json"), text][: min(n, 2)]
+
+
+def _cases() -> list[TestCase]:
+    return [TestCase(id=str(index), params={"text": "x"}, expected_output="x") for index in range(3)]
+
+
+def test_repeat_falls_back_to_concurrent_calls_and_tracks_usage() -> None:
+    pipeline = AlternatingPipeline()
+
+    run = TestRunner(repeat=4).run(pipeline, _cases())
+
+    assert pipeline.calls == 12
+    assert all(len(result.samples) == 4 for result in run.results)
+    assert all(result.usage["total_tokens"] == 40 for result in run.results)
+    stats = sampling_stats(run.results)
+    assert stats.mean_pass_rate == pytest.approx(0.5)
+    assert stats.pass_at_k[1] == pytest.approx(0.5)
+    assert stats.pass_at_k[4] == 1.0
+    assert [case.id for case in stats.flaky] == ["0", "1", "2"]
+
+
+def test_repeat_uses_run_samples_and_tops_up_missing_choices() -> None:
+    pipeline = NChoicePipeline()
+
+    run = TestRunner(repeat=3).run(pipeline, _cases()[:1])
+
+    result = run.results[0]
+    assert pipeline.batched_calls == 1 and pipeline.calls == 1
+    assert [sample.passed for sample in result.samples] == [True, False, True]
+    assert result.samples[1].error == "bad json"
+    assert result.passed is True and result.output == "x"
+
+    restored = TestRun.from_dict(run.to_dict())
+    assert [sample.passed for sample in restored.results[0].samples] == [True, False, True]
+    assert run.to_dict()["sampling"]["flaky"] == ["0"]
+    assert run.to_dict()["sampling"]["accuracy_basis"] == "first_sample"
+
+
+def test_single_sample_runs_have_no_sampling_section() -> None:
+    run = TestRunner().run(AlternatingPipeline(), _cases())
+
+    assert run.results[0].samples is None
+    assert run.to_dict()["sampling"] is None
+
+
+def test_cli_summary_says_accuracy_is_first_sample_only(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    tests_path = tmp_path / "cases.json"
+    tests_path.write_text(json.dumps([{"id": "0", "params": {"text": "x"}, "expected_output": "x"}]))
+    argv = ["--pipeline", f"{__name__}:AlternatingPipeline", "--tests", str(tests_path), "--no-cache"]
+
+    assert main([*argv, "--repeat", "4"]) == 0
+    repeated = capsys.readouterr().out
+    assert main(argv) == 0
+    single = capsys.readouterr().out
+
+    assert "Accuracy: 100% (first sample of each case)" in repeated
+    assert "Mean pass rate (all samples): 50.00%" in repeated
+    assert "first sample" not in single
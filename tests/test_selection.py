@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from sgr.testing.models import TestCase
+from sgr.testing.selection import TestCaseIndex, filter_test_cases, parse_selector
+
+
+def _cases() -> list[TestCase]:
+    return [
+        TestCase(
+            id="routing-order-status",
+            params={},
+            expected_output=None,
+            metadata={"topic": "logistics", "locale": "ru-RU", "tags": ["smoke"]},
+        ),
+        TestCase(id="routing-incomplete", params={}, expected_output=None, metadata={"topic": "fulfillment"}),
+        TestCase(id="splitter-two-orders", params={}, expected_output=None, metadata={"locale": "ru-RU"}),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected_ids"),
+    [
+        ("topic=logistics and locale=ru-RU", ["routing-order-status"]),
+        ("routing-*", ["routing-order-status", "routing-incomplete"]),
+        ("id=splitter-* or topic=fulfillment", ["routing-incomplete", "splitter-two-orders"]),
+        ("locale=ru-RU and not tag=smoke", ["splitter-two-orders"]),
+        ("topic!=logistics", ["routing-incomplete", "splitter-two-orders"]),
+        ("(topic=logi* or topic=ful*) and 'locale'=\"ru-RU\"", ["routing-order-status"]),
+    ],
+)
+def test_index_and_stream_filter_agree(expression: str, expected_ids: list[str]) -> None:
+    cases = _cases()
+
+    indexed = TestCaseIndex(cases).select(expression)
+    streamed = list(filter_test_cases(cases, expression))
+
+    assert [case.id for case in indexed] == expected_ids
+    assert [case.id for case in streamed] == expected_ids
+
+
+@pytest.mark.parametrize("expression", ["", "topic=", "(topic=logistics", "topic=logistics and", "a ! b"])
+def test_invalid_selector_raises_value_error(expression: str) -> None:
+    with pytest.raises(ValueError):
+        parse_selector(expression)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+
+from sgr.testing.models import TestCase
+from sgr.testing.runner import TestRunner
+from sgr.testing.sequential import ABOVE, BELOW, run_until_confident, wilson_interval
+from sgr.testing.strata import assign_strata, random_order, stratified_order
+
+
+def test_wilson_interval_matches_reference_values() -> None:
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+class ParityPipeline:
+    """Fails every case whose number is divisible by ``modulus``."""
+
+    name = "Parity"
+
+    def __init__(self, modulus: int) -> None:
+        self.modulus = modulus
+
+    def run(self, number: int) -> bool:
+        return number % self.modulus != 0
+
+
+def _cases(count: int) -> list[TestCase]:
+    return [TestCase(id=str(index), params={"number": index + 1}, expected_output=True) for index in range(count)]
+
+
+def test_stops_early_when_accuracy_is_clearly_above_threshold() -> None:
+    run = run_until_confident(TestRunner(), ParityPipeline(modulus=50), _cases(2000), threshold=0.8, min_cases=20)
+
+    assert run.stop_reason == "early_stop"
+    assert run.estimate["decision"] == ABOVE
+    assert run.estimate["evaluated"] == len(run.results) < 100
+    assert run.estimate["cases_skipped"] == 2000 - len(run.results)
+    assert run.to_dict()["estimate"]["interval"][0] >= 0.8
+
+
+def test_stops_early_when_accuracy_is_clearly_below_threshold() -> None:
+    run = run_until_confident(TestRunner(), ParityPipeline(modulus=2), _cases(500), threshold=0.9, min_cases=20)
+
+    assert run.estimate["decision"] == BELOW
+    assert len(run.results) < 50
+
+
+def test_undecided_run_covers_the_whole_suite() -> None:
+    run = run_until_confident(TestRunner(), ParityPipeline(modulus=10), _cases(40), threshold=0.9, min_cases=10)
+
+    assert run.stop_reason is None
+    assert run.estimate["decision"] == "undecided"
+    assert len(run.results) == 40
+
+
+def _topic_cases() -> list[TestCase]:
+    topics = ["common"] * 90 + ["rare"] * 10
+    return [
+        TestCase(id=str(index), params={}, expected_output={"categories": ["x", topic]}, metadata={"topic": topic})
+        for index, topic in enumerate(topics)
+    ]
+
+
+def test_stratified_order_is_deterministic_and_proportional() -> None:
+    cases = _topic_cases()
+
+    first = stratified_order(cases, "topic", seed=7)
+    assert [case.id for case in first] == [case.id for case in stratified_order(cases, "topic", seed=7)]
+    assert [case.id for case in first] != [case.id for case in stratified_order(cases, "topic", seed=8)]
+    prefix = Counter(case.metadata["topic"] for case in first[:20])
+    assert prefix["rare"] == 2
+    assert sorted(case.id for case in random_order(cases, seed=1)) == sorted(case.id for case in cases)
+
+
+def test_multi_valued_keys_use_the_rarest_value() -> None:
+    strata = assign_strata(_topic_cases(), "expected.categories")
+
+    assert Counter(strata) == {"common": 90, "rare": 10}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+
+from sgr.testing.models import TestCase
+from sgr.testing.runner import TestRunner
+from sgr.testing.smoke import smoke_sample, stratified_estimate
+
+
+def _suite() -> list[TestCase]:
+    categories = ["order_status"] * 700 + ["refund"] * 295 + ["damaged_item"] * 5
+    return [
+        TestCase(
+            id=f"case-{index}",
+            params={"category": category},
+            expected_output={"categories": [category]},
+            metadata={"topic": "logistics" if category == "order_status" else "payments"},
+        )
+        for index, category in enumerate(categories)
+    ]
+
+
+def test_sample_is_deterministic_proportional_and_keeps_rare_strata() -> None:
+    suite = _suite()
+
+    sample = smoke_sample(suite, "expected.categories", fraction=0.02, seed=1)
+
+    assert [case.id for case in sample.cases] == [
+        case.id for case in smoke_sample(suite, "expected.categories", fraction=0.02, seed=1).cases
+    ]
+    assert Counter(sample.strata.values()) == {"order_status": 14, "refund": 5, "damaged_item": 1}
+    assert sample.population == {"damaged_item": 5, "order_status": 700, "refund": 295}
+    positions = [suite.index(case) for case in sample.cases]
+    assert positions == sorted(positions)
+
+
+def test_sample_size_and_argument_validation() -> None:
+    sample = smoke_sample(_suite(), "topic", size=10, seed=0)
+
+    assert len(sample.cases) == 10
+    assert Counter(sample.strata.values()) == {"logistics": 7, "payments": 3}
+    with pytest.raises(ValueError):
+        smoke_sample(_suite(), "topic", fraction=0.1, size=10)
+
+
+class FailsRefunds:
+    name = "FailsRefunds"
+
+    def run(self, category: str) -> dict[str, list[str]]:
+        return {"categories": ["wrong" if category == "refund" else category]}
+
+
+def test_weighted_estimate_uses_population_weights() -> None:
+    sample = smoke_sample(_suite(), "expected.categories", size=100, seed=2)
+
+    run = TestRunner().run(FailsRefunds(), sample.cases)
+    estimate = stratified_estimate(run, sample)
+
+    assert estimate["strata"]["refund"]["accuracy"] == 0.0
+    assert estimate["strata"]["damaged_item"]["total"] >= 1
+    assert estimate["accuracy"] == pytest.approx(705 / 1000)
+    # Every stratum passed or failed completely; the interval still has a width.
+    lower, upper = estimate["interval"]
+    assert 0.6 < lower < estimate["accuracy"] < upper < 0.8
@@ -10,16 +10,19 @@ from models.pipeline import PromptTemplate, StructuredChatPipeline
 
 
 class DummyResponse:
-    def __init__(self, content: str):
-        self.choices = [type("Choice", (), {"message": type("Msg", (), {"content": content})()})()]
+    def __init__(self, content: str, *more: str):
+        self.choices = [
+            type("Choice", (), {"message": type("Msg", (), {"content": text})()})() for text in (content, *more)
+        ]
 
 
 class DummyClient:
     def __init__(self, response: Any):
         self.response = response
 
-    def chat(self, messages: list[dict[str, str]]) -> Any:  # noqa: ANN401
+    def chat(self, messages: list[dict[str, str]], **kwargs: Any) -> Any:  # noqa: ANN401
         self.last_messages = messages
+        self.last_kwargs = kwargs
         return self.response
 
 
@@ -70,6 +73,22 @@ class StructuredChatPipelineTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             pipeline.run()
 
+    def test_run_samples_parses_every_choice_separately(self) -> None:
+        response = DummyResponse(json.dumps({"name": "A"}), "not json", json.dumps({"name": "B"}))
+        client = DummyClient(response=response)
+        pipeline = StructuredChatPipeline(
+            client=client,
+            prompt=PromptTemplate(user="Hello"),
+            response_model=ResultModel,
+        )
+
+        samples = pipeline.run_samples(3)
+
+        self.assertEqual(client.last_kwargs, {"n": 3})
+        self.assertEqual(samples[0].name, "A")
+        self.assertIsInstance(samples[1], ValueError)
+        self.assertEqual(samples[2].name, "B")
+
 
 if __name__ == "__main__":
     unittest.main()
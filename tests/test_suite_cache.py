@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sgr.testing.cache import SuiteCache
+from sgr.testing.schema import TestCasesFile
+
+
+class SuiteCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        self.cache = SuiteCache(self.root / "cache")
+        self.path = self.root / "cases.json"
+
+    def _write_cases(self, *ids: str) -> None:
+        payload = [{"id": case_id, "params": {}, "expected_output": case_id} for case_id in ids]
+        self.path.write_text(json.dumps(payload))
+
+    def test_unchanged_suite_skips_validation(self) -> None:
+        self._write_cases("case-1", "case-2")
+        first = self.cache.load(self.path)
+
+        with mock.patch.object(TestCasesFile, "model_validate_json", side_effect=AssertionError("validated")):
+            second = self.cache.load(self.path)
+
+        self.assertEqual([case.id for case in first], [case.id for case in second])
+
+    def test_changed_suite_is_revalidated(self) -> None:
+        self._write_cases("case-1")
+        self.cache.load(self.path)
+
+        self._write_cases("case-1", "case-2")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(["case-1", "case-2"], [case.id for case in self.cache.load(self.path)])
+
+    def test_corrupted_entry_falls_back_to_validation(self) -> None:
+        self._write_cases("case-1")
+        self.cache.load(self.path)
+        for entry in self.cache.directory.iterdir():
+            entry.write_bytes(b"garbage")
+
+        self.assertEqual(["case-1"], [case.id for case in self.cache.load(self.path)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+from sgr.llm.rate_limit import RateLimiter
+from sgr.testing.models import TestCase
+from sgr.testing.reports import find_reports, load_report
+from sgr.testing.sweep import SweepConfig, SweepVariant, expand_matrix, format_comparison, run_sweep
+
+
+def test_expand_matrix_splits_client_keys_from_request_kwargs() -> None:
+    variants = expand_matrix({"model": ["a", "b"], "temperature": [0, 0.7], "base_url": "http://local"})
+
+    assert [variant.name for variant in variants] == [
+        "a,temperature=0",
+        "a,temperature=0.7",
+        "b,temperature=0",
+        "b,temperature=0.7",
+    ]
+    assert {variant.base_url for variant in variants} == {"http://local"}
+    assert variants[1].request_kwargs == {"temperature": 0.7}
+
+
+def test_config_combines_matrix_and_explicit_variants() -> None:
+    config = SweepConfig.from_dict(
+        {
+            "pipeline": "pkg.module:build_pipeline",
+            "tests": "cases.json",
+            "matrix": {"model": "a"},
+            "variants": [{"model": "b", "label": "local-b", "api_key_env": "LOCAL_KEY"}],
+        }
+    )
+
+    assert [variant.name for variant in config.variants] == ["a", "local-b"]
+    assert config.variants[1].api_key_env == "LOCAL_KEY"
+
+
+@dataclass
+class ModelPipeline:
+    client: SimpleNamespace
+    name: str = "Model"
+
+    def run(self, text: str) -> str:
+        with self.client.lock:
+            self.client.active[0] += 1
+            self.client.peak[0] = max(self.client.peak[0], self.client.active[0])
+        threading.Event().wait(0.005)
+        with self.client.lock:
+            self.client.active[0] -= 1
+        self.client.limiter_seen.append(self.client.rate_limiter)
+        return text if self.client.config.model == "good" else "wrong"
+
+
+def test_run_sweep_shares_pool_and_limiter_and_writes_a_report_per_variant(tmp_path: Path) -> None:
+    lock, active, peak, limiters = threading.Lock(), [0], [0], []
+
+    def _client(variant: SweepVariant, rate_limiter: RateLimiter | None) -> SimpleNamespace:
+        config = SimpleNamespace(model=variant.model, base_url=None, request_kwargs=variant.request_kwargs)
+        return SimpleNamespace(
+            config=config, rate_limiter=rate_limiter, lock=lock, active=active, peak=peak, limiter_seen=limiters
+        )
+
+    config = SweepConfig(
+        pipeline="unused:factory",
+        tests=tmp_path / "cases.json",
+        variants=expand_matrix({"model": ["good", "bad"], "temperature": [0, 1]}),
+        max_workers=2,
+        requests_per_minute=60_000,
+        report_dir=tmp_path / "reports",
+    )
+    cases = [TestCase(id=str(index), params={"text": "x"}, expected_output="x") for index in range(6)]
+
+    outcomes = run_sweep(config, test_cases=cases, factory=ModelPipeline, client_factory=_client)
+
+    assert [outcome.variant.name for outcome in outcomes] == [variant.name for variant in config.variants]
+    assert [outcome.test_run.summary.passed for outcome in outcomes] == [6, 6, 0, 0]
+    assert peak[0] <= 2
+    assert len({id(limiter) for limiter in limiters}) == 1 and limiters[0] is not None
+
+    reports = find_reports(tmp_path / "reports")
+    assert len(reports) == 4
+    assert load_report(outcomes[1].report_path).model_parameters["request_kwargs"] == {"temperature": 1}
+
+    table = format_comparison(outcomes)
+    assert table.splitlines()[2].startswith("| good,temperature=")
+    assert "100.00%" in table and "0.00%" in table
+
+
+def test_run_sweep_reports_factory_errors_per_variant(tmp_path: Path) -> None:
+    def _factory(client: SimpleNamespace) -> ModelPipeline:
+        raise RuntimeError(f"no endpoint for {client.config.model}")
+
+    config = SweepConfig(pipeline="unused:factory", tests=tmp_path / "cases.json", variants=[SweepVariant(model="x")])
+    outcomes = run_sweep(
+        config,
+        test_cases=[],
+        factory=_factory,
+        client_factory=lambda variant, _: SimpleNamespace(config=SimpleNamespace(model=variant.model)),
+    )
+
+    assert outcomes[0].error == "no endpoint for x"
+    assert "Failed: x: no endpoint for x" in format_comparison(outcomes)
+
+
+def test_rate_limiter_waits_for_refill() -> None:
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(60, burst=2, clock=lambda: now[0], sleep=_sleep)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert sleeps == [1.0]
+    assert not limiter.try_acquire()
@@ -5,7 +5,7 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from sgr.testing.schema import load_test_cases
+from sgr.testing.schema import iter_test_cases, load_test_cases
 
 
 class TestCaseSchemaTests(unittest.TestCase):
@@ -62,6 +62,41 @@ class TestCaseSchemaTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             load_test_cases(path)
 
+    def _write_lines(self, lines: list[str]) -> Path:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = Path(tmpdir.name) / "cases.jsonl"
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+    def test_streams_jsonl_cases_lazily(self) -> None:
+        path = self._write_lines(
+            [
+                json.dumps({"id": "case-1", "params": {"text": "ping"}, "expected_output": "PING"}),
+                "",
+                json.dumps({"id": "case-2", "params": {"text": "pong"}, "expected_output": "PONG"}),
+            ]
+        )
+
+        cases = iter_test_cases(path)
+
+        self.assertEqual("case-1", next(cases).id)
+        self.assertEqual("case-2", next(cases).id)
+        self.assertEqual(["case-1", "case-2"], [case.id for case in load_test_cases(path)])
+
+    def test_jsonl_error_reports_line_number(self) -> None:
+        path = self._write_lines(
+            [
+                json.dumps({"id": "case-1", "expected_output": "PING"}),
+                json.dumps({"id": "case-2", "params": {}}),
+            ]
+        )
+
+        cases = iter_test_cases(path)
+        self.assertEqual("case-1", next(cases).id)
+        with self.assertRaisesRegex(ValueError, r"cases\.jsonl:2"):
+            next(cases)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from sgr.testing.models import TestCase
+from sgr.testing.processes import pack_result
+from sgr.testing.runner import TestRunner
+from sgr.testing.work_queue import WorkQueue, coordinate, run_worker
+
+REFERENCE = "tests.test_work_queue:build_pipeline"
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class SlowEchoPipeline:
+    """Takes a moment per case so that every worker gets a share of the queue."""
+
+    name = "SlowEcho"
+
+    def run(self, text: str) -> dict[str, object]:
+        time.sleep(0.05)
+        if text == "boom":
+            raise ValueError("cannot echo")
+        return {"text": text.upper(), "pid": os.getpid()}
+
+
+def build_pipeline() -> SlowEchoPipeline:
+    return SlowEchoPipeline()
+
+
+def same_text(actual: dict[str, object], expected: str) -> bool:
+    return actual["text"] == expected
+
+
+def _cases(count: int = 24) -> list[TestCase]:
+    texts = [f"word{index}" if index != 5 else "boom" for index in range(count)]
+    return [
+        TestCase(id=f"case-{index}", params={"text": text}, expected_output=text.upper())
+        for index, text in enumerate(texts)
+    ]
+
+
+def _start_worker(queue: Path, name: str) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        [sys.executable, "-m", "sgr.testing.cli", "worker", "--queue", str(queue), "--worker-id", name],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def test_local_workers_share_the_queue(tmp_path: Path) -> None:
+    queue = tmp_path / "run.sqlite"
+    workers = [_start_worker(queue, f"worker-{number}") for number in range(3)]
+    try:
+        test_run = TestRunner(backend="queue", queue=queue, comparator=same_text, run_timeout=120).run(
+            REFERENCE, _cases()
+        )
+    finally:
+        outputs = [process.communicate(timeout=60)[0].decode() for process in workers]
+
+    assert all(process.returncode == 0 for process in workers), outputs
+    assert [result.id for result in test_run.results] == [case.id for case in _cases()]
+    assert test_run.stop_reason is None
+    assert test_run.summary.passed == 23
+    assert test_run.results[5].error == "cannot echo"
+    assert all(result.case_hash for result in test_run.results)
+    pids = {result.output["pid"] for result in test_run.results if result.output}
+    assert len(pids) > 1 and os.getpid() not in pids
+
+
+def test_expired_lease_goes_to_another_worker_and_first_result_wins(tmp_path: Path) -> None:
+    work_queue = WorkQueue(tmp_path / "run.sqlite")
+    run_id = work_queue.create(enumerate(_cases(2)), pipeline=REFERENCE, lease_timeout=0.1, max_attempts=2)
+
+    first = work_queue.lease(run_id, "stuck", 1)
+    assert [case.id for _, case in first] == ["case-0"]
+    time.sleep(0.15)
+    second = work_queue.lease(run_id, "healthy", 2)
+    assert [case.id for _, case in second] == ["case-0", "case-1"]
+
+    runner = TestRunner(comparator=same_text)
+    pipeline = build_pipeline()
+    late = runner._run_case(pipeline, _cases(2)[0])
+    late.error = "late"
+    assert work_queue.complete(run_id, [pack_result(0, late)]) == 1
+    on_time = runner._run_case(pipeline, _cases(2)[0])
+    assert work_queue.complete(run_id, [pack_result(0, on_time)]) == 0
+    assert work_queue.complete("stale-run", [pack_result(1, on_time)]) == 0
+
+    # case-1 is leased a second time (max_attempts) and that lease expires too: it is reported as lost.
+    time.sleep(0.15)
+    assert [case.id for _, case in work_queue.lease(run_id, "third", 2)] == ["case-1"]
+    time.sleep(0.15)
+    assert work_queue.lease(run_id, "fourth", 2) == []
+    finished: dict[int, object] = {}
+    assert coordinate(work_queue, lambda index, result: finished.setdefault(index, result), lambda: None) is None
+    assert finished[0].error == "late"
+    assert not finished[1].passed and "lease" in finished[1].error
+    assert work_queue.run_info().state == "finished"
+
+
+def test_case_of_a_dead_worker_is_finished_by_another_worker(tmp_path: Path) -> None:
+    work_queue = WorkQueue(tmp_path / "run.sqlite")
+    run_id = work_queue.create(
+        enumerate(_cases(2)), pipeline=REFERENCE, options={"comparator": same_text}, lease_timeout=0.1, max_attempts=3
+    )
+    assert [case.id for _, case in work_queue.lease(run_id, "dead", 1)] == ["case-0"]
+    healthy = work_queue.lease(run_id, "healthy", 1)
+    result = TestRunner(comparator=same_text)._run_case(build_pipeline(), healthy[0][1])
+    work_queue.complete(run_id, [pack_result(healthy[0][0], result)])
+    time.sleep(0.15)
+    # The dead worker's lease expired with attempts left: the case is pending again, not lost.
+    assert work_queue.outstanding() == (1, 0)
+
+    finished: dict[int, object] = {}
+    stop_reasons: list[str | None] = []
+    coordinator = threading.Thread(
+        target=lambda: stop_reasons.append(
+            coordinate(work_queue, lambda index, result: finished.setdefault(index, result), lambda: None)
+        )
+    )
+    coordinator.start()
+    time.sleep(0.1)
+    assert coordinator.is_alive()
+    assert run_worker(work_queue, worker_id="rescuer", wait=5, poll_interval=0.02) == 1
+    coordinator.join(timeout=10)
+
+    assert stop_reasons == [None]
+    assert sorted(finished) == [0, 1] and all(result.passed for result in finished.values())
+    assert work_queue.run_info().state == "finished"
+
+
+def test_worker_refuses_a_different_pipeline(tmp_path: Path) -> None:
+    work_queue = WorkQueue(tmp_path / "run.sqlite")
+    work_queue.create(enumerate(_cases(1)), pipeline=REFERENCE, fingerprint="other-prompt")
+
+    with pytest.raises(ValueError, match="differs"):
+        run_worker(work_queue, wait=1)
+    with pytest.raises(TimeoutError):
+        run_worker(WorkQueue(tmp_path / "missing.sqlite"), REFERENCE, wait=0.1)